@@ -11,13 +11,20 @@ from streamlit_cookies_controller import CookieController
 from motivation import motivate
 from config import (
     load_all,
-    mistral_chat,
-    Participant,
+    request_motivation,
+    motivation_fingerprint,
     save_new_squat,
     get_today,
     get_end_of_year,
-    fetch_squat_dataframe_cached,
-    clear_squat_dataframe_cache,
+    cached_crew_stats,
+    DEFAULT_GROUP,
+    daily_totals_version,
+    downsample_series,
+    fetch_session_snapshot,
+    fetch_daily_totals_cached,
+    figure_cache,
+    get_group,
+    participant_cache,
 )
 
 
@@ -209,23 +216,20 @@ st.markdown(
 
 # LOAD and DEFINE the DATA here ######################################
 
-participants = (
-    "Audrix",
-    "Matix",
-    "Floflox",
-    "Max",
-    "Marinox",
-    "Viox",
-    "Carlix",
-    "Annax",
-    "Elix",
-    "Le K",
-    "Tonix",
-    "Fannux",
-    "Andreax",
-)
+# Roster and settings come from the group's record (squats_groups table, or
+# groups.json); ?group=<id> opens another challenge group
+group_id = st.query_params.get("group") or DEFAULT_GROUP
+try:
+    group_settings = get_group(group_id)
+except KeyError:
+    st.error(f"Groupe inconnu : {group_id} 🤷")
+    st.stop()
+# The stats pages follow the group picked here
+st.session_state["group"] = group_id
 
-NO_AI_USERS = {"Viox", "Fannux", "Marinox"}
+participants = group_settings["participants"]
+
+NO_AI_USERS = set(group_settings["no_ai_users"])
 
 
 def get_no_ai_message(name: str) -> str:
@@ -233,7 +237,7 @@ def get_no_ai_message(name: str) -> str:
         "Mode éclo activé. Aucun algorithme n’a été sollicité pour juger la profondeur de tes squats. La planète respire. Descends plus bas. 🌍🍑",
         "Fait squat pour la planète 🌍🍑 (zéro blabla, 100% cuisses).",
         "IA désactivée pour raisons climatiques. Tes quadriceps, eux, restent activés. Continue",
-        "Mode écolo : activé 🌱🍑 Allez, 20 squats. Maintenant.",
+        f"Mode écolo : activé 🌱🍑 Allez, {SQUAT_JOUR} squats. Maintenant.",
         "Aucune eau n’a été consommée pour analyser ta performance. Ton corps, en revanche, devrait en boire.",
         "IA absente. Discipline requise.",
         "Pas de jugement algorithmique aujourd’hui, juste toi et tes squats. Respire, descends, remonte. Repeat.",
@@ -245,7 +249,7 @@ def get_no_ai_message(name: str) -> str:
 today = get_today()
 end_of_year = get_end_of_year()
 
-SQUAT_JOUR = 20
+SQUAT_JOUR = group_settings["daily_goal"]
 
 DAYS_LEFT = (end_of_year - today).days + 1
 
@@ -306,24 +310,46 @@ def render_radial_progress(
     return html
 
 
-@st.cache_data(ttl=3600, show_spinner=False)
-def chat_with_mistral(prompt_hash: str, name: str, date_key: str, sum_squats: int) -> str:
-    """Cached LLM motivation call. Keyed on name + date to avoid re-calling same day.
+# How often the motivation placeholder checks whether the LLM has answered.
+MOTIVATION_POLL_SECONDS = 1
+
 
-    prompt_hash is passed for cache busting when stats change significantly,
-    but typically the same user on the same day gets cached response.
+@st.fragment(run_every=MOTIVATION_POLL_SECONDS)
+def poll_motivation(fingerprint, future, fallback: str):
+    """Show the fallback until the background LLM call is done, never waiting on it.
+
+    A fragment's timer only stops on a full run: once the answer is in, it is
+    kept in session_state and the app reruns once to show it without polling.
     """
-    # We need the actual prompt, so we regenerate it here
-    # This is a workaround since we can't cache with the full prompt as key (too long)
-    response = mistral_chat(prompt_hash)
-    return response
+    if not future.done():
+        st.markdown(fallback)
+        return
+    st.session_state["motivation"] = (fingerprint, future.result())
+    st.rerun()
+
 
+def show_motivation(
+    placeholder, build_prompt, name: str, sum_squats: int, streak: int, fallback: str
+):
+    """Fill placeholder with the LLM motivation, cached on a small stats fingerprint.
 
-def get_motivation_cached(prompt: str, name: str, sum_squats: int) -> str:
-    """Wrapper that handles cache key generation for LLM calls."""
+    build_prompt is only called on a cache miss; the call then runs in the
+    background and poll_motivation swaps the fallback out when it lands.
+    """
     today_key = get_today().strftime("%Y-%m-%d")
-    # Use a hash of key stats to bust cache if numbers change significantly
-    return chat_with_mistral(prompt, name, today_key, sum_squats)
+    fingerprint = motivation_fingerprint(
+        name, today_key, sum_squats, streak, group=group_id
+    )
+    shown = st.session_state.get("motivation")
+    if shown is not None and shown[0] == fingerprint:
+        placeholder.markdown(shown[1])
+        return
+    future = request_motivation(fingerprint, build_prompt)
+    if future.done():
+        placeholder.markdown(future.result())
+        return
+    with placeholder:
+        poll_motivation(fingerprint, future, fallback)
 
 
 # Mobile-first by default; append ?view=desktop to the URL for the wide layout.
@@ -338,18 +364,6 @@ if not isinstance(query_params, dict):
 mobile_view = query_params.get("view", ["mobile"])[0].lower() != "desktop"
 
 
-def fetch_squat_dataframe():
-    """Use centralized cached fetch for performance."""
-    return fetch_squat_dataframe_cached()
-
-
-def refresh_squat_dataframe():
-    """Purge centralized cache after writes."""
-    clear_squat_dataframe_cache()
-    # Also clear participant cache so they get rebuilt with fresh data
-    _participant_cache.clear()
-
-
 # COOKIES CONTROL ##################################################################################################################
 controller = CookieController(key="squat_cookies")
 
@@ -382,192 +396,13 @@ active_user = st.session_state.get("id_squatteur")
 #####################################################################################################################################
 
 
-squat_data = fetch_squat_dataframe()
-data_total = squat_data.copy()
-crew_daily_totals = pd.DataFrame(columns=["date_day", "squats"])
-if not squat_data.empty:
-    crew_daily_totals = (
-        squat_data.assign(date_day=squat_data["date"].dt.date)
-        .groupby("date_day")["squats"]
-        .sum()
-        .reset_index()
-    )
-    crew_daily_totals["rolling"] = crew_daily_totals["squats"].rolling(7).mean()
-
-start_of_year = datetime(today.year, 1, 1).date()
-days_elapsed = (today.date() - start_of_year).days + 1
-crew_total_squats = int(data_total["squats"].sum()) if not data_total.empty else 0
-last_entry = data_total.iloc[-1] if not data_total.empty else None
-
-
-# --- Initialisation de st.session_state ---
-today_date = today.date()  # Get today's date in UTC
-
-
-# Lazy Participant construction for better LCP
-# Only build active user's Participant eagerly; others on-demand
-_participant_cache = {}
-
-
-def get_participant(name: str) -> Participant:
-    """Lazy-load Participant object for a given name."""
-    if name not in _participant_cache:
-        _participant_cache[name] = Participant(
-            name, squat_data, days_left=DAYS_LEFT, squat_objectif_quotidien=SQUAT_JOUR
-        )
-    return _participant_cache[name]
-
-
-# Build active user's participant eagerly (needed for dashboard)
-if active_user:
-    get_participant(active_user)
-
-
-# participants_obj is now a lazy dict-like access pattern
-class LazyParticipantDict:
-    """Dict-like object that lazily builds Participants on access."""
-
-    def __init__(self, names):
-        self._names = set(names)
-
-    def get(self, name, default=None):
-        if name in self._names:
-            return get_participant(name)
-        return default
-
-    def __getitem__(self, name):
-        if name in self._names:
-            return get_participant(name)
-        raise KeyError(name)
-
-    def __setitem__(self, name, value):
-        """Allow assignment to update the internal cache."""
-        _participant_cache[name] = value
-
-    def __contains__(self, name):
-        return name in self._names
-
-    def values(self):
-        # Only materialize all when needed (leaderboard)
-        return [get_participant(n) for n in self._names]
-
-    def items(self):
-        return [(n, get_participant(n)) for n in self._names]
-
-    def keys(self):
-        return self._names
-
-
-participants_obj = LazyParticipantDict(participants)
-
-# Sum individual goals (each participant's goal starts from their first squat, not Jan 1st)
-crew_goal_to_date = sum(p.sum_squat_should_be_done_today for p in participants_obj.values())
-crew_delta_today = crew_total_squats - crew_goal_to_date
-crew_goal_full_year = sum(p.objectif_sum_squat for p in participants_obj.values())
-crew_completion_pct = (crew_total_squats / crew_goal_full_year) * 100 if crew_goal_full_year else 0
-
-active_today = sum(
-    1
-    for participant in participants_obj.values()
-    if participant.sum_squats_done_today >= SQUAT_JOUR
-)
-best_streak_holder = max(
-    participants_obj.values(),
-    key=lambda p: p.best_objective_streak,
-    default=None,
-)
-pace_leader = max(
-    participants_obj.values(),
-    key=lambda p: p.moyenne_squats_par_jour,
-    default=None,
-)
-# Plank leaders
-best_plank_holder = max(
-    participants_obj.values(),
-    key=lambda p: p.best_plank_seconds,
-    default=None,
-)
-best_plank_streak_holder = max(
-    participants_obj.values(),
-    key=lambda p: p.best_plank_streak,
-    default=None,
-)
-total_plank_leader = max(
-    participants_obj.values(),
-    key=lambda p: p.sum_plank_seconds,
-    default=None,
-)
-
-
 participant_order = list(participants)
-participant_obj = participants_obj.get(active_user) if active_user else None
-
-
-is_logged_in = active_user in participants_obj
-
-# Used later to display the LLM motivation block.
-# Defined unconditionally to avoid static-analysis "possibly unbound" warnings.
-
-
-if not is_logged_in:
-    st.title("🍑 Squat App 🍑")
-    st.subheader("New year new me")
-    st.caption("La persévérance, secret de tous les triomphes. - Victor Hugo")
-
-    st.subheader("Choisis ton nom pour te connecter")
-    st.caption("Clique sur ton nom, on te prépare le formulaire perso juste après 👇")
-    login_container = st.container()
-    login_container.markdown('<div class="login-grid">', unsafe_allow_html=True)
-    selection_cols = login_container.columns(2 if mobile_view else 3)
-    for idx, name in enumerate(participants):
-        col = selection_cols[idx % len(selection_cols)]
-        if col.button(f"{name} 🔓", key=f"login_{name}", width="stretch"):
-
-            st.session_state["pending_loading"] = name
-            st.rerun()
-    login_container.markdown("</div>", unsafe_allow_html=True)
-
-
-if is_logged_in:
-    # Keep the active user first in displays.
-    participant_order = list(participants)
-    if active_user in participant_order:
-        participant_order.remove(active_user)
-        participant_order.insert(0, active_user)
-
-    dict_variant_title = [
-        f"Bah te revoila {active_user}",
-        f"Bravo {active_user}",
-        f"Content de te revoir {active_user} !",
-        f"Allez {active_user}, on y retourne !",
-        f"Let's go {active_user} !",
-        f"Re-bienvenue {active_user} !",
-        f"Ah bah enfin {active_user} !",
-        f"Tu reviens pour plus de squats {active_user} ?",
-        # f"Alors? {active_user}, prêt.e à en découdre ?",
-        f"Ça squat l'appli {active_user} ?",
-        f"T'es la star que tu penses être {active_user}",
-    ]
-
-    title_text = random.choice(dict_variant_title)
-
-    st.title(title_text)
-
-    # st.title(f"Allez {active_user}, t'es pas une merde!! ")
+is_logged_in = active_user in participants
+participant_obj = None
 
-    if st.button("Pas toi ? Clique ici pour changer de squatteur", key="change_user_btn"):
-        # clear_login_cookie()
-        st.session_state["pending_loading"] = "LOGOUT"
-        active_user = None
-        is_logged_in = False
-        participant_obj = None
-        st.rerun()
-
-    placeholder = st.empty()
-    st.divider()
-
-    st.write(f"{active_user}, maintenant tu peux directement enregistrer tes squats ici :")
 
+def render_logging_forms(active_user: str):
+    """Squat and plank logging forms; a submit writes through to the dataset cache."""
     with st.form("squat_form"):
         squats_faits = st.number_input(
             "Enregistrer une session squats :",
@@ -581,22 +416,14 @@ if is_logged_in:
     if submitted:
         with st.spinner("Saving..."):
             # Sauvegarder dans DynamoDB
-            new_item = save_new_squat(active_user, squats_faits)
-
-            refresh_squat_dataframe()
-            participant_obj = participants_obj[active_user] = Participant(
-                active_user,
-                fetch_squat_dataframe(),
-                days_left=DAYS_LEFT,
-                squat_objectif_quotidien=SQUAT_JOUR,
-            )
+            # Written through to the dataset cache: the sections rendered
+            # after the forms already include it
+            new_item = save_new_squat(active_user, squats_faits, group=group_id)
 
             size = len(motivate)
             random_motivate = random.randrange(0, size)
             st.success(motivate[random_motivate])
 
-            st.rerun()
-
     with st.form("plank_form"):
         planks_faits = st.number_input(
             "Enregistrer une session de gainage (en secondes) :",
@@ -609,243 +436,238 @@ if is_logged_in:
     if submitted_plank:
         with st.spinner("Saving..."):
             # Sauvegarder dans DynamoDB
-            new_item = save_new_squat(active_user, planks_faits, exercise="PLANK")
-
-            refresh_squat_dataframe()
-            participant_obj = participants_obj[active_user] = Participant(
-                active_user,
-                fetch_squat_dataframe(),
-                days_left=DAYS_LEFT,
-                squat_objectif_quotidien=SQUAT_JOUR,
+            new_item = save_new_squat(
+                active_user, planks_faits, exercise="PLANK", group=group_id
             )
 
             st.success(f"Gainage de {planks_faits} secondes enregistré pour {active_user}!")
 
-            st.rerun()
-
-    if participant_obj is not None:
-        st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
-        st.markdown(
-            '<div class="section-header"><span class="emoji">🎯</span><h3 style="margin:0">Ton tableau de bord</h3></div>',
-            unsafe_allow_html=True,
-        )
-        st.caption("Tes stats personnelles en temps réel")
 
-        # Radial progress rings for daily and annual goals
-        with st.container(border=True):
-            daily_pct = (participant_obj.sum_squats_done_today / SQUAT_JOUR) * 100
-            annual_pct = participant_obj.progress_pct_vs_objectif
-
-            ring_cols = st.columns(2)
-
-            with ring_cols[0]:
-                st.markdown(
-                    render_radial_progress(
-                        daily_pct,
-                        f"{int(participant_obj.sum_squats_done_today)}",
-                        f"/ {SQUAT_JOUR} aujourd'hui",
-                        size=130,
-                        stroke=12,
-                    ),
-                    unsafe_allow_html=True,
-                )
-            with ring_cols[1]:
-                st.markdown(
-                    render_radial_progress(
-                        annual_pct,
-                        f"{annual_pct:.1f}%",
-                        "objectif annuel",
-                        size=130,
-                        stroke=12,
-                    ),
-                    unsafe_allow_html=True,
-                )
+def render_personal_dashboard(participant_obj, session_snapshot):
+    """Personal rings, metrics and session history of the logged-in user."""
+    st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
+    st.markdown(
+        '<div class="section-header"><span class="emoji">🎯</span><h3 style="margin:0">Ton tableau de bord</h3></div>',
+        unsafe_allow_html=True,
+    )
+    st.caption("Tes stats personnelles en temps réel")
 
-        with st.container(border=True):
-            cockpit_metrics = [
-                {
-                    "label": "Total cumulé",
-                    "value": int(participant_obj.sum_squats_done),
-                },
-                {
-                    "label": "Delta vs objectif",
-                    "value": int(participant_obj.delta_done_vs_objecitf_today),
-                    "help": "Positif = avance, négatif = retard",
-                },
-                {
-                    "label": "Squats aujourd'hui",
-                    "value": int(participant_obj.sum_squats_done_today),
-                    "delta": int(participant_obj.sum_squats_done_today - SQUAT_JOUR),
-                },
-                {
-                    "label": "Moyenne / jour",
-                    "value": round(float(participant_obj.moyenne_squats_par_jour), 2),
-                    "delta": round(float(participant_obj.moyenne_squats_par_jour - SQUAT_JOUR), 2),
-                },
-            ]
-            render_metric_rows(cockpit_metrics, per_row=2 if mobile_view else 2)
+    # Radial progress rings for daily and annual goals
+    with st.container(border=True):
+        daily_pct = (participant_obj.sum_squats_done_today / SQUAT_JOUR) * 100
+        annual_pct = participant_obj.progress_pct_vs_objectif
+
+        ring_cols = st.columns(2)
+
+        with ring_cols[0]:
+            st.markdown(
+                render_radial_progress(
+                    daily_pct,
+                    f"{int(participant_obj.sum_squats_done_today)}",
+                    f"/ {SQUAT_JOUR} aujourd'hui",
+                    size=130,
+                    stroke=12,
+                ),
+                unsafe_allow_html=True,
+            )
+        with ring_cols[1]:
+            st.markdown(
+                render_radial_progress(
+                    annual_pct,
+                    f"{annual_pct:.1f}%",
+                    "objectif annuel",
+                    size=130,
+                    stroke=12,
+                ),
+                unsafe_allow_html=True,
+            )
 
-        # Plank stats section
-        st.markdown(
-            '<div class="section-header"><span class="emoji">🪵</span><h4 style="margin:0">Gainage</h4></div>',
-            unsafe_allow_html=True,
-        )
+    with st.container(border=True):
+        cockpit_metrics = [
+            {
+                "label": "Total cumulé",
+                "value": int(participant_obj.sum_squats_done),
+            },
+            {
+                "label": "Delta vs objectif",
+                "value": int(participant_obj.delta_done_vs_objecitf_today),
+                "help": "Positif = avance, négatif = retard",
+            },
+            {
+                "label": "Squats aujourd'hui",
+                "value": int(participant_obj.sum_squats_done_today),
+                "delta": int(participant_obj.sum_squats_done_today - SQUAT_JOUR),
+            },
+            {
+                "label": "Moyenne / jour",
+                "value": round(float(participant_obj.moyenne_squats_par_jour), 2),
+                "delta": round(float(participant_obj.moyenne_squats_par_jour - SQUAT_JOUR), 2),
+            },
+        ]
+        render_metric_rows(cockpit_metrics, per_row=2 if mobile_view else 2)
 
-        def format_plank_time(seconds: int) -> str:
-            """Format plank time: show minutes if >= 120 seconds."""
-            if seconds >= 120:
-                mins = seconds // 60
-                secs = seconds % 60
-                return f"{mins}m{secs:02d}s" if secs else f"{mins} min"
-            return f"{seconds} sec"
+    # Plank stats section
+    st.markdown(
+        '<div class="section-header"><span class="emoji">🪵</span><h4 style="margin:0">Gainage</h4></div>',
+        unsafe_allow_html=True,
+    )
 
-        def get_funny_equivalent(seconds: int) -> dict:
-            """Return a funny equivalent for plank time."""
-            # Fun equivalents based on duration
-            if seconds < 60:
-                return {
-                    "label": "🍳 Équivalent",
-                    "value": "Pas encore un œuf cuit",
-                    "help": "Faut tenir plus longtemps !",
-                }
-            elif seconds < 180:  # si inferieur a 3 minutes
-                return {
-                    "label": "🎵 Équivalent",
-                    "value": f"{seconds // 30} pubs Spotify",
-                    "help": "30 sec par pub non-skippable",
-                }
-            elif seconds < 600:  # si inferieur a 10 minutes
-                return {
-                    "label": "🍳 Équivalent",
-                    "value": f"{seconds // 120} oeufs à la coque",
-                    "help": "2 min pour cuire un oeuf à la coque",
-                }
-            elif seconds < 1800:  # si inferieur a 30 minutes Bande organisée 5:56
-                return {
-                    "label": "🎵 Équivalent",
-                    "value": f"{seconds // 356} x Bande Organisée",
-                    "help": "5 min 56 sec par écoute de ce banger",
-                }
-            else:
-                return {
-                    "label": "🎬 Équivalent",
-                    "value": f"{seconds // 1800} épisodes de Friends",
-                    "help": "30 min par épisode (sans pubs)",
-                }
+    def format_plank_time(seconds: int) -> str:
+        """Format plank time: show minutes if >= 120 seconds."""
+        if seconds >= 120:
+            mins = seconds // 60
+            secs = seconds % 60
+            return f"{mins}m{secs:02d}s" if secs else f"{mins} min"
+        return f"{seconds} sec"
 
-        with st.container(border=True):
-            if participant_obj.sum_plank_seconds == 0:
-                st.info("Tu n'as pas encore enregistré de séances de gainage.")
-            if participant_obj.sum_plank_seconds > 0:
-                plank_metrics = [
-                    {
-                        "label": "🪵 Total gainage",
-                        "value": format_plank_time(participant_obj.sum_plank_seconds),
-                        "help": "Temps cumulé depuis le début",
-                    },
-                    {
-                        "label": "⏱️ Aujourd'hui",
-                        "value": format_plank_time(participant_obj.sum_plank_seconds_today),
-                        "help": "Temps fait aujourd'hui",
-                    },
-                    {
-                        "label": "💪 Meilleure séance",
-                        "value": format_plank_time(participant_obj.best_plank_seconds),
-                        "help": "Ta meilleure performance en une session",
-                    },
-                    get_funny_equivalent(participant_obj.sum_plank_seconds),
-                ]
-                render_metric_rows(plank_metrics, per_row=2)
-
-                # Plank streaks and averages
-                plank_streak_metrics = [
-                    {
-                        "label": "🔥 Streak gainage",
-                        "value": f"{participant_obj.current_plank_streak} jours",
-                        "delta": f"Record {participant_obj.best_plank_streak}",
-                        "help": "Jours consécutifs avec ≥30 sec de gainage",
-                    },
-                    {
-                        "label": "📊 Moyenne / session",
-                        "value": format_plank_time(int(participant_obj.moyenne_plank_par_session)),
-                        "delta": f"{participant_obj.plank_sessions_count} sessions",
-                    },
-                ]
-                render_metric_rows(plank_streak_metrics, per_row=2)
+    def get_funny_equivalent(seconds: int) -> dict:
+        """Return a funny equivalent for plank time."""
+        # Fun equivalents based on duration
+        if seconds < 60:
+            return {
+                "label": "🍳 Équivalent",
+                "value": "Pas encore un œuf cuit",
+                "help": "Faut tenir plus longtemps !",
+            }
+        elif seconds < 180:  # si inferieur a 3 minutes
+            return {
+                "label": "🎵 Équivalent",
+                "value": f"{seconds // 30} pubs Spotify",
+                "help": "30 sec par pub non-skippable",
+            }
+        elif seconds < 600:  # si inferieur a 10 minutes
+            return {
+                "label": "🍳 Équivalent",
+                "value": f"{seconds // 120} oeufs à la coque",
+                "help": "2 min pour cuire un oeuf à la coque",
+            }
+        elif seconds < 1800:  # si inferieur a 30 minutes Bande organisée 5:56
+            return {
+                "label": "🎵 Équivalent",
+                "value": f"{seconds // 356} x Bande Organisée",
+                "help": "5 min 56 sec par écoute de ce banger",
+            }
+        else:
+            return {
+                "label": "🎬 Équivalent",
+                "value": f"{seconds // 1800} épisodes de Friends",
+                "help": "30 min par épisode (sans pubs)",
+            }
 
-        st.markdown(
-            '<div class="section-header"><span class="emoji">🔥</span><h4 style="margin:0">Régularité & Streaks</h4></div>',
-            unsafe_allow_html=True,
-        )
-        with st.container(border=True):
-            streak_metrics = [
+    with st.container(border=True):
+        if participant_obj.sum_plank_seconds == 0:
+            st.info("Tu n'as pas encore enregistré de séances de gainage.")
+        if participant_obj.sum_plank_seconds > 0:
+            plank_metrics = [
                 {
-                    "label": "🔥 Streak en cours",
-                    "value": f"{participant_obj.current_objective_streak} jours",
-                    "delta": f"Record {participant_obj.best_objective_streak}",
+                    "label": "🪵 Total gainage",
+                    "value": format_plank_time(participant_obj.sum_plank_seconds),
+                    "help": "Temps cumulé depuis le début",
                 },
                 {
-                    "label": "📚 Sessions loggées",
-                    "value": participant_obj.sessions_logged,
-                    "delta": f"Depuis {participant_obj.premier_squat_date.strftime('%d/%m')}",
+                    "label": "⏱️ Aujourd'hui",
+                    "value": format_plank_time(participant_obj.sum_plank_seconds_today),
+                    "help": "Temps fait aujourd'hui",
                 },
                 {
-                    "label": "📈 Progression annuelle",
-                    "value": f"{participant_obj.progress_pct_vs_objectif:.1f}%",
-                    "delta": f"Objectif {participant_obj.objectif_sum_squat}",
+                    "label": "💪 Meilleure séance",
+                    "value": format_plank_time(participant_obj.best_plank_seconds),
+                    "help": "Ta meilleure performance en une session",
                 },
+                get_funny_equivalent(participant_obj.sum_plank_seconds),
             ]
-            render_metric_rows(streak_metrics, per_row=1 if mobile_view else 2)
+            render_metric_rows(plank_metrics, per_row=2)
 
-        st.markdown(
-            '<div class="section-header"><span class="emoji">📊</span><h4 style="margin:0">Tendances</h4></div>',
-            unsafe_allow_html=True,
-        )
-        with st.container(border=True):
-            trend_metrics = [
+            # Plank streaks and averages
+            plank_streak_metrics = [
                 {
-                    "label": "Semaine en cours",
-                    "value": participant_obj.weekly_total,
-                    "delta": participant_obj.weekly_delta,
+                    "label": "🔥 Streak gainage",
+                    "value": f"{participant_obj.current_plank_streak} jours",
+                    "delta": f"Record {participant_obj.best_plank_streak}",
+                    "help": "Jours consécutifs avec ≥30 sec de gainage",
                 },
                 {
-                    "label": "Projection fin d'année",
-                    "value": participant_obj.projected_year_total,
-                    "delta": int(
-                        participant_obj.projected_year_total - participant_obj.objectif_sum_squat
-                    ),
-                    "help": "Projection basée sur ta moyenne quotidienne",
+                    "label": "📊 Moyenne / session",
+                    "value": format_plank_time(int(participant_obj.moyenne_plank_par_session)),
+                    "delta": f"{participant_obj.plank_sessions_count} sessions",
                 },
             ]
-            render_metric_rows(trend_metrics, per_row=1 if mobile_view else 2)
+            render_metric_rows(plank_streak_metrics, per_row=2)
 
-        with st.container(border=True):
-            st.progress(
-                min(participant_obj.progress_pct_vs_objectif / 100, 1.0),
-                text="Progression sur l'objectif annuel",
-            )
-            st.caption("Barre bleu = ton pourcentage du défi annuel. Continue d'empiler.")
+    st.markdown(
+        '<div class="section-header"><span class="emoji">🔥</span><h4 style="margin:0">Régularité & Streaks</h4></div>',
+        unsafe_allow_html=True,
+    )
+    with st.container(border=True):
+        streak_metrics = [
+            {
+                "label": "🔥 Streak en cours",
+                "value": f"{participant_obj.current_objective_streak} jours",
+                "delta": f"Record {participant_obj.best_objective_streak}",
+            },
+            {
+                "label": "📚 Sessions loggées",
+                "value": participant_obj.sessions_logged,
+                "delta": f"Depuis {participant_obj.premier_squat_date.strftime('%d/%m')}",
+            },
+            {
+                "label": "📈 Progression annuelle",
+                "value": f"{participant_obj.progress_pct_vs_objectif:.1f}%",
+                "delta": f"Objectif {participant_obj.objectif_sum_squat}",
+            },
+        ]
+        render_metric_rows(streak_metrics, per_row=1 if mobile_view else 2)
 
-        st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
-        st.markdown(
-            '<div class="section-header"><span class="emoji">📈</span><h4 style="margin:0">Historique des sessions</h4></div>',
-            unsafe_allow_html=True,
+    st.markdown(
+        '<div class="section-header"><span class="emoji">📊</span><h4 style="margin:0">Tendances</h4></div>',
+        unsafe_allow_html=True,
+    )
+    with st.container(border=True):
+        trend_metrics = [
+            {
+                "label": "Semaine en cours",
+                "value": participant_obj.weekly_total,
+                "delta": participant_obj.weekly_delta,
+            },
+            {
+                "label": "Projection fin d'année",
+                "value": participant_obj.projected_year_total,
+                "delta": int(
+                    participant_obj.projected_year_total - participant_obj.objectif_sum_squat
+                ),
+                "help": "Projection basée sur ta moyenne quotidienne",
+            },
+        ]
+        render_metric_rows(trend_metrics, per_row=1 if mobile_view else 2)
+
+    with st.container(border=True):
+        st.progress(
+            min(participant_obj.progress_pct_vs_objectif / 100, 1.0),
+            text="Progression sur l'objectif annuel",
         )
-        with st.container(border=True):
-            if mobile_view:
-                chart_col = st.container()
-                box_col = st.container()
-            else:
-                chart_col, box_col = st.columns([3, 2])
-
-        personal_history = participant_obj.df.copy()
-        personal_history["date"] = pd.to_datetime(personal_history["date"])
-        with chart_col:
-            fig = px.bar(personal_history, x="date", y="squats", title="Sessions récentes")
+        st.caption("Barre bleu = ton pourcentage du défi annuel. Continue d'empiler.")
+
+    st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
+    st.markdown(
+        '<div class="section-header"><span class="emoji">📈</span><h4 style="margin:0">Historique des sessions</h4></div>',
+        unsafe_allow_html=True,
+    )
+    with st.container(border=True):
+        if mobile_view:
+            chart_col = st.container()
+            box_col = st.container()
+        else:
+            chart_col, box_col = st.columns([3, 2])
+
+    personal_history = participant_obj.df
+    with chart_col:
+        def build_fig():
+            plotted = downsample_series(personal_history, "date", ["squats"])
+            fig = px.bar(plotted, x="date", y="squats", title="Sessions récentes")
             # Apply gradient-like coloring based on values
             fig.update_traces(
                 marker=dict(
-                    color=personal_history["squats"],
+                    color=plotted["squats"],
                     colorscale=[[0, "#ffab91"], [0.5, "#ff8a65"], [1, "#ff6f61"]],
                     line=dict(width=0),
                 ),
@@ -872,260 +694,407 @@ if is_logged_in:
             )
             fig.update_xaxes(showgrid=False)
             fig.update_yaxes(showgrid=True, gridcolor="rgba(255,111,97,0.1)")
-            st.plotly_chart(fig, width="stretch")
+            return fig
+
+        # Same sessions -> same figure, for every session of this participant
+        figure_key = (
+            "personal_history",
+            participant_obj.name,
+            session_snapshot.name_version(participant_obj.name),
+            get_today().date(),
+        )
+        st.plotly_chart(
+            figure_cache(group_id).get(figure_key, build_fig), width="stretch"
+        )
 
-        with box_col:
-            pass
-            # box_fig = px.box(personal_history, y="squats", title="Distribution")
-            # st.plotly_chart(box_fig, width="stretch")
+    with box_col:
+        pass
+        # box_fig = px.box(personal_history, y="squats", title="Distribution")
+        # st.plotly_chart(box_fig, width="stretch")
+
+
+def render_crew_sections(session_snapshot, crew_stats):
+    """Crew sections; returns (crew_summary, leaderboard_df) for the LLM prompt."""
+    squat_data = session_snapshot.source
+    crew_total_squats = int(squat_data["squats"].sum()) if not squat_data.empty else 0
+    last_entry = squat_data.iloc[-1] if not squat_data.empty else None
+    crew_daily_totals = pd.DataFrame(columns=["date_day", "squats"])
+    daily_totals = fetch_daily_totals_cached(group_id)
+    if not daily_totals.empty:
+        crew_daily_totals = daily_totals.groupby("date_day")["squats"].sum().reset_index()
+        crew_daily_totals["rolling"] = crew_daily_totals["squats"].rolling(7).mean()
+
+    # Crew sections sit below the fold: their aggregates are only computed once
+    # the personal dashboard has been sent. One pass over the CrewStats table,
+    # no Participant objects (each goal starts from the participant's first squat).
+    crew_summary = crew_stats.summary(participants)
+    crew_goal_to_date = crew_summary["goal_to_date"]
+    crew_delta_today = crew_total_squats - crew_goal_to_date
+    crew_goal_full_year = crew_summary["goal_full_year"]
+    crew_completion_pct = (crew_total_squats / crew_goal_full_year) * 100 if crew_goal_full_year else 0
+    active_today = crew_summary["active_today"]
+    best_streak_holder = crew_summary["best_streak"]
+    pace_leader = crew_summary["pace"]
+    best_plank_holder = crew_summary["best_plank"]
+    best_plank_streak_holder = crew_summary["best_plank_streak"]
+    total_plank_leader = crew_summary["total_plank"]
 
+    st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
+    st.markdown(
+        '<div class="section-header"><span class="emoji">🏆</span><h3 style="margin:0">Challenge Collectif 2026</h3></div>',
+        unsafe_allow_html=True,
+    )
+    with st.container(border=True):
+        if mobile_view:
+            hero_cols = [st.container(), st.container()]
+        else:
+            hero_cols = st.columns([2, 1])
 
-elif not is_logged_in:
-    # Login UI already rendered above.
-    pass
+        with hero_cols[0]:
+            st.markdown(
+                f"**🎯 L'objectif :** {SQUAT_JOUR} squats par jour, chaque jour, jusqu'au 31 décembre."
+            )
+            st.caption("On compte les reps, pas les excuses.")
+            st.metric(
+                label="Squats cumulés",
+                value=f"{crew_total_squats:,}".replace(",", " "),
+                delta=f"{crew_delta_today:+d} vs objectif",
+            )
+        with hero_cols[1]:
+            st.markdown(
+                render_radial_progress(
+                    crew_completion_pct,
+                    f"{crew_completion_pct:.1f}%",
+                    "challenge complété",
+                    size=120,
+                    stroke=10,
+                ),
+                unsafe_allow_html=True,
+            )
 
+        crew_metrics = [
+            {
+                "label": "Team en piste",
+                "value": len(participants),
+                "delta": f"{active_today} validés aujourd'hui",
+            },
+            {"label": "Jours restants", "value": DAYS_LEFT},
+            {
+                "label": "Delta collectif",
+                "value": int(crew_delta_today),
+                "help": "Positif = avance cumulative par rapport à l'objectif",
+            },
+            {"label": "Squats cumulés", "value": crew_total_squats},
+        ]
+        render_metric_rows(crew_metrics, per_row=1 if mobile_view else 2)
 
-st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
-st.markdown(
-    '<div class="section-header"><span class="emoji">🏆</span><h3 style="margin:0">Challenge Collectif 2026</h3></div>',
-    unsafe_allow_html=True,
-)
-with st.container(border=True):
-    if mobile_view:
-        hero_cols = [st.container(), st.container()]
-    else:
-        hero_cols = st.columns([2, 1])
-
-    with hero_cols[0]:
-        st.markdown("**🎯 L'objectif :** 20 squats par jour, chaque jour, jusqu'au 31 décembre.")
-        st.caption("On compte les reps, pas les excuses.")
-        st.metric(
-            label="Squats cumulés",
-            value=f"{crew_total_squats:,}".replace(",", " "),
-            delta=f"{crew_delta_today:+d} vs objectif",
-        )
-    with hero_cols[1]:
-        st.markdown(
-            render_radial_progress(
-                crew_completion_pct,
-                f"{crew_completion_pct:.1f}%",
-                "challenge complété",
-                size=120,
-                stroke=10,
-            ),
-            unsafe_allow_html=True,
-        )
+    st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
+    st.markdown(
+        '<div class="section-header"><span class="emoji">⚡</span><h3 style="margin:0">Highlights du jour</h3></div>',
+        unsafe_allow_html=True,
+    )
+    st.caption("Qui brille aujourd'hui dans l'équipe ?")
+    with st.container(border=True):
+        pulse_metrics = [
+            {
+                "label": "♾️ Longest streak",
+                "value": best_streak_holder[0] if best_streak_holder else "—",
+                "delta": (f"{best_streak_holder[1]} jours" if best_streak_holder else None),
+            },
+            {
+                "label": "⚡ Pace leader",
+                "value": pace_leader[0] if pace_leader else "—",
+                "delta": (
+                    f"{round(float(pace_leader[1]), 2)} / jour"
+                    if pace_leader
+                    else None
+                ),
+                "help": "Basé sur la moyenne depuis son premier squat",
+            },
+            {
+                "label": "🕒 Dernière session loggée",
+                "value": last_entry["name"] if last_entry is not None else "Aucun log",
+                "delta": (
+                    f"{int(last_entry['value'])} {'sec gainage' if last_entry['exercise'] == 'PLANK' else 'squats'}"
+                    if last_entry is not None
+                    else None
+                ),
+            },
+        ]
+        render_metric_rows(pulse_metrics, per_row=1 if mobile_view else 3)
 
-    crew_metrics = [
-        {
-            "label": "Team en piste",
-            "value": len(participants),
-            "delta": f"{active_today} validés aujourd'hui",
-        },
-        {"label": "Jours restants", "value": DAYS_LEFT},
-        {
-            "label": "Delta collectif",
-            "value": int(crew_delta_today),
-            "help": "Positif = avance cumulative par rapport à l'objectif",
-        },
-        {"label": "Squats cumulés", "value": crew_total_squats},
-    ]
-    render_metric_rows(crew_metrics, per_row=1 if mobile_view else 2)
+    # Plank highlights
+    st.markdown(
+        '<div class="section-header"><span class="emoji">🪵</span><h4 style="margin:0">Highlights gainage</h4></div>',
+        unsafe_allow_html=True,
+    )
+    st.caption("Qui tient le plus longtemps ?")
+    with st.container(border=True):
 
-st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
-st.markdown(
-    '<div class="section-header"><span class="emoji">⚡</span><h3 style="margin:0">Highlights du jour</h3></div>',
-    unsafe_allow_html=True,
-)
-st.caption("Qui brille aujourd'hui dans l'équipe ?")
-with st.container(border=True):
-    pulse_metrics = [
-        {
-            "label": "♾️ Longest streak",
-            "value": best_streak_holder.name if best_streak_holder else "—",
-            "delta": (
-                f"{best_streak_holder.best_objective_streak} jours" if best_streak_holder else None
-            ),
-        },
-        {
-            "label": "⚡ Pace leader",
-            "value": pace_leader.name if pace_leader else "—",
-            "delta": (
-                f"{round(float(pace_leader.moyenne_squats_par_jour), 2)} / jour"
-                if pace_leader
-                else None
-            ),
-            "help": "Basé sur la moyenne depuis son premier squat",
-        },
-        {
-            "label": "🕒 Dernière session loggée",
-            "value": last_entry["name"] if last_entry is not None else "Aucun log",
-            "delta": (
-                f"{int(last_entry['value'])} {'sec gainage' if last_entry['exercise'] == 'PLANK' else 'squats'}"
-                if last_entry is not None
-                else None
-            ),
-        },
-    ]
-    render_metric_rows(pulse_metrics, per_row=1 if mobile_view else 3)
+        def format_plank_highlight(seconds: int) -> str:
+            if seconds >= 60:
+                mins = seconds // 60
+                secs = seconds % 60
+                return f"{mins}m{secs:02d}s" if secs else f"{mins} min"
+            return f"{seconds} sec"
 
-# Plank highlights
-st.markdown(
-    '<div class="section-header"><span class="emoji">🪵</span><h4 style="margin:0">Highlights gainage</h4></div>',
-    unsafe_allow_html=True,
-)
-st.caption("Qui tient le plus longtemps ?")
-with st.container(border=True):
+        plank_pulse_metrics = [
+            {
+                "label": "💪 Record planche",
+                "value": (
+                    best_plank_holder[0]
+                    if best_plank_holder and best_plank_holder[1] > 0
+                    else "—"
+                ),
+                "delta": (
+                    format_plank_highlight(best_plank_holder[1])
+                    if best_plank_holder and best_plank_holder[1] > 0
+                    else None
+                ),
+            },
+            {
+                "label": "🔥 Streak gainage",
+                "value": (
+                    best_plank_streak_holder[0]
+                    if best_plank_streak_holder and best_plank_streak_holder[1] > 0
+                    else "—"
+                ),
+                "delta": (
+                    f"{best_plank_streak_holder[1]} jours"
+                    if best_plank_streak_holder and best_plank_streak_holder[1] > 0
+                    else None
+                ),
+            },
+            {
+                "label": "⏱️ Total gainage",
+                "value": (
+                    total_plank_leader[0]
+                    if total_plank_leader and total_plank_leader[1] > 0
+                    else "—"
+                ),
+                "delta": (
+                    format_plank_highlight(total_plank_leader[1])
+                    if total_plank_leader and total_plank_leader[1] > 0
+                    else None
+                ),
+            },
+        ]
+        render_metric_rows(plank_pulse_metrics, per_row=1 if mobile_view else 3)
 
-    def format_plank_highlight(seconds: int) -> str:
-        if seconds >= 60:
-            mins = seconds // 60
-            secs = seconds % 60
-            return f"{mins}m{secs:02d}s" if secs else f"{mins} min"
-        return f"{seconds} sec"
+    if not crew_daily_totals.empty:
+        st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
+        st.markdown(
+            '<div class="section-header"><span class="emoji">📊</span><h3 style="margin:0">Volume quotidien</h3></div>',
+            unsafe_allow_html=True,
+        )
+        st.caption("Squats cumulés par jour · La ligne rouge = objectif collectif")
+        with st.container(border=True):
+            def build_trend_fig():
+                trend_fig = px.area(
+                    crew_daily_totals.tail(45),
+                    x="date_day",
+                    y="squats",
+                    title="Volume quotidien de la team",
+                )
+                # Apply gradient fill effect
+                trend_fig.update_traces(
+                    fill="tozeroy",
+                    fillgradient=dict(
+                        type="vertical",
+                        colorscale=[
+                            [0, "rgba(255,171,145,0.1)"],
+                            [0.5, "rgba(255,138,101,0.4)"],
+                            [1, "rgba(255,111,97,0.8)"],
+                        ],
+                    ),
+                    line=dict(color="#ff6f61", width=3),
+                )
+                trend_fig.add_hline(
+                    y=len(participants) * SQUAT_JOUR,
+                    line_dash="dot",
+                    line_color="#e53935",
+                    opacity=0.8,
+                    annotation_text=f"Objectif ({len(participants) * SQUAT_JOUR})",
+                    annotation_position="top right",
+                )
+                trend_fig.update_layout(
+                    xaxis_title="Date",
+                    yaxis_title="Squats cumulés",
+                    margin=dict(l=10, r=10, t=60, b=20),
+                    plot_bgcolor="rgba(0,0,0,0)",
+                    paper_bgcolor="rgba(0,0,0,0)",
+                    showlegend=False,
+                    dragmode=False,
+                )
+                trend_fig.update_xaxes(showgrid=False)
+                trend_fig.update_yaxes(showgrid=True, gridcolor="rgba(255,111,97,0.1)")
+                return trend_fig
 
-    plank_pulse_metrics = [
-        {
-            "label": "💪 Record planche",
-            "value": (
-                best_plank_holder.name
-                if best_plank_holder and best_plank_holder.best_plank_seconds > 0
-                else "—"
-            ),
-            "delta": (
-                format_plank_highlight(best_plank_holder.best_plank_seconds)
-                if best_plank_holder and best_plank_holder.best_plank_seconds > 0
-                else None
-            ),
-        },
-        {
-            "label": "🔥 Streak gainage",
-            "value": (
-                best_plank_streak_holder.name
-                if best_plank_streak_holder and best_plank_streak_holder.best_plank_streak > 0
-                else "—"
-            ),
-            "delta": (
-                f"{best_plank_streak_holder.best_plank_streak} jours"
-                if best_plank_streak_holder and best_plank_streak_holder.best_plank_streak > 0
-                else None
-            ),
-        },
-        {
-            "label": "⏱️ Total gainage",
-            "value": (
-                total_plank_leader.name
-                if total_plank_leader and total_plank_leader.sum_plank_seconds > 0
-                else "—"
-            ),
-            "delta": (
-                format_plank_highlight(total_plank_leader.sum_plank_seconds)
-                if total_plank_leader and total_plank_leader.sum_plank_seconds > 0
-                else None
-            ),
-        },
-    ]
-    render_metric_rows(plank_pulse_metrics, per_row=1 if mobile_view else 3)
+            figure_key = ("crew_trend", daily_totals_version(group_id), len(participants))
+            st.plotly_chart(
+                figure_cache(group_id).get(figure_key, build_trend_fig), width="stretch"
+            )
 
-if not crew_daily_totals.empty:
     st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
     st.markdown(
-        '<div class="section-header"><span class="emoji">📊</span><h3 style="margin:0">Volume quotidien</h3></div>',
+        '<div class="section-header"><span class="emoji">✅</span><h3 style="margin:0">Devoirs du jour</h3></div>',
         unsafe_allow_html=True,
     )
-    st.caption("Squats cumulés par jour · La ligne rouge = objectif collectif")
+    st.caption(f"Qui a validé ses {SQUAT_JOUR} squats aujourd'hui ?")
     with st.container(border=True):
-        trend_fig = px.area(
-            crew_daily_totals.tail(45),
-            x="date_day",
-            y="squats",
-            title="Volume quotidien de la team",
-        )
-        # Apply gradient fill effect
-        trend_fig.update_traces(
-            fill="tozeroy",
-            fillgradient=dict(
-                type="vertical",
-                colorscale=[
-                    [0, "rgba(255,171,145,0.1)"],
-                    [0.5, "rgba(255,138,101,0.4)"],
-                    [1, "rgba(255,111,97,0.8)"],
-                ],
-            ),
-            line=dict(color="#ff6f61", width=3),
-        )
-        trend_fig.add_hline(
-            y=len(participants) * SQUAT_JOUR,
-            line_dash="dot",
-            line_color="#e53935",
-            opacity=0.8,
-            annotation_text=f"Objectif ({len(participants) * SQUAT_JOUR})",
-            annotation_position="top right",
-        )
-        trend_fig.update_layout(
-            xaxis_title="Date",
-            yaxis_title="Squats cumulés",
-            margin=dict(l=10, r=10, t=60, b=20),
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            showlegend=False,
-            dragmode=False,
-        )
-        trend_fig.update_xaxes(showgrid=False)
-        trend_fig.update_yaxes(showgrid=True, gridcolor="rgba(255,111,97,0.1)")
-        st.plotly_chart(trend_fig, width="stretch")
-
-st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
-st.markdown(
-    '<div class="section-header"><span class="emoji">✅</span><h3 style="margin:0">Devoirs du jour</h3></div>',
-    unsafe_allow_html=True,
-)
-st.caption("Qui a validé ses 20 squats aujourd'hui ?")
-with st.container(border=True):
-    devoirs = [
-        f"✅ {participant.name} ({int(participant.sum_squats_done_today)} squats)"
-        for participant in participants_obj.values()
-        if participant.sum_squats_done_today >= SQUAT_JOUR
-    ]
-    if devoirs:
-        st.markdown("\n".join([f"- {entry}" for entry in devoirs]))
-    else:
-        st.info("Personne n'a validé les 20 squats pour l'instant, qui s'y colle ?")
+        done_today = crew_stats.summary_table(participants)["sum_squats_done_today"]
+        devoirs = [
+            f"✅ {name} ({int(count)} squats)"
+            for name, count in done_today.items()
+            if count >= SQUAT_JOUR
+        ]
+        if devoirs:
+            st.markdown("\n".join([f"- {entry}" for entry in devoirs]))
+        else:
+            st.info(
+                f"Personne n'a validé les {SQUAT_JOUR} squats pour l'instant, qui s'y colle ?"
+            )
 
-snapshot = []
-for participant in participants_obj.values():
-    snapshot.append(
+    crew_table = crew_stats.summary_table(participants)
+    leaderboard_df = pd.DataFrame(
         {
-            "Squatteur": participant.name,
-            "Aujourd'hui": int(participant.sum_squats_done_today),
-            "Total": int(participant.sum_squats_done),
-            "Delta vs obj": int(participant.delta_done_vs_objecitf_today),
-            "Moyenne/jour": round(float(participant.moyenne_squats_par_jour), 2),
-            "Streak squats": int(participant.current_objective_streak),
-            "% objectif": round(float(participant.progress_pct_vs_objectif), 1),
-            "Gainage (sec)": int(participant.sum_plank_seconds),
-            "Streak gainage": int(participant.current_plank_streak),
-            "Best plank": int(participant.best_plank_seconds),
+            "Squatteur": crew_table.index,
+            "Aujourd'hui": crew_table["sum_squats_done_today"].astype(int),
+            "Total": crew_table["sum_squats_done"].astype(int),
+            "Delta vs obj": crew_table["delta_done_vs_objecitf_today"].astype(int),
+            "Moyenne/jour": crew_table["moyenne_squats_par_jour"].astype(float).round(2),
+            "Streak squats": crew_table["current_objective_streak"].astype(int),
+            "% objectif": crew_table["progress_pct_vs_objectif"].astype(float).round(1),
+            "Gainage (sec)": crew_table["sum_plank_seconds"].astype(int),
+            "Streak gainage": crew_table["current_plank_streak"].astype(int),
+            "Best plank": crew_table["best_plank_seconds"].astype(int),
         }
-    )
+    ).reset_index(drop=True)
+    if not leaderboard_df.empty:
+        leaderboard_df = leaderboard_df.sort_values("Total", ascending=False)
+        st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
+        st.markdown(
+            '<div class="section-header"><span class="emoji">🏅</span><h3 style="margin:0">Classement</h3></div>',
+            unsafe_allow_html=True,
+        )
+        st.caption("Qui mène la danse ?")
+        with st.container(border=True):
+            st.dataframe(
+                leaderboard_df,
+                # width="stretch",
+                hide_index=True,
+            )
+            st.caption("Mise à jour automatique à chaque nouvelle session.")
 
-leaderboard_df = pd.DataFrame(snapshot)
-if not leaderboard_df.empty:
-    leaderboard_df = leaderboard_df.sort_values("Total", ascending=False)
-    st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
-    st.markdown(
-        '<div class="section-header"><span class="emoji">🏅</span><h3 style="margin:0">Classement</h3></div>',
-        unsafe_allow_html=True,
+    return crew_summary, leaderboard_df
+
+
+@st.fragment
+def render_live_sections(active_user):
+    """Logging forms, personal dashboard and crew sections, as one fragment.
+
+    A form submit reruns only this function, not the whole script: cookies,
+    login, CSS and the LLM motivation below are left alone. The forms come
+    first, so the write-through lands before any stats are read.
+    Returns (participant_obj, crew_summary, leaderboard_df).
+    """
+    if active_user:
+        render_logging_forms(active_user)
+
+    # Shared, versioned dataset snapshot (see config.SquatDataCache); CrewStats
+    # and Participants are cached on its version, so unchanged data is free
+    session_snapshot = fetch_session_snapshot(group_id)
+    crew_stats = cached_crew_stats(
+        session_snapshot,
+        days_left=DAYS_LEFT,
+        squat_objectif_quotidien=SQUAT_JOUR,
+        names=participants,
     )
-    st.caption("Qui mène la danse ?")
-    with st.container(border=True):
-        st.dataframe(
-            leaderboard_df,
-            # width="stretch",
-            hide_index=True,
+    participant_obj = None
+    if active_user:
+        # A logged session bumps only its writer's version, so the other
+        # participants keep their cached entry
+        participant_obj = participant_cache(group_id).get(
+            active_user, session_snapshot, crew_stats
         )
-        st.caption("Mise à jour automatique à chaque nouvelle session.")
+        render_personal_dashboard(participant_obj, session_snapshot)
+
+    crew_summary, leaderboard_df = render_crew_sections(session_snapshot, crew_stats)
+    return participant_obj, crew_summary, leaderboard_df
+
+
+# Used later to display the LLM motivation block.
+# Defined unconditionally to avoid static-analysis "possibly unbound" warnings.
+
+
+if not is_logged_in:
+    st.title("🍑 Squat App 🍑")
+    st.subheader("New year new me")
+    st.caption("La persévérance, secret de tous les triomphes. - Victor Hugo")
 
+    st.subheader("Choisis ton nom pour te connecter")
+    st.caption("Clique sur ton nom, on te prépare le formulaire perso juste après 👇")
+    login_container = st.container()
+    login_container.markdown('<div class="login-grid">', unsafe_allow_html=True)
+    selection_cols = login_container.columns(2 if mobile_view else 3)
+    for idx, name in enumerate(participants):
+        col = selection_cols[idx % len(selection_cols)]
+        if col.button(f"{name} 🔓", key=f"login_{name}", width="stretch"):
+
+            st.session_state["pending_loading"] = name
+            st.rerun()
+    login_container.markdown("</div>", unsafe_allow_html=True)
+
+
+if is_logged_in:
+    # Keep the active user first in displays.
+    participant_order = list(participants)
+    if active_user in participant_order:
+        participant_order.remove(active_user)
+        participant_order.insert(0, active_user)
+
+    dict_variant_title = [
+        f"Bah te revoila {active_user}",
+        f"Bravo {active_user}",
+        f"Content de te revoir {active_user} !",
+        f"Allez {active_user}, on y retourne !",
+        f"Let's go {active_user} !",
+        f"Re-bienvenue {active_user} !",
+        f"Ah bah enfin {active_user} !",
+        f"Tu reviens pour plus de squats {active_user} ?",
+        # f"Alors? {active_user}, prêt.e à en découdre ?",
+        f"Ça squat l'appli {active_user} ?",
+        f"T'es la star que tu penses être {active_user}",
+    ]
+
+    title_text = random.choice(dict_variant_title)
+
+    st.title(title_text)
+
+    # st.title(f"Allez {active_user}, t'es pas une merde!! ")
+
+    if st.button("Pas toi ? Clique ici pour changer de squatteur", key="change_user_btn"):
+        # clear_login_cookie()
+        st.session_state["pending_loading"] = "LOGOUT"
+        active_user = None
+        is_logged_in = False
+        participant_obj = None
+        st.rerun()
+
+    placeholder = st.empty()
+    # Fallback until the motivation message is ready (filled at the very end)
+    fallback_motivation = f"**{active_user}**, {random.choice(motivate)}"
+    placeholder.markdown(fallback_motivation)
+    st.divider()
+
+    st.write(f"{active_user}, maintenant tu peux directement enregistrer tes squats ici :")
+
+
+
+participant_obj, crew_summary, leaderboard_df = render_live_sections(
+    active_user if is_logged_in else None
+)
+active_today = crew_summary["active_today"]
 
 st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
 st.caption(f"🍑 Squat App v0.1.6 · {today.strftime('%d/%m/%Y-%H:%M')}")
@@ -1344,7 +1313,7 @@ if active_user is not None and participant_obj is not None:
         )
 
         # User rank + small rivalry context
-        user_count = int(participants_obj[active_name].sum_squats_done_today)
+        user_count = int(participant_obj.sum_squats_done_today)
         user_rank = next(
             (idx + 1 for idx, (name, _) in enumerate(team_today) if name == active_name),
             None,
@@ -1391,10 +1360,12 @@ if active_user is not None and participant_obj is not None:
 
         return "\n".join(lines)
 
-    team_context = build_team_context_for_prompt(participant_obj.name)
+    def build_motivation_prompt() -> str:
+        """Full LLM prompt; only built when the motivation cache misses."""
+        team_context = build_team_context_for_prompt(participant_obj.name)
 
-    # st.text(team_context)
-    motivation_prompt = f""" Tu encourages {participant_obj.name} à faire des squats. {get_random_half_facts(participant_obj.name)}
+        # st.text(team_context)
+        motivation_prompt = f""" Tu encourages {participant_obj.name} à faire des squats. {get_random_half_facts(participant_obj.name)}
 
 Contexte challenge : objectif {SQUAT_JOUR} squats/jour jusqu'au {end_of_year.strftime('%Y-%m-%d')} ({DAYS_LEFT} jours restants). 
 
@@ -1414,15 +1385,17 @@ Stats complètes (données figées au {today_snapshot} UTC+1) :
 - Squats des autres membres aujourd'hui : {active_today} sur {len(participants)} ont déjà validé leurs {SQUAT_JOUR} squats.
 - Secondes de gainage cumulées depuis le début de l'année : {participant_obj.sum_plank_seconds} sec, soit en moyenne {participant_obj.sum_plank_seconds / participant_obj.nombre_jours_depuis_debut:.2f} sec/jour (temps de gainage aujourd'hui : {participant_obj.sum_plank_seconds_today} sec.
 """
+        return motivation_prompt
 
-    # Use cached LLM call - same user+date gets cached response (huge LCP improvement)
+    # Page is already rendered: the placeholder only swaps the fallback out
     if participant_obj.name in NO_AI_USERS:
         placeholder.markdown(get_no_ai_message(participant_obj.name))
     else:
-        placeholder.markdown(
-            get_motivation_cached(
-                motivation_prompt,
-                participant_obj.name,
-                int(participant_obj.sum_squats_done_today),
-            )
+        show_motivation(
+            placeholder,
+            build_motivation_prompt,
+            participant_obj.name,
+            int(participant_obj.sum_squats_done_today),
+            int(participant_obj.current_objective_streak),
+            fallback_motivation,
         )
@@ -0,0 +1,270 @@
+"""One-shot maintenance for the squats tables.
+
+    python backfill.py --create-index   # add the year/date GSI used by load_all
+    python backfill.py --create-group-index  # add the group_year GSIs (other groups)
+    python backfill.py --create-rollup  # create the squats_daily rollup table
+    python backfill.py --rebuild-rollup # recompute this year's rollup from sessions
+    python backfill.py --rebuild-rollup --group autre-groupe
+    python backfill.py --create-groups  # create squats_groups, seeded from groups.json
+    python backfill.py                  # add year/date_day to legacy items
+    python backfill.py --dry-run        # count legacy items without writing
+    python backfill.py --segments 8     # same, with a parallel scan
+"""
+
+import argparse
+from datetime import datetime
+
+from boto3.dynamodb.conditions import Attr
+
+from config import (
+    DAILY_GROUP_INDEX_NAME,
+    DAILY_TABLE_NAME,
+    DAILY_YEAR_INDEX_NAME,
+    DEFAULT_GROUP,
+    GROUP_INDEX_NAME,
+    GROUPS_TABLE_NAME,
+    YEAR_INDEX_NAME,
+    _dynamodb,
+    _load_groups_file,
+    _load_year_items,
+    _normalize_items,
+    _partition_key,
+    _rollup_name,
+    daily_totals_from_sessions,
+    get_today,
+    load_daily_rollup,
+    logger,
+    mark_legacy_backfilled,
+    table_daily,
+    table_squats,
+    _scan_items,
+)
+
+
+def _create_index(table, index_name, hash_key, hash_type, range_key):
+    """Add a GSI (hash_key HASH, range_key RANGE) to table unless it exists."""
+    existing = {index["IndexName"] for index in table.global_secondary_indexes or []}
+    if index_name in existing:
+        logger.info(f"Index {index_name} already exists")
+        return False
+
+    update_kwargs = {
+        "AttributeDefinitions": [
+            {"AttributeName": hash_key, "AttributeType": hash_type},
+            {"AttributeName": range_key, "AttributeType": "S"},
+        ],
+        "GlobalSecondaryIndexUpdates": [
+            {
+                "Create": {
+                    "IndexName": index_name,
+                    "KeySchema": [
+                        {"AttributeName": hash_key, "KeyType": "HASH"},
+                        {"AttributeName": range_key, "KeyType": "RANGE"},
+                    ],
+                    "Projection": {"ProjectionType": "ALL"},
+                }
+            }
+        ],
+    }
+    if table.billing_mode_summary is None:
+        # Provisioned tables need explicit throughput for the new index
+        update_kwargs["GlobalSecondaryIndexUpdates"][0]["Create"][
+            "ProvisionedThroughput"
+        ] = {"ReadCapacityUnits": 5, "WriteCapacityUnits": 5}
+    table.update(**update_kwargs)
+    return True
+
+
+def create_year_index():
+    """Create the GSI (year HASH, date RANGE) queried by config.load_all."""
+    return _create_index(table_squats, YEAR_INDEX_NAME, "year", "N", "date")
+
+
+def create_group_indexes():
+    """Create the group_year GSIs holding the other groups' sessions and rollup rows.
+
+    Returns the names of the indexes created. DynamoDB builds one index per
+    table at a time: rerun once the first one is active if the second fails.
+    """
+    created = []
+    if _create_index(table_squats, GROUP_INDEX_NAME, "group_year", "S", "date"):
+        created.append(GROUP_INDEX_NAME)
+    if _create_index(
+        table_daily, DAILY_GROUP_INDEX_NAME, "group_year", "S", "date_day"
+    ):
+        created.append(DAILY_GROUP_INDEX_NAME)
+    return created
+
+
+def backfill_year_attributes(dry_run=False, segments=None):
+    """Add "year" and "date_day" to every item missing one of them.
+
+    Returns the number of items updated (or that would be, with dry_run).
+    """
+    key_names = [key["AttributeName"] for key in table_squats.key_schema]
+    updated = 0
+    # Other groups' items have no "year" on purpose (see config._partition_key)
+    legacy_filter = (
+        Attr("year").not_exists() | Attr("date_day").not_exists()
+    ) & Attr("group").not_exists()
+    for item in _scan_items(segments, FilterExpression=legacy_filter):
+        try:
+            date_value = datetime.fromisoformat(item["date"])
+        except (KeyError, TypeError, ValueError):
+            logger.warning(f"Skipping item without a valid date: {item}")
+            continue
+
+        updated += 1
+        if dry_run:
+            continue
+        table_squats.update_item(
+            Key={name: item[name] for name in key_names},
+            UpdateExpression="SET #y = :year, date_day = :date_day",
+            ExpressionAttributeNames={"#y": "year"},
+            ExpressionAttributeValues={
+                ":year": int(date_value.year),
+                ":date_day": date_value.date().isoformat(),
+            },
+        )
+    if not dry_run:
+        # Lets load_all() skip its legacy scan from now on, in every process
+        mark_legacy_backfilled()
+    return updated
+
+
+def create_daily_table():
+    """Create the per-day rollup table maintained by update_daily_rollup."""
+    existing = {table.name for table in _dynamodb.tables.all()}
+    if DAILY_TABLE_NAME in existing:
+        logger.info(f"Table {DAILY_TABLE_NAME} already exists")
+        return False
+
+    _dynamodb.create_table(
+        TableName=DAILY_TABLE_NAME,
+        KeySchema=[
+            {"AttributeName": "name", "KeyType": "HASH"},
+            {"AttributeName": "date_day", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "name", "AttributeType": "S"},
+            {"AttributeName": "date_day", "AttributeType": "S"},
+            {"AttributeName": "year", "AttributeType": "N"},
+            {"AttributeName": "group_year", "AttributeType": "S"},
+        ],
+        GlobalSecondaryIndexes=[
+            {
+                "IndexName": DAILY_YEAR_INDEX_NAME,
+                "KeySchema": [
+                    {"AttributeName": "year", "KeyType": "HASH"},
+                    {"AttributeName": "date_day", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+            {
+                "IndexName": DAILY_GROUP_INDEX_NAME,
+                "KeySchema": [
+                    {"AttributeName": "group_year", "KeyType": "HASH"},
+                    {"AttributeName": "date_day", "KeyType": "RANGE"},
+                ],
+                "Projection": {"ProjectionType": "ALL"},
+            },
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    ).wait_until_exists()
+    return True
+
+
+def _rollup_keys(daily, group):
+    return {
+        (_rollup_name(group, str(name)), date_day.strftime("%Y-%m-%d"))
+        for name, date_day in zip(daily["name"], daily["date_day"])
+    }
+
+
+def rebuild_daily_rollup(year=None, group=DEFAULT_GROUP):
+    """Overwrite one year of a group's rollup rows with totals computed from sessions.
+
+    Run it after creating the table, or if a failed write left it out of sync.
+    Rows of days without any session left are deleted. Returns the number
+    of rows written.
+    """
+    year = year or get_today().year
+    key_name, key_value = _partition_key(group, year)
+    sessions = _normalize_items(_load_year_items(year, group))
+    sessions = sessions[sessions["date"].dt.year == year]
+    daily = daily_totals_from_sessions(sessions)
+    stale = _rollup_keys(load_daily_rollup(year, group), group) - _rollup_keys(
+        daily, group
+    )
+    with table_daily.batch_writer() as batch:
+        for name, date_day in sorted(stale):
+            batch.delete_item(Key={"name": name, "date_day": date_day})
+        for row in daily.itertuples(index=False):
+            batch.put_item(
+                Item={
+                    "name": _rollup_name(group, row.name),
+                    "date_day": row.date_day.strftime("%Y-%m-%d"),
+                    key_name: key_value,
+                    "squats": int(row.squats),
+                    "plank_seconds": int(row.plank_seconds),
+                    "sessions": int(row.sessions),
+                }
+            )
+    return len(daily)
+
+
+def create_groups_table():
+    """Create the squats_groups table and seed it from groups.json."""
+    existing = {table.name for table in _dynamodb.tables.all()}
+    if GROUPS_TABLE_NAME in existing:
+        logger.info(f"Table {GROUPS_TABLE_NAME} already exists")
+        return False
+
+    table = _dynamodb.create_table(
+        TableName=GROUPS_TABLE_NAME,
+        KeySchema=[{"AttributeName": "group", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "group", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    table.wait_until_exists()
+    with table.batch_writer() as batch:
+        for record in _load_groups_file():
+            batch.put_item(Item=record)
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--create-index", action="store_true")
+    parser.add_argument("--create-group-index", action="store_true")
+    parser.add_argument("--create-groups", action="store_true")
+    parser.add_argument("--create-rollup", action="store_true")
+    parser.add_argument("--rebuild-rollup", action="store_true")
+    parser.add_argument("--year", type=int, default=None)
+    parser.add_argument("--group", default=DEFAULT_GROUP)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument(
+        "--segments", type=int, default=None, help="parallel scan segments"
+    )
+    args = parser.parse_args()
+
+    if args.create_index:
+        created = create_year_index()
+        print(f"Index {YEAR_INDEX_NAME}: {'created' if created else 'already there'}")
+    elif args.create_group_index:
+        created = create_group_indexes()
+        print(f"Indexes created: {', '.join(created) or 'none, already there'}")
+    elif args.create_groups:
+        created = create_groups_table()
+        print(f"Table {GROUPS_TABLE_NAME}: {'created' if created else 'already there'}")
+    elif args.create_rollup:
+        created = create_daily_table()
+        print(f"Table {DAILY_TABLE_NAME}: {'created' if created else 'already there'}")
+    elif args.rebuild_rollup:
+        count = rebuild_daily_rollup(args.year, args.group)
+        print(f"{count} daily rows written to {DAILY_TABLE_NAME}")
+    else:
+        count = backfill_year_attributes(
+            dry_run=args.dry_run, segments=args.segments
+        )
+        print(f"{count} items {'to backfill' if args.dry_run else 'backfilled'}")
@@ -0,0 +1,98 @@
+"""Memory and groupby time of the session frame: compact schema vs object/int64.
+
+    python bench/memory_bench.py
+    python bench/memory_bench.py --rows 1000000 --names 100
+
+Builds synthetic DynamoDB items, normalizes them with _normalize_items()
+(SESSION_DTYPES: categoricals, int16/int32, date_day as datetime64) and
+compares against the same frame in the previous layout (object strings,
+int64 counts, date_day as an ISO string). No DynamoDB access.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("AWS_DEFAULT_REGION", "eu-central-1")
+os.environ.setdefault("MISTRAL_API_KEY", "bench")
+
+import config  # noqa: E402
+
+
+def _items(rows, names, seed=0):
+    rng = np.random.default_rng(seed)
+    origin = pd.Timestamp(config.get_today().year, 1, 1)
+    offsets = np.sort(rng.integers(0, 250 * 86400, rows))
+    is_plank = rng.random(rows) < 0.3
+    values = rng.integers(5, 40, rows)
+    items = []
+    for offset, plank, value, name in zip(
+        offsets, is_plank, values, rng.integers(0, names, rows)
+    ):
+        at = origin + pd.Timedelta(seconds=int(offset))
+        items.append(
+            {
+                "name": f"P{name:03d}",
+                "date": at.isoformat(),
+                "exercise": "PLANK" if plank else "SQUAT",
+                "value": int(value * 3 if plank else value),
+                "unit": "seconds" if plank else "reps",
+                "squats": 0 if plank else int(value),
+                "date_day": at.date().isoformat(),
+                "year": at.year,
+            }
+        )
+    return items
+
+
+def _previous_layout(df):
+    """The frame as load_all() returned it before SESSION_DTYPES."""
+    previous = df.astype(
+        {
+            "name": object,
+            "exercise": object,
+            "unit": object,
+            "squats": "int64",
+            "value": "int64",
+            "plank_seconds": "int64",
+            "year": "int64",
+        }
+    )
+    previous["date_day"] = previous["date"].dt.date.astype(str)
+    return previous
+
+
+def _groupby_ms(df, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        df.groupby(["date_day", "name"], observed=True)["squats"].sum()
+        df.groupby(["name", "exercise"], observed=True)["value"].agg(["sum", "max"])
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--names", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    compact = config._normalize_items(_items(args.rows, args.names))
+    previous = _previous_layout(compact)
+    print(f"{args.rows} sessions, {args.names} names")
+    print(f"{'layout':>9} {'bytes/row':>10} {'total MB':>9} {'groupby ms':>11}")
+    for label, df in (("previous", previous), ("compact", compact)):
+        size = df.memory_usage(deep=True).sum()
+        print(
+            f"{label:>9} {size / len(df):>10.0f} {size / 2**20:>9.1f} "
+            f"{_groupby_ms(df, args.repeat):>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
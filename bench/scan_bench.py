@@ -0,0 +1,151 @@
+"""Sequential vs parallel segmented scan of the squats table.
+
+    python bench/scan_bench.py                          # moto, 10k/100k items
+    python bench/scan_bench.py --sizes 10000 100000 --segments 1 4 8
+    python bench/scan_bench.py --sizes 10000 100000 --latency-ms 30
+    python bench/scan_bench.py --endpoint-url http://localhost:8000   # DynamoDB Local
+    python bench/scan_bench.py --endpoint-url http://localhost:8000 --sizes 1000000
+
+Seeds a local stand-in (moto by default, DynamoDB Local with --endpoint-url)
+with synthetic sessions, then times _scan_items() + _normalize_items() for
+each segment count. Never point it at the real table: it creates and fills
+"squats" on the given endpoint.
+
+Use DynamoDB Local for the speedup figures. moto answers in-process under
+the GIL and returns a whole scan as one page (no 1 MB limit), so segments
+have nothing to overlap there; --latency-ms adds a sleep before every Scan
+request to stand in for the round trip. moto is also slow: about 10 s per
+10k-item scan, so the 1M tier is only practical against DynamoDB Local.
+
+Measured with moto (best of --repeat 1, seconds for segments 1 / 4 / 8):
+    10k items                 9.63 / 10.77 / 11.11
+    10k items, --latency-ms 30  10.62 / 13.52 / 15.27
+    100k items               154 / 212 (8 segments not run)
+These show the thread overhead under the GIL, not the DynamoDB speedup;
+no DynamoDB Local or 1M figure has been measured yet.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+NAMES = [f"P{i:02d}" for i in range(40)]
+
+
+def _configure(endpoint_url):
+    """Dummy credentials (and the local endpoint) before config creates its tables."""
+    os.environ.setdefault("AWS_DEFAULT_REGION", "eu-central-1")
+    os.environ.setdefault("MISTRAL_API_KEY", "bench")
+    os.environ["ACCESS_KEY"] = os.environ["AWS_ACCESS_KEY_ID"] = "bench"
+    os.environ["SECRET_ACCESS_KEY"] = os.environ["AWS_SECRET_ACCESS_KEY"] = "bench"
+    if endpoint_url:
+        os.environ["AWS_ENDPOINT_URL_DYNAMODB"] = endpoint_url
+
+
+def _add_scan_latency(seconds):
+    """Sleep before every Scan request, in every boto3 session created from now on."""
+    import boto3
+
+    original_init = boto3.session.Session.__init__
+
+    def init(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
+        self.events.register(
+            "before-call.dynamodb.Scan", lambda **_: time.sleep(seconds)
+        )
+
+    boto3.session.Session.__init__ = init
+
+
+def _create_table(config):
+    existing = {table.name for table in config._dynamodb.tables.all()}
+    if config.table_squats.name in existing:
+        config.table_squats.delete()
+        config.table_squats.wait_until_not_exists()
+    config._dynamodb.create_table(
+        TableName=config.table_squats.name,
+        KeySchema=[
+            {"AttributeName": "name", "KeyType": "HASH"},
+            {"AttributeName": "date", "KeyType": "RANGE"},
+        ],
+        AttributeDefinitions=[
+            {"AttributeName": "name", "AttributeType": "S"},
+            {"AttributeName": "date", "AttributeType": "S"},
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    ).wait_until_exists()
+
+
+def _seed(config, start, stop, rng):
+    """Add sessions start..stop-1 (unique dates, so no key collides)."""
+    origin = datetime(config.get_today().year, 1, 1)
+    with config.table_squats.batch_writer() as batch:
+        for i in range(start, stop):
+            exercise = "PLANK" if rng.random() < 0.3 else "SQUAT"
+            value = rng.randint(5, 40)
+            batch.put_item(
+                Item=config.build_squat_item(
+                    rng.choice(NAMES),
+                    value * 3 if exercise == "PLANK" else value,
+                    exercise=exercise,
+                    at=origin + timedelta(seconds=i * 7 + rng.random()),
+                )
+            )
+
+
+def _time_scan(config, segments, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items = list(
+            config._scan_items(
+                segments, FilterExpression=config._group_filter(config.DEFAULT_GROUP)
+            )
+        )
+        df = config._normalize_items(items)
+        best = min(best, time.perf_counter() - start)
+    return best, len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--segments", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--endpoint-url", help="DynamoDB Local endpoint (default: moto)")
+    args = parser.parse_args()
+
+    _configure(args.endpoint_url)
+    if args.latency_ms:
+        _add_scan_latency(args.latency_ms / 1000)
+    import config
+
+    _create_table(config)
+    rng = random.Random(0)
+    seeded = 0
+    print(f"{'items':>9} {'segments':>8} {'seconds':>8} {'speedup':>8}")
+    for size in sorted(args.sizes):
+        _seed(config, seeded, size, rng)
+        seeded = size
+        baseline = None
+        for segments in args.segments:
+            seconds, rows = _time_scan(config, segments, args.repeat)
+            assert rows == size, f"scan returned {rows} of {size} rows"
+            baseline = baseline or seconds
+            print(f"{size:>9} {segments:>8} {seconds:>8.2f} {baseline / seconds:>7.2f}x")
+
+
+if __name__ == "__main__":
+    if any(arg.startswith("--endpoint-url") for arg in sys.argv):
+        main()
+    else:
+        from moto import mock_aws
+
+        with mock_aws():
+            main()
@@ -0,0 +1,82 @@
+"""Streaks of a whole crew: the old per-participant iterrows loop vs CrewStats._streaks.
+
+    python bench/streak_bench.py
+    python bench/streak_bench.py --names 100 --days 365
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("AWS_DEFAULT_REGION", "eu-central-1")
+os.environ.setdefault("MISTRAL_API_KEY", "bench")
+
+from config import CrewStats  # noqa: E402
+from tests.test_streaks import iterrows_streaks  # noqa: E402
+
+
+def _best_of(function, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--names", type=int, default=12)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    today = date(2026, 12, 31)
+    days = pd.date_range(end=today, periods=args.days, freq="D")
+    rng = np.random.default_rng(0)
+    wide = pd.DataFrame(
+        rng.choice([0, 10, 20, 35], size=(args.days, args.names)),
+        index=days,
+        columns=[f"P{i:03d}" for i in range(args.names)],
+    )
+    first_days = pd.Series(days[0], index=wide.columns)
+    # Squat goal and plank minimum, one series of each per participant
+    thresholds = [20, 30]
+
+    def loop():
+        return [
+            iterrows_streaks(
+                pd.DataFrame({"date": days.date, "value": wide[name].to_numpy()}),
+                "value",
+                threshold,
+                today,
+            )
+            for threshold in thresholds
+            for name in wide.columns
+        ]
+
+    def vectorized():
+        both = pd.concat([wide, wide], axis=1, keys=["SQUAT", "PLANK"])
+        return CrewStats._streaks(
+            both,
+            np.repeat(thresholds, args.names),
+            pd.concat([first_days, first_days], keys=["SQUAT", "PLANK"]),
+        )
+
+    loop_ms, expected = _best_of(loop, args.repeat)
+    vectorized_ms, (current, best) = _best_of(vectorized, args.repeat)
+    assert [streaks["current"] for streaks in expected] == current.tolist()
+    assert [streaks["best"] for streaks in expected] == best.tolist()
+    print(f"{args.names} participants x {args.days} days, squat + plank streaks")
+    print(f"iterrows loop   {loop_ms:8.1f} ms")
+    print(f"vectorized      {vectorized_ms:8.1f} ms  ({loop_ms / vectorized_ms:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
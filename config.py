@@ -1,7 +1,18 @@
 import boto3
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
 from dotenv import load_dotenv
+import hashlib
+import json
 import os
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
 import logging
 
@@ -24,19 +35,80 @@ def get_end_of_year():
     return datetime(get_today().year, 12, 31)
 
 
-def save_new_squat(name, value, *, exercise: str = "SQUAT", unit: str | None = None):
-    """
-    Backward compatible save function.
-    - existing callers: save_new_squat(name, squats) still works (defaults to SQUAT)
-    - new usage: save_new_squat(name, seconds, exercise="PLANK", unit="seconds")
+# Exercise registry: unit stored on items, default daily goal, and the daily
+# amount from which a day counts towards the streak. CrewStats aggregates every
+# exercise in the same pass, so a new one only needs register_exercise().
+EXERCISES = {}
+# Unit stored for each known exercise (kept in sync by register_exercise)
+EXERCISE_UNITS = {}
+
+
+def register_exercise(name, unit, daily_goal, streak_threshold=None):
+    """Add (or update) an exercise; streak_threshold defaults to daily_goal."""
+    name = name.upper()
+    EXERCISES[name] = {
+        "name": name,
+        "unit": unit,
+        "daily_goal": int(daily_goal),
+        "streak_threshold": int(
+            daily_goal if streak_threshold is None else streak_threshold
+        ),
+    }
+    EXERCISE_UNITS[name] = unit
+    return EXERCISES[name]
+
+
+register_exercise("SQUAT", "reps", daily_goal=20)
+# A plank day counts towards the streak from 30 seconds
+register_exercise("PLANK", "seconds", daily_goal=30)
+
+# The original crew. Its items keep the historical layout (no "group"
+# attribute); every other group is partitioned apart, see _partition_key().
+DEFAULT_GROUP = "gros-boule"
+# Group ids end up in file paths, cache keys and DynamoDB keys: lowercase slugs only
+GROUP_ID_PATTERN = re.compile(r"[a-z0-9][a-z0-9-]{0,62}")
+
+
+def check_group_id(group):
+    """Return group if it is a well-formed group id, else raise ValueError."""
+    if not isinstance(group, str) or not GROUP_ID_PATTERN.fullmatch(group):
+        raise ValueError(f"Invalid group id: {group!r}")
+    return group
+
+
+def _partition_key(group, year):
+    """(attribute, value) of the index partition holding a group's year of items.
+
+    The default group stays on the "year" partition. Other groups' items carry
+    "group_year" instead of "year", so each (sparse) index only ever holds the
+    rows of its own groups and a query never reads another group's data.
     """
-    now = datetime.utcnow() + timedelta(hours=1)
+    if group == DEFAULT_GROUP:
+        return "year", int(year)
+    return "group_year", f"{group}#{int(year)}"
+
+
+def _item_group(item):
+    return item.get("group", DEFAULT_GROUP)
+
+
+def build_squat_item(
+    name,
+    value,
+    *,
+    exercise: str = "SQUAT",
+    unit: str | None = None,
+    at=None,
+    group=DEFAULT_GROUP,
+):
+    """Build the DynamoDB item for one session (at defaults to now, UTC+1)."""
+    now = at or datetime.utcnow() + timedelta(hours=1)
     iso = now.isoformat()
     date_day = now.date().isoformat()
 
     exercise = (exercise or "SQUAT").upper()
     if unit is None:
-        unit = "seconds" if exercise == "PLANK" else "reps"
+        unit = EXERCISE_UNITS.get(exercise, "reps")
 
     new_item = {
         "name": name,
@@ -45,8 +117,11 @@ def save_new_squat(name, value, *, exercise: str = "SQUAT", unit: str | None = N
         "value": int(value),
         "unit": unit,
         "date_day": date_day,
-        "year": int(now.year),
     }
+    key_name, key_value = _partition_key(group, now.year)
+    new_item[key_name] = key_value
+    if group != DEFAULT_GROUP:
+        new_item["group"] = group
 
     # Keep legacy "squats" attribute so existing charts/Participant logic keep working
     if exercise == "SQUAT":
@@ -54,266 +129,565 @@ def save_new_squat(name, value, *, exercise: str = "SQUAT", unit: str | None = N
     else:
         # Keep squats present but 0 to simplify aggregation
         new_item["squats"] = 0
-
-    table_squats.put_item(Item=new_item)
     return new_item
 
 
-class Participant:
-    def __init__(self, name, df, days_left, squat_objectif_quotidien=20):
-        """
-        Initialise un participant avec ses statistiques.
-        :param name: Nom du participant
-        :param df: DataFrame contenant les données ('name', 'squats', 'date')
-        :param squat_objectif: Objectif de squats à atteindre
-        """
-        self.name = name
-        self.squat_objectif_quotidien = squat_objectif_quotidien
+def save_new_squat(
+    name,
+    value,
+    *,
+    exercise: str = "SQUAT",
+    unit: str | None = None,
+    group=DEFAULT_GROUP,
+):
+    """
+    Backward compatible save function.
+    - existing callers: save_new_squat(name, squats) still works (defaults to SQUAT)
+    - new usage: save_new_squat(name, seconds, exercise="PLANK", unit="seconds")
+    - other challenge groups: save_new_squat(name, squats, group="...")
+    """
+    return SquatWriter(synchronous=True, group=group).add(
+        name, value, exercise=exercise, unit=unit
+    )
 
-        # Filtrer les données du participant
-        self.df = df[df["name"] == name].copy()
-        self.df["date"] = pd.to_datetime(
-            self.df["date"]
-        ).dt.date  # Garder seulement la date
-
-        # Calculs des statistiques
-        self.sum_squats_done = self.df["squats"].sum()
-        # sum squats aujourdhui
-        today = get_today()
-        self.sum_squats_done_today = self.df[self.df["date"] == today.date()][
-            "squats"
-        ].sum()
-        self.premier_squat_date = (
-            self.df["date"].min() if not self.df.empty else datetime.now().date()
-        )
-        self.squats_restants = days_left * squat_objectif_quotidien
-
-        self.objectif_sum_squat = self._objectif_sum_squat()
-        self.nombre_jours_depuis_debut = self._nombre_jours_depuis_debut()
-        self.sum_squat_should_be_done_today = (
-            self.nombre_jours_depuis_debut * squat_objectif_quotidien
-        )
-        self.delta_done_vs_objecitf_today = (
-            self.sum_squats_done - self.sum_squat_should_be_done_today
-        )
-        self.moyenne_squats_par_jour = (
-            self.sum_squats_done / self.nombre_jours_depuis_debut
-            if self.nombre_jours_depuis_debut > 0
-            else 0
-        )
-        self.sum_squats_hier = self._yesterday_squats()
-        self.sessions_logged = len(self.df)
-        self.daily_totals = self._build_daily_totals()
-        streaks = self._compute_streaks()
-        self.current_objective_streak = streaks["current"]
-        self.best_objective_streak = streaks["best"]
-        (
-            self.weekly_total,
-            self.previous_week_total,
-            self.weekly_delta,
-        ) = self._weekly_totals()
-        self.projected_year_total = self._projected_sum()
-        self.progress_pct_vs_objectif = (
-            (self.sum_squats_done / self.objectif_sum_squat) * 100
-            if self.objectif_sum_squat
-            else 0
-        )
-        self.last_activity_date = self.df["date"].max() if not self.df.empty else None
-        self.is_active_today = self.sum_squats_done_today > 0
 
-        # Plank stats (using plank_seconds column from load_all)
-        self.sum_plank_seconds = (
-            int(self.df["plank_seconds"].sum())
-            if "plank_seconds" in self.df.columns
-            else 0
-        )
-        self.sum_plank_seconds_today = (
-            int(self.df[self.df["date"] == today.date()]["plank_seconds"].sum())
-            if "plank_seconds" in self.df.columns
-            else 0
-        )
-        self.best_plank_seconds = (
-            int(self.df["plank_seconds"].max())
-            if "plank_seconds" in self.df.columns and not self.df.empty
-            else 0
-        )
-
-        # Plank streaks and advanced stats
-        self.plank_daily_totals = self._build_plank_daily_totals()
-        plank_streaks = self._compute_plank_streaks()
-        self.current_plank_streak = plank_streaks["current"]
-        self.best_plank_streak = plank_streaks["best"]
-        self.plank_sessions_count = (
-            int((self.df["plank_seconds"] > 0).sum())
-            if "plank_seconds" in self.df.columns
-            else 0
-        )
-        self.plank_days_active = (
-            len(self.df[self.df["plank_seconds"] > 0]["date"].unique())
-            if "plank_seconds" in self.df.columns
-            else 0
-        )
-        self.moyenne_plank_par_session = (
-            self.sum_plank_seconds / self.plank_sessions_count
-            if self.plank_sessions_count > 0
-            else 0
-        )
-        self.moyenne_plank_par_jour_actif = (
-            self.sum_plank_seconds / self.plank_days_active
-            if self.plank_days_active > 0
-            else 0
-        )
-
-    def _objectif_sum_squat(self):
-        if not self.premier_squat_date:
-            return self.squats_restants  # Sécurité si premier squat inconnu
-
-        total_day_challenge = (get_end_of_year().date() - self.premier_squat_date).days
-
-        return total_day_challenge * self.squat_objectif_quotidien
-
-    def _nombre_jours_depuis_debut(self):
-        """Calcule le nombre de jours actifs."""
-        current_date = datetime.now() + timedelta(hours=1)
-        return (current_date.date() - self.premier_squat_date).days + 1
-
-    # calculer somme des squats d'hier
-    def _yesterday_squats(self):
-        yesterday = datetime.now() + timedelta(hours=1) - timedelta(days=1)
-        yesterday = yesterday.date()
-        return self.df[self.df["date"] == yesterday]["squats"].sum()
-
-    def _build_daily_totals(self):
-        today = get_today()
-        if self.df.empty:
-            base = pd.DataFrame({"date": [today.date()], "squats": [0]})
-        else:
-            base = self.df.groupby("date", as_index=False)["squats"].sum()
+class SquatWriter:
+    """Buffered writer for session items (bulk entry, imports, corrections).
 
-        start = pd.Timestamp(self.premier_squat_date)
-        stop = pd.Timestamp(today.date())
-        date_range = pd.date_range(start, stop, freq="D")
+    Buffered items go out through BatchWriteItem, 25 per request, and
+    unprocessed items are retried with exponential backoff. With
+    synchronous=True every add() is a plain put_item (the form path).
+    Use as a context manager, or call flush() explicitly.
 
-        completed = (
-            base.set_index("date")
-            .reindex(date_range, fill_value=0)
-            .rename_axis("date")
-            .reset_index()
+    DynamoDB puts overwrite an existing (name, date) key (re-imports,
+    corrections). The rollup must only see the difference, so the item each
+    put replaces is read first: put_item's ReturnValues="ALL_OLD" in
+    synchronous mode, one BatchGetItem per batch otherwise. The count of
+    such items is in `replaced`. Bulk loads can pass
+    write_through=False and call bump_data_epoch() once at the end instead;
+    so must any writer of back-dated sessions that other processes should see.
+
+    boto3 resources are not thread-safe: use one writer per thread.
+    """
+
+    BATCH_SIZE = 25
+
+    def __init__(
+        self,
+        table=None,
+        *,
+        synchronous=False,
+        write_through=True,
+        daily_table=None,
+        group=DEFAULT_GROUP,
+        max_retries=5,
+        backoff=0.1,
+    ):
+        self.table = table if table is not None else table_squats
+        # Unknown groups fail here, not after the first write succeeded
+        get_group(group)
+        self.group = group
+        self.daily_table = daily_table if daily_table is not None else table_daily
+        self.synchronous = synchronous
+        self.write_through = write_through
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._buffer = []
+        self.written = 0
+        self.replaced = 0
+
+    def add(self, name, value, *, exercise="SQUAT", unit=None, at=None):
+        """Queue one session (written right away in synchronous mode)."""
+        return self.add_item(
+            build_squat_item(
+                name, value, exercise=exercise, unit=unit, at=at, group=self.group
+            )
+        )
+
+    def add_item(self, item):
+        if self.synchronous:
+            response = self.table.put_item(Item=item, ReturnValues="ALL_OLD")
+            previous = response.get("Attributes")
+            self._written([item], [previous] if previous else [])
+            return item
+
+        self._buffer.append(item)
+        if len(self._buffer) >= self.BATCH_SIZE:
+            self.flush()
+        return item
+
+    def flush(self):
+        """Write every buffered item; returns how many were written."""
+        written = 0
+        while self._buffer:
+            # BatchWriteItem rejects two puts on the same key in one request
+            batch = list(
+                {
+                    (item["name"], item["date"]): item
+                    for item in self._buffer[: self.BATCH_SIZE]
+                }.values()
+            )
+            del self._buffer[: self.BATCH_SIZE]
+            replaced = self._stored_items(batch)
+            self._write_batch(batch)
+            self._written(batch, replaced)
+            written += len(batch)
+        return written
+
+    def _stored_items(self, batch):
+        """Items already stored under the batch's keys (the puts will replace them)."""
+        request = {
+            "Keys": [{"name": item["name"], "date": item["date"]} for item in batch]
+        }
+        stored = []
+        for attempt in range(self.max_retries + 1):
+            response = self.table.meta.client.batch_get_item(
+                RequestItems={self.table.name: request}
+            )
+            stored.extend(response.get("Responses", {}).get(self.table.name, []))
+            request = response.get("UnprocessedKeys", {}).get(self.table.name)
+            if not request:
+                return stored
+            if attempt < self.max_retries:
+                time.sleep(self.backoff * 2**attempt)
+        raise RuntimeError(
+            f"{len(request['Keys'])} keys still unread after {self.max_retries} retries"
+        )
+
+    def _write_batch(self, batch):
+        requests = [{"PutRequest": {"Item": item}} for item in batch]
+        for attempt in range(self.max_retries + 1):
+            response = self.table.meta.client.batch_write_item(
+                RequestItems={self.table.name: requests}
+            )
+            requests = response.get("UnprocessedItems", {}).get(self.table.name, [])
+            if not requests:
+                return
+            if attempt < self.max_retries:
+                time.sleep(self.backoff * 2**attempt)
+
+        # Keep what's left so a later flush() can retry it
+        self._buffer.extend(request["PutRequest"]["Item"] for request in requests)
+        raise RuntimeError(
+            f"{len(requests)} items still unprocessed after {self.max_retries} retries"
         )
-        completed["date"] = completed["date"].dt.date
-        return completed
 
-    def _build_plank_daily_totals(self):
-        """Build daily plank totals similar to squats."""
-        today = get_today()
-        if self.df.empty or "plank_seconds" not in self.df.columns:
-            return pd.DataFrame({"date": [today.date()], "plank_seconds": [0]})
+    def _written(self, items, replaced=()):
+        self.written += len(items)
+        self.replaced += len(replaced)
+        # Write-through: the next fetch sees the new rows without a reload
+        if self.write_through:
+            by_group = {}
+            for item in items:
+                by_group.setdefault(_item_group(item), []).append(item)
+            for group, group_items in by_group.items():
+                squat_data_cache(group).append_items(group_items)
+        # After the write-through: the daily totals it clears may be
+        # re-aggregated from the session frame right away
+        update_daily_rollup(items, self.daily_table, replaced)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+
+
+def _streak_run_lengths(goal_met, breaks=None):
+    """Length of the goal-met run ending on each row (0 where the goal is missed).
+
+    goal_met is a boolean array of days (rows), optionally 2-D with one column
+    per series. breaks flags rows that start a new run even if the previous day
+    met the goal (gaps in the dates).
+    """
+    goal_met = np.asarray(goal_met, dtype=bool)
+    positions = np.arange(len(goal_met)).reshape((-1,) + (1,) * (goal_met.ndim - 1))
+    last_reset = np.where(goal_met, -1, positions)
+    if breaks is not None:
+        last_reset = np.where(
+            np.asarray(breaks, dtype=bool) & goal_met, positions - 1, last_reset
+        )
+    last_reset = np.maximum.accumulate(last_reset, axis=0)
+    return np.where(goal_met, positions - last_reset, 0)
 
-        base = self.df.groupby("date", as_index=False)["plank_seconds"].sum()
 
-        # Find first plank date
-        plank_dates = self.df[self.df["plank_seconds"] > 0]["date"]
-        if plank_dates.empty:
-            return pd.DataFrame({"date": [today.date()], "plank_seconds": [0]})
+def _int_column(values):
+    """Integer column from a per-name aggregate, 0 for names without rows."""
+    return pd.to_numeric(values).fillna(0).astype(int)
 
-        first_plank_date = plank_dates.min()
-        start = pd.Timestamp(first_plank_date)
-        stop = pd.Timestamp(today.date())
-        date_range = pd.date_range(start, stop, freq="D")
 
-        completed = (
-            base.set_index("date")
-            .reindex(date_range, fill_value=0)
-            .rename_axis("date")
+class CrewStats:
+    """Per-participant stats for the whole crew, computed from one grouped pass.
+
+    The session frame is grouped once by (name, exercise, day); totals, daily
+    series and streaks of every registered exercise are then derived from
+    that long table column-wise, so the work scales with rows rather than
+    rows x participants x exercises. Participant objects are views over one
+    entry of this table (see participant()).
+    """
+
+    def __init__(self, df, days_left, squat_objectif_quotidien=20, names=()):
+        self.days_left = days_left
+        self.squat_objectif_quotidien = squat_objectif_quotidien
+        self.today = get_today().date()
+
+        # The cached frame already carries date_day at midnight; don't re-derive it
+        day = df["date_day"] if "date_day" in df.columns else df["date"].dt.normalize()
+        sessions = df.assign(_day=day)
+        if "exercise" not in sessions.columns:
+            sessions["exercise"] = "SQUAT"
+        if "value" not in sessions.columns:
+            sessions["value"] = sessions["squats"]
+        if "plank_seconds" not in sessions.columns:
+            sessions["plank_seconds"] = 0
+        self._sessions = sessions
+
+        names = list(dict.fromkeys([*names, *sessions["name"].unique()]))
+        self.names = names
+        self.exercises = list(
+            dict.fromkeys([*EXERCISES, *map(str, sessions["exercise"].unique())])
+        )
+        today = pd.Timestamp(self.today)
+
+        # ---- The one pass over rows: (name, exercise, day) totals ----
+        daily_long = (
+            sessions.groupby(["name", "exercise", "_day"], observed=True)["value"]
+            .agg(total="sum", sessions="size", best="max")
             .reset_index()
         )
-        completed["date"] = completed["date"].dt.date
-        return completed
-
-    def _compute_plank_streaks(self, min_seconds: int = 30):
-        """Compute plank streaks. A day counts if >= min_seconds of planking done."""
-        current = 0
-        best = 0
-        last_date = None
-        last_goal_met = False
-        today_date = get_today().date()
-
-        for _, row in self.plank_daily_totals.iterrows():
-            goal_met = row["plank_seconds"] >= min_seconds
-            date_value = row["date"]
-            is_today = date_value == today_date
-
-            if goal_met:
-                if last_date and last_goal_met and (date_value - last_date).days == 1:
-                    current += 1
-                else:
-                    current = 1
-            else:
-                if not is_today:
-                    current = 0
-
-            best = max(best, current)
-            last_goal_met = goal_met
-            last_date = date_value
-
-        return {"current": current, "best": best}
-
-    def _compute_streaks(self):
-        current = 0
-        best = 0
-        last_date = None
-        last_goal_met = False
-        today_date = get_today().date()
-
-        for _, row in self.daily_totals.iterrows():
-            goal_met = row["squats"] >= self.squat_objectif_quotidien
-            date_value = row["date"]
-
-            # Skip today when computing current streak - don't break streak until day ends
-            is_today = date_value == today_date
-
-            if goal_met:
-                if last_date and last_goal_met and (date_value - last_date).days == 1:
-                    current += 1
-                else:
-                    current = 1
-            else:
-                # Only reset streak if it's not today (give the whole day to complete goal)
-                if not is_today:
-                    current = 0
+        daily_long["name"] = daily_long["name"].astype(str)
+        daily_long["exercise"] = daily_long["exercise"].astype(str)
 
-            best = max(best, current)
-            last_goal_met = goal_met
-            last_date = date_value
+        # ---- Per (exercise, name) totals, from the (much smaller) daily table ----
+        columns = pd.MultiIndex.from_product(
+            [self.exercises, names], names=["exercise", "name"]
+        )
+        per_exercise = (
+            daily_long.groupby(["exercise", "name"])
+            .agg(
+                total=("total", "sum"),
+                sessions=("sessions", "sum"),
+                best=("best", "max"),
+                active_days=("total", "size"),
+                first_day=("_day", "min"),
+                last_day=("_day", "max"),
+            )
+            .reindex(columns)
+        )
 
-        return {"current": current, "best": best}
+        # ---- Days x (exercise, name) matrix ----
+        first_session = per_exercise["first_day"].min() if len(daily_long) else today
+        start = min(first_session, today) if pd.notna(first_session) else today
+        self.days = pd.date_range(start, today, freq="D")
+        self.daily = (
+            daily_long.set_index(["_day", "exercise", "name"])["total"]
+            .unstack(["exercise", "name"], fill_value=0)
+            .reindex(index=self.days, columns=columns, fill_value=0)
+            .astype(int)
+        )
+        self.daily_squats = self._exercise_daily("SQUAT")
+        self.daily_plank_seconds = self._exercise_daily("PLANK")
+
+        # ---- Streaks of every exercise: one run-length pass over the matrix ----
+        thresholds = [
+            squat_objectif_quotidien
+            if exercise == "SQUAT"
+            else EXERCISES.get(exercise, {}).get("streak_threshold", 1)
+            for exercise in self.exercises
+        ]
+        per_exercise["current_streak"], per_exercise["best_streak"] = self._streaks(
+            self.daily,
+            np.repeat(thresholds, len(names)),
+            per_exercise["first_day"],
+        )
+        per_exercise["total_today"] = self._day_total(self.daily, today)
+        for column in ("total", "sessions", "best", "active_days"):
+            per_exercise[column] = _int_column(per_exercise[column])
+        self.exercise_stats = per_exercise
+        self._first_days = per_exercise["first_day"]
+
+        by_name = per_exercise.unstack("exercise").reindex(names)
+
+        def exercise_column(exercise, column):
+            # Missing only for an empty crew
+            return by_name.get((column, exercise), pd.Series(0, index=by_name.index))
+
+        yesterday = today - pd.Timedelta(days=1)
+        this_week_start = today - pd.Timedelta(days=6)
+        prev_week_start = this_week_start - pd.Timedelta(days=7)
+        prev_week_end = this_week_start - pd.Timedelta(days=1)
+
+        stats = pd.DataFrame(index=pd.Index(names, name="name"))
+        stats["sum_squats_done"] = exercise_column("SQUAT", "total")
+        stats["sum_squats_done_today"] = exercise_column("SQUAT", "total_today")
+        stats["sum_squats_hier"] = self._day_total(self.daily_squats, yesterday)
+        stats["sessions_logged"] = (
+            per_exercise["sessions"].groupby(level="name").sum().reindex(names)
+        )
+        stats["weekly_total"] = self.daily_squats.loc[this_week_start:today].sum()
+        stats["previous_week_total"] = self.daily_squats.loc[
+            prev_week_start:prev_week_end
+        ].sum()
+        stats["weekly_delta"] = stats["weekly_total"] - stats["previous_week_total"]
 
-    def _weekly_totals(self):
-        if self.daily_totals.empty:
-            return 0, 0, 0
+        # Same fallback as before: no session yet means the challenge starts today
+        fallback_day = pd.Timestamp(datetime.now().date())
+        first_day = (
+            per_exercise["first_day"].groupby(level="name").min().reindex(names)
+        )
+        self._first_session_days = first_day
+        last_day = per_exercise["last_day"].groupby(level="name").max().reindex(names)
+        first_day = first_day.fillna(fallback_day)
+        end_of_year = pd.Timestamp(get_end_of_year().date())
+        days_to_end = (end_of_year - first_day).dt.days
+        stats["premier_squat_date"] = first_day.dt.date
+        stats["squats_restants"] = days_left * squat_objectif_quotidien
+        stats["objectif_sum_squat"] = days_to_end * squat_objectif_quotidien
+        stats["nombre_jours_depuis_debut"] = (today - first_day).dt.days + 1
+        stats["sum_squat_should_be_done_today"] = (
+            stats["nombre_jours_depuis_debut"] * squat_objectif_quotidien
+        )
+        stats["delta_done_vs_objecitf_today"] = (
+            stats["sum_squats_done"] - stats["sum_squat_should_be_done_today"]
+        )
+        stats["moyenne_squats_par_jour"] = (
+            stats["sum_squats_done"] / stats["nombre_jours_depuis_debut"]
+        ).where(stats["nombre_jours_depuis_debut"] > 0, 0)
+        stats["projected_year_total"] = (
+            (stats["moyenne_squats_par_jour"] * (days_to_end + 1))
+            .where(days_to_end + 1 > 0, 0)
+            .astype(int)
+        )
+        stats["progress_pct_vs_objectif"] = (
+            stats["sum_squats_done"] / stats["objectif_sum_squat"] * 100
+        ).where(stats["objectif_sum_squat"] != 0, 0)
+        stats["last_activity_date"] = last_day.dt.date
+        stats["is_active_today"] = stats["sum_squats_done_today"] > 0
+
+        stats["sum_plank_seconds"] = exercise_column("PLANK", "total")
+        stats["sum_plank_seconds_today"] = exercise_column("PLANK", "total_today")
+        stats["best_plank_seconds"] = exercise_column("PLANK", "best")
+        stats["plank_sessions_count"] = exercise_column("PLANK", "sessions")
+        stats["plank_days_active"] = exercise_column("PLANK", "active_days")
+        stats["moyenne_plank_par_session"] = (
+            stats["sum_plank_seconds"] / stats["plank_sessions_count"]
+        ).where(stats["plank_sessions_count"] > 0, 0)
+        stats["moyenne_plank_par_jour_actif"] = (
+            stats["sum_plank_seconds"] / stats["plank_days_active"]
+        ).where(stats["plank_days_active"] > 0, 0)
+
+        stats["current_objective_streak"] = exercise_column("SQUAT", "current_streak")
+        stats["best_objective_streak"] = exercise_column("SQUAT", "best_streak")
+        stats["current_plank_streak"] = exercise_column("PLANK", "current_streak")
+        stats["best_plank_streak"] = exercise_column("PLANK", "best_streak")
+
+        self.stats = stats
+
+    def _exercise_daily(self, exercise):
+        """Days x names matrix of one exercise (self.daily[exercise] fails for an empty crew)."""
+        columns = self.daily.columns
+        return self.daily.loc[
+            :, columns.get_level_values("exercise") == exercise
+        ].droplevel("exercise", axis=1)
+
+    @staticmethod
+    def _day_total(wide, day):
+        if day in wide.index:
+            return wide.loc[day]
+        return pd.Series(0, index=wide.columns)
+
+    @staticmethod
+    def _streaks(wide, thresholds, first_days):
+        """Current and best streak per column of days with a total >= its threshold.
+
+        thresholds and first_days hold one value per column of wide; days
+        before a column's first day never count. A missed goal today doesn't
+        break the current streak: the day isn't over yet.
+        """
+        if wide.empty:
+            zeros = pd.Series(0, index=wide.columns)
+            return zeros, zeros
+        started = wide.index.to_numpy()[:, None] >= first_days.reindex(
+            wide.columns
+        ).to_numpy(dtype="datetime64[ns]")[None, :]
+        goal_met = (wide.to_numpy() >= np.asarray(thresholds)[None, :]) & started
+        run_lengths = _streak_run_lengths(goal_met)
+        # The last row is always today: a missed goal there doesn't count yet
+        before_today = run_lengths[-2] if len(run_lengths) > 1 else 0
+        current = np.where(goal_met[-1], run_lengths[-1], before_today)
+        return (
+            pd.Series(current, index=wide.columns),
+            pd.Series(run_lengths.max(axis=0), index=wide.columns),
+        )
 
-        today_date = get_today().date()
-        this_week_start = today_date - timedelta(days=6)
-        prev_week_start = this_week_start - timedelta(days=7)
-        prev_week_end = this_week_start - timedelta(days=1)
+    def exercise_daily_totals(self, name, exercise="SQUAT", column="value"):
+        """Daily totals of one exercise up to today.
 
-        mask_this_week = (self.daily_totals["date"] >= this_week_start) & (
-            self.daily_totals["date"] <= today_date
-        )
-        mask_prev_week = (self.daily_totals["date"] >= prev_week_start) & (
-            self.daily_totals["date"] <= prev_week_end
+        Squats start on the participant's first session of any exercise (the
+        start of their challenge), other exercises on their first session of it.
+        """
+        today = pd.Timestamp(self.today)
+        if exercise == "SQUAT":
+            first_day = self._first_session_days.get(name)
+        else:
+            first_day = self._first_days.get((exercise, name))
+        if exercise in self.exercises and name in self.names and pd.notna(first_day):
+            values = self.daily[exercise][name].loc[first_day:today]
+            if not values.empty:
+                return pd.DataFrame({"date": values.index.date, column: values.to_numpy()})
+        return pd.DataFrame({"date": [self.today], column: [0]})
+
+    def daily_totals(self, name):
+        """Daily squat totals from the participant's first session to today."""
+        return self.exercise_daily_totals(name, "SQUAT", "squats")
+
+    def plank_daily_totals(self, name):
+        """Daily plank totals from the participant's first plank to today."""
+        return self.exercise_daily_totals(name, "PLANK", "plank_seconds")
+
+    def sessions(self, name):
+        """The participant's sessions, with "date" truncated to the day."""
+        rows = self._sessions[self._sessions["name"] == name]
+        return rows.assign(date=rows["_day"].dt.date).drop(columns="_day")
+
+    def stats_for(self, name):
+        if name not in self.stats.index:
+            self.stats = pd.concat(
+                [
+                    self.stats,
+                    CrewStats(
+                        self._sessions.iloc[0:0].drop(columns="_day"),
+                        self.days_left,
+                        self.squat_objectif_quotidien,
+                        names=[name],
+                    ).stats,
+                ]
+            )
+        return self.stats.loc[name]
+
+    def participant(self, name, stats=None):
+        return Participant(
+            name,
+            None,
+            self.days_left,
+            squat_objectif_quotidien=self.squat_objectif_quotidien,
+            crew_stats=self,
+            stats=stats,
         )
 
-        this_week_total = int(self.daily_totals.loc[mask_this_week, "squats"].sum())
-        prev_week_total = int(self.daily_totals.loc[mask_prev_week, "squats"].sum())
+    def summary_table(self, names=None):
+        """The stats table restricted to names (default: everyone), in that order."""
+        return self.stats.reindex(self.names if names is None else list(names))
 
-        return this_week_total, prev_week_total, this_week_total - prev_week_total
+    def summary(self, names=None):
+        """Crew totals and leaderboards straight from the stats table.
+
+        Leaders are (name, value) pairs, None for an empty crew; ties go to
+        the first name in `names` order.
+        """
+        stats = self.summary_table(names)
+
+        def leader(column):
+            values = stats[column].dropna()
+            if values.empty:
+                return None
+            name = values.idxmax()
+            return name, values[name].item()
+
+        return {
+            "goal_to_date": int(stats["sum_squat_should_be_done_today"].sum()),
+            "goal_full_year": int(stats["objectif_sum_squat"].sum()),
+            "active_today": int(
+                (stats["sum_squats_done_today"] >= self.squat_objectif_quotidien).sum()
+            ),
+            "best_streak": leader("best_objective_streak"),
+            "pace": leader("moyenne_squats_par_jour"),
+            "best_plank": leader("best_plank_seconds"),
+            "best_plank_streak": leader("best_plank_streak"),
+            "total_plank": leader("sum_plank_seconds"),
+        }
 
-    def _projected_sum(self):
-        total_days = (get_end_of_year().date() - self.premier_squat_date).days + 1
-        if total_days <= 0:
-            return 0
-        return int(self.moyenne_squats_par_jour * total_days)
+
+class Participant:
+    def __init__(
+        self,
+        name,
+        df,
+        days_left,
+        squat_objectif_quotidien=20,
+        crew_stats=None,
+        stats=None,
+    ):
+        """
+        Initialise un participant avec ses statistiques.
+        :param name: Nom du participant
+        :param df: DataFrame contenant les données ('name', 'squats', 'date')
+        :param squat_objectif: Objectif de squats à atteindre
+        :param crew_stats: CrewStats déjà calculé pour toute l'équipe (df ignoré)
+        :param stats: Ligne de stats déjà calculée (voir ParticipantCache)
+        """
+        if crew_stats is None:
+            crew_stats = CrewStats(
+                df[df["name"] == name],
+                days_left,
+                squat_objectif_quotidien,
+                names=[name],
+            )
+        self._crew_stats = crew_stats
+        self.name = name
+        self.squat_objectif_quotidien = squat_objectif_quotidien
+
+        if stats is None:
+            stats = crew_stats.stats_for(name)
+        self.sum_squats_done = int(stats["sum_squats_done"])
+        self.sum_squats_done_today = int(stats["sum_squats_done_today"])
+        self.premier_squat_date = stats["premier_squat_date"]
+        self.squats_restants = int(stats["squats_restants"])
+        self.objectif_sum_squat = int(stats["objectif_sum_squat"])
+        self.nombre_jours_depuis_debut = int(stats["nombre_jours_depuis_debut"])
+        self.sum_squat_should_be_done_today = int(
+            stats["sum_squat_should_be_done_today"]
+        )
+        self.delta_done_vs_objecitf_today = int(stats["delta_done_vs_objecitf_today"])
+        self.moyenne_squats_par_jour = float(stats["moyenne_squats_par_jour"])
+        self.sum_squats_hier = int(stats["sum_squats_hier"])
+        self.sessions_logged = int(stats["sessions_logged"])
+        self.current_objective_streak = int(stats["current_objective_streak"])
+        self.best_objective_streak = int(stats["best_objective_streak"])
+        self.weekly_total = int(stats["weekly_total"])
+        self.previous_week_total = int(stats["previous_week_total"])
+        self.weekly_delta = int(stats["weekly_delta"])
+        self.projected_year_total = int(stats["projected_year_total"])
+        self.progress_pct_vs_objectif = float(stats["progress_pct_vs_objectif"])
+        self.last_activity_date = (
+            stats["last_activity_date"] if pd.notna(stats["last_activity_date"]) else None
+        )
+        self.is_active_today = bool(stats["is_active_today"])
+
+        # Plank stats (using plank_seconds column from load_all)
+        self.sum_plank_seconds = int(stats["sum_plank_seconds"])
+        self.sum_plank_seconds_today = int(stats["sum_plank_seconds_today"])
+        self.best_plank_seconds = int(stats["best_plank_seconds"])
+        self.current_plank_streak = int(stats["current_plank_streak"])
+        self.best_plank_streak = int(stats["best_plank_streak"])
+        self.plank_sessions_count = int(stats["plank_sessions_count"])
+        self.plank_days_active = int(stats["plank_days_active"])
+        self.moyenne_plank_par_session = float(stats["moyenne_plank_par_session"])
+        self.moyenne_plank_par_jour_actif = float(stats["moyenne_plank_par_jour_actif"])
+
+    # Row-level views are only built when a page actually needs them
+    @property
+    def df(self):
+        return self._crew_stats.sessions(self.name)
+
+    @property
+    def daily_totals(self):
+        return self._crew_stats.daily_totals(self.name)
+
+    @property
+    def plank_daily_totals(self):
+        return self._crew_stats.plank_daily_totals(self.name)
 
     def __repr__(self):
         return (
@@ -330,86 +704,283 @@ class Participant:
 
 
 # Assuming you have AWS credentials set up or using other methods to authenticate with DynamoDB
-table_squats = boto3.resource(
+_dynamodb = boto3.resource(
     "dynamodb",
     region_name="eu-central-1",
     aws_access_key_id=ACCESS_KEY,
     aws_secret_access_key=SECRET_ACCESS_KEY,
-).Table("squats")
+)
+table_squats = _dynamodb.Table("squats")
+
+# Bookkeeping item of each group in the squats table, keyed name=META_NAME,
+# date=<group>. Its "group" is META_NAME too, so no year/group index, group
+# filter or legacy scan ever returns it as a session.
+META_NAME = "__meta__"
+
+
+def load_meta(group=DEFAULT_GROUP):
+    """The group's bookkeeping item ({} if missing, None if unreadable)."""
+    try:
+        return table_squats.get_item(Key={"name": META_NAME, "date": group}).get(
+            "Item", {}
+        )
+    except ClientError as e:
+        logger.warning(f"Meta item unavailable: {e}")
+        return None
 
-# def load_data(name, data = None):
 
-#     # Get the current year
-#     if data is None:
+def update_meta(group, set_values=None, add_values=None):
+    """SET / ADD attributes of the group's bookkeeping item (created on first update).
 
-#         current_year = datetime.now().year
-#         result = table_squats.scan(FilterExpression=Attr("name").eq(name))
-#         filtered_items = [
-#         item for item in result["Items"]
+    Returns the item after the update.
+    """
+    names, values, clauses = {}, {}, {"SET": [], "ADD": []}
+    updates = [("SET", {"group": META_NAME, **(set_values or {})}), ("ADD", add_values or {})]
+    for action, attributes in updates:
+        for attribute, value in attributes.items():
+            placeholder = f"a{len(names)}"
+            names[f"#{placeholder}"] = attribute
+            values[f":{placeholder}"] = value
+            separator = " = " if action == "SET" else " "
+            clauses[action].append(f"#{placeholder}{separator}:{placeholder}")
+    update_expression = " ".join(
+        f"{action} {', '.join(parts)}" for action, parts in clauses.items() if parts
+    )
+    return table_squats.update_item(
+        Key={"name": META_NAME, "date": group},
+        UpdateExpression=update_expression,
+        ExpressionAttributeNames=names,
+        ExpressionAttributeValues=values,
+        ReturnValues="ALL_NEW",
+    )["Attributes"]
+
+# Per-user per-day totals, maintained on write with UpdateItem ADD.
+# Key: name (HASH), date_day (RANGE); GSI year (HASH), date_day (RANGE).
+# Other groups' rows use "<group>#<name>" and the group_year GSI.
+DAILY_TABLE_NAME = "squats_daily"
+DAILY_YEAR_INDEX_NAME = "year-date_day-index"
+DAILY_GROUP_INDEX_NAME = "group_year-date_day-index"
+table_daily = _dynamodb.Table(DAILY_TABLE_NAME)
+
+# Challenge groups: roster and settings, one item per group (key: group).
+# Created and seeded from GROUPS_FILE by `python backfill.py --create-groups`;
+# until then the groups come from that file.
+GROUPS_TABLE_NAME = "squats_groups"
+GROUPS_FILE = os.environ.get(
+    "SQUATS_GROUPS_FILE", os.path.join(os.path.dirname(__file__), "groups.json")
+)
+table_groups = _dynamodb.Table(GROUPS_TABLE_NAME)
+DEFAULT_DAILY_GOAL = 20
+
+
+def _group_settings(raw):
+    """Normalize a group record (table item or file entry)."""
+    return {
+        "group": str(raw["group"]),
+        "participants": tuple(raw.get("participants") or ()),
+        "daily_goal": int(raw.get("daily_goal") or DEFAULT_DAILY_GOAL),
+        "no_ai_users": tuple(raw.get("no_ai_users") or ()),
+    }
 
-#         if datetime.strptime(item["date"], "%Y-%m-%dT%H:%M:%S.%f").year == current_year
-#     ]
 
-#     else :
-#         filtered_items = data[data['name']==name]
+def _load_groups_file(path=GROUPS_FILE):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
 
 
-# # Convert date strings to datetime objects and find the earliest date
-#     try:
-#         earliest_date = min(datetime.strptime(item['date'], "%Y-%m-%dT%H:%M:%S.%f").date() for item in filtered_items)
-#     except:
-#         earliest_date = today.date()
+def load_groups():
+    """Every group's settings, keyed by group id."""
+    try:
+        records = []
+        scan_kwargs = {}
+        while True:
+            result = table_groups.scan(**scan_kwargs)
+            records.extend(result.get("Items", []))
+            if not result.get("LastEvaluatedKey"):
+                break
+            scan_kwargs["ExclusiveStartKey"] = result["LastEvaluatedKey"]
+    except ClientError as e:
+        logger.warning(f"Groups table unavailable, using {GROUPS_FILE}: {e}")
+        records = _load_groups_file()
+    if not records:
+        records = _load_groups_file()
+    return {settings["group"]: settings for settings in map(_group_settings, records)}
+
+
+_groups_cache = {"data": None, "timestamp": None}
+_groups_lock = threading.Lock()
+
+
+def get_group(group=DEFAULT_GROUP):
+    """Settings of one group (participants, daily_goal, no_ai_users). TTL = 120s.
+
+    Raises KeyError for an unknown or malformed group id (checked before any
+    lookup: the id usually comes straight from the URL).
+    """
+    try:
+        check_group_id(group)
+    except ValueError as e:
+        raise KeyError(group) from e
+    with _groups_lock:
+        groups = _groups_cache["data"]
+        if groups is None or (time.time() - _groups_cache["timestamp"]) >= _CACHE_TTL_SECONDS:
+            groups = None
+    if groups is None:
+        groups = load_groups()
+        with _groups_lock:
+            _groups_cache["data"] = groups
+            _groups_cache["timestamp"] = time.time()
+    return groups[group]
+
+
+# boto3 resources are not thread-safe: worker threads each get their own
+_thread_local = threading.local()
+
+
+def _thread_table(name=None):
+    """Table resource owned by the calling thread (squats table by default)."""
+    tables = getattr(_thread_local, "tables", None)
+    if tables is None:
+        tables = _thread_local.tables = {}
+        _thread_local.resource = boto3.session.Session().resource(
+            "dynamodb",
+            region_name="eu-central-1",
+            aws_access_key_id=ACCESS_KEY,
+            aws_secret_access_key=SECRET_ACCESS_KEY,
+        )
+    name = name or table_squats.name
+    if name not in tables:
+        tables[name] = _thread_local.resource.Table(name)
+    return tables[name]
 
-#     total_day_challenge = (end_of_year.date() - earliest_date).days
 
-#     total_squat_challenge = total_day_challenge * 20
+# Parallel scan (Segment/TotalSegments) for the unavoidable full scans.
+# 1 keeps the sequential scan; set SQUATS_SCAN_SEGMENTS=8 for big tables.
+SCAN_SEGMENTS = int(os.environ.get("SQUATS_SCAN_SEGMENTS", "1"))
 
 
-#     squats_by_day = defaultdict(int)
+def _scan_segment(pages, stop, table, scan_kwargs):
+    """Walk one scan segment, pushing each page's items to the pages queue.
 
-#     for item in filtered_items:
-#         date = item["date"][:10]  # Extract only the date part
-#         squats_done = int(item["squats"])
-#         squats_by_day[date] += squats_done
+    Checks stop between pages: set once the consumer is gone.
+    """
+    try:
+        while not stop.is_set():
+            result = table.scan(**scan_kwargs)
+            pages.put(result.get("Items", []))
+            last_evaluated_key = result.get("LastEvaluatedKey")
+            if not last_evaluated_key:
+                break
+            scan_kwargs["ExclusiveStartKey"] = last_evaluated_key
+    except Exception as e:
+        pages.put(e)
+    finally:
+        pages.put(None)
 
-#     # Create a DataFrame
-#     df = pd.DataFrame(list(squats_by_day.items()), columns=["Date", "Squats"])
-#     done = df["Squats"].sum()
 
-#     return Personne(name, done, df,earliest_date,total_squat_challenge)
+def _parallel_scan_items(segments, **scan_kwargs):
+    """Yield items from a Segment/TotalSegments scan as pages arrive.
 
+    Each call gets one worker per segment, so every segment runs at once.
+    If a segment fails or the consumer stops early (exception, dropped
+    generator), the other workers stop after their current page.
+    """
+    pages = queue.Queue()
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=segments, thread_name_prefix="squats-scan")
+    try:
+        for segment in range(segments):
+            segment_kwargs = dict(scan_kwargs, Segment=segment, TotalSegments=segments)
+            executor.submit(
+                lambda kwargs: _scan_segment(pages, stop, _thread_table(), kwargs),
+                segment_kwargs,
+            )
+
+        remaining = segments
+        while remaining:
+            page = pages.get()
+            if page is None:
+                remaining -= 1
+            elif isinstance(page, Exception):
+                raise page
+            else:
+                yield from page
+    finally:
+        stop.set()
+        executor.shutdown(wait=False)
 
-def load_all():
-    items = []
-    scan_kwargs = {}
+
+def _scan_items(segments=None, **scan_kwargs):
+    """Yield every item of the squats table, following LastEvaluatedKey pages."""
+    segments = SCAN_SEGMENTS if segments is None else segments
+    if segments > 1:
+        yield from _parallel_scan_items(segments, **scan_kwargs)
+        return
 
     while True:
         result = table_squats.scan(**scan_kwargs)
-        items.extend(result.get("Items", []))
+        yield from result.get("Items", [])
         last_evaluated_key = result.get("LastEvaluatedKey")
         if not last_evaluated_key:
             break
         scan_kwargs["ExclusiveStartKey"] = last_evaluated_key
 
+
+def _date_watermark(items, watermark=None):
+    """Return the highest raw ISO `date` seen in items (or the previous watermark)."""
+    for item in items:
+        date_value = item.get("date")
+        if isinstance(date_value, str) and (watermark is None or date_value > watermark):
+            watermark = date_value
+    return watermark
+
+
+SESSION_COLUMNS = [
+    "name",
+    "squats",
+    "date",
+    "exercise",
+    "value",
+    "unit",
+    "date_day",
+    "year",
+    "plank_seconds",
+]
+
+
+# Compact in-memory schema: categoricals for the few distinct strings and
+# 32-bit counts. date_day is the session date at midnight (datetime64).
+SESSION_DTYPES = {
+    "name": "category",
+    "squats": "int32",
+    "exercise": "category",
+    "value": "int32",
+    "unit": "category",
+    "year": "int16",
+    "plank_seconds": "int32",
+}
+
+
+def _apply_session_dtypes(df):
+    """Cast a session frame to SESSION_DTYPES (after concat, categories widen to object)."""
+    df = df.astype(SESSION_DTYPES)
+    df["date"] = pd.to_datetime(df["date"])
+    df["date_day"] = df["date"].dt.normalize()
+    return df
+
+
+def _normalize_items(items):
+    """Turn raw DynamoDB items into the session DataFrame used by every page."""
     if not items:
-        return pd.DataFrame(
-            columns=[
-                "name",
-                "squats",
-                "date",
-                "exercise",
-                "value",
-                "unit",
-                "date_day",
-                "plank_seconds",
-            ]
-        )
+        return _apply_session_dtypes(pd.DataFrame(columns=SESSION_COLUMNS))
 
     df = pd.DataFrame(items)
     if "date" not in df:
         df["date"] = pd.Timestamp(get_today())
 
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    # Mixed precisions (isoformat() drops zero microseconds, imports may have
+    # none): without ISO8601, rows not in the first row's format become NaT
+    df["date"] = pd.to_datetime(df["date"], errors="coerce", format="ISO8601")
     df = df.dropna(subset=["date"])
 
     # ---- Backward-compatible defaults for new attributes ----
@@ -434,13 +1005,9 @@ def load_all():
 
     # Unit attribute
     if "unit" not in df.columns:
-        df["unit"] = df["exercise"].map(
-            lambda ex: "seconds" if ex == "PLANK" else "reps"
-        )
+        df["unit"] = df["exercise"].map(EXERCISE_UNITS).fillna("reps")
     else:
-        df["unit"] = df["unit"].fillna(
-            df["exercise"].map(lambda ex: "seconds" if ex == "PLANK" else "reps")
-        )
+        df["unit"] = df["unit"].fillna(df["exercise"].map(EXERCISE_UNITS)).fillna("reps")
 
     # Convenience column for plank stats (won't affect existing pages)
     df["plank_seconds"] = 0
@@ -451,27 +1018,364 @@ def load_all():
         .astype(int)
     )
 
-    # Ensure date_day exists (useful for grouping without timezone drift)
-    if "date_day" not in df.columns:
-        df["date_day"] = df["date"].dt.date.astype(str)
+    # DynamoDB hands numbers back as Decimal; derive year (and date_day, in
+    # _apply_session_dtypes) from the date instead
+    df["year"] = df["date"].dt.year
+
+    return _apply_session_dtypes(df.reindex(columns=SESSION_COLUMNS))
 
+
+def _current_year_slice(df):
     current_year = get_today().year
     df = df[df["date"].dt.year == current_year]
-
     return df.sort_values("date").reset_index(drop=True)
 
 
+# GSI on the squats table: partition key "year" (N), sort key "date" (S).
+# Created by `python backfill.py --create-index`.
+YEAR_INDEX_NAME = "year-date-index"
+# Same for the other groups: partition key "group_year" (S, "<group>#<year>").
+# Created by `python backfill.py --create-group-index`.
+GROUP_INDEX_NAME = "group_year-date-index"
+
+
+def _group_filter(group):
+    """Scan filter keeping only one group's items."""
+    if group == DEFAULT_GROUP:
+        return Attr("group").not_exists()
+    return Attr("group").eq(group)
+
+# Legacy rows (written before "year" existed) are invisible to the year index.
+# Flipped off once a legacy scan comes back empty or the meta item says
+# backfill.py has run (see mark_legacy_backfilled).
+_legacy_rows_pending = True
+
+
+def _query_year_items(
+    year,
+    after=None,
+    *,
+    group=DEFAULT_GROUP,
+    table=None,
+    index_name=None,
+    sort_key="date",
+):
+    """Yield the items of one group's year partition, optionally only those after a date."""
+    table = table if table is not None else table_squats
+    key_name, key_value = _partition_key(group, year)
+    if index_name is None:
+        index_name = YEAR_INDEX_NAME if key_name == "year" else GROUP_INDEX_NAME
+    key_condition = Key(key_name).eq(key_value)
+    if after is not None:
+        key_condition = key_condition & Key(sort_key).gt(after)
+    query_kwargs = {
+        "IndexName": index_name,
+        "KeyConditionExpression": key_condition,
+    }
+    while True:
+        result = table.query(**query_kwargs)
+        yield from result.get("Items", [])
+        last_evaluated_key = result.get("LastEvaluatedKey")
+        if not last_evaluated_key:
+            break
+        query_kwargs["ExclusiveStartKey"] = last_evaluated_key
+
+
+def _scan_legacy_items(year):
+    """Full scan for the default group's rows of a year without a "year" attribute."""
+    return [
+        item
+        # Other groups' items have no "year" either
+        for item in _scan_items(
+            FilterExpression=Attr("year").not_exists() & Attr("group").not_exists()
+        )
+        if str(item.get("date", "")).startswith(str(year))
+    ]
+
+
+def _load_legacy_items(year):
+    """Scan for current-year rows without a "year" attribute.
+
+    New rows always carry "year", so once a scan finds no legacy row for the
+    current year it never will again: that is recorded in the meta item, and
+    every later start (this process or another) skips the scan. Past years
+    may still hold legacy rows then; they go through _scan_legacy_items().
+    """
+    global _legacy_rows_pending
+    if not _legacy_rows_pending:
+        return []
+    if (load_meta(DEFAULT_GROUP) or {}).get("legacy_backfilled"):
+        _legacy_rows_pending = False
+        return []
+    items = _scan_legacy_items(year)
+    if not items:
+        _legacy_rows_pending = False
+        mark_legacy_backfilled()
+    return items
+
+
+def mark_legacy_backfilled():
+    """Record that the current year has no legacy row left, for every process."""
+    try:
+        update_meta(DEFAULT_GROUP, set_values={"legacy_backfilled": True})
+    except ClientError as e:
+        logger.warning(f"Could not record the legacy backfill: {e}")
+
+
+def load_data_epoch(group=DEFAULT_GROUP):
+    """The group's data epoch (0 before the first bump, None if unreadable)."""
+    meta = load_meta(group)
+    return None if meta is None else int(meta.get("epoch", 0))
+
+
+def bump_data_epoch(group=DEFAULT_GROUP):
+    """Tell every process that the group's sessions changed behind the watermark.
+
+    Delta syncs only fetch rows newer than the watermark, so bulk imports and
+    back-dated writes must call this: each cache (and on-disk snapshot) with
+    an older epoch reloads the group from scratch on its next refresh.
+    Returns the new epoch.
+    """
+    attributes = update_meta(group, add_values={"epoch": 1})
+    clear_squat_dataframe_cache(group)
+    return int(attributes["epoch"])
+
+
+def _load_year_items(year, group=DEFAULT_GROUP):
+    """One group's items of a year via its index, falling back to a full scan."""
+    try:
+        items = list(_query_year_items(year, group=group))
+    except ClientError as e:
+        logger.warning(f"Year index query failed, falling back to scan: {e}")
+        return list(_scan_items(FilterExpression=_group_filter(group)))
+    if group != DEFAULT_GROUP:
+        return items
+    if int(year) != get_today().year:
+        # The legacy flag only covers the current year: always scan past ones
+        return items + _scan_legacy_items(year)
+    return items + _load_legacy_items(year)
+
+
+def load_all(with_watermark=False, group=DEFAULT_GROUP):
+    """Load the group's current-year sessions from its year partition.
+
+    With with_watermark=True, also return the highest raw `date` read so that
+    later refreshes can go through sync_squat_dataframe() instead of a full load.
+    """
+    items = _load_year_items(get_today().year, group)
+    df = _current_year_slice(_normalize_items(items))
+    if with_watermark:
+        return df, _date_watermark(items)
+    return df
+
+
+def load_since(watermark, group=DEFAULT_GROUP):
+    """Load only the group's items written after watermark (raw ISO `date` string).
+
+    Returns (normalized_df, new_watermark).
+    """
+    try:
+        items = list(_query_year_items(get_today().year, after=watermark, group=group))
+    except ClientError as e:
+        logger.warning(f"Year index query failed, falling back to scan: {e}")
+        items = list(
+            _scan_items(
+                FilterExpression=Attr("date").gt(watermark) & _group_filter(group)
+            )
+        )
+    return _normalize_items(items), _date_watermark(items, watermark)
+
+
+def sync_squat_dataframe(df, watermark, group=DEFAULT_GROUP):
+    """Incremental refresh: append the group's sessions newer than watermark to df.
+
+    Returns (df, new_watermark). Refresh cost tracks new writes, not table size.
+    """
+    if watermark is None:
+        return load_all(with_watermark=True, group=group)
+
+    delta, new_watermark = load_since(watermark, group)
+    if delta.empty:
+        return df, new_watermark
+
+    return _merge_sessions(df, delta), new_watermark
+
+
+def _merge_sessions(df, delta):
+    """Append normalized sessions to df, de-duplicated on (name, date)."""
+    merged = pd.concat([df, delta], ignore_index=True)
+    merged = merged.drop_duplicates(subset=["name", "date"], keep="last")
+    return _current_year_slice(_apply_session_dtypes(merged))
+
+
+DAILY_COLUMNS = ["name", "date_day", "squats", "plank_seconds", "sessions"]
+
+# Flipped off the first time the rollup table turns out not to exist
+_daily_rollup_available = True
+
+
+def _rollup_name(group, name):
+    """Rollup table key of a name: other groups' names are prefixed with the group."""
+    return name if group == DEFAULT_GROUP else f"{group}#{name}"
+
+
+def _daily_increments(items, replaced=()):
+    """Sum raw session items per (group, name, date_day), minus the replaced ones.
+
+    Keys whose increments all cancel out (a re-import of identical rows) are
+    left out.
+    """
+    increments = {}
+    for sign, batch in ((1, items), (-1, replaced)):
+        for item in batch:
+            # Legacy items have no date_day
+            date_day = item.get("date_day") or str(item["date"])[:10]
+            key = (_item_group(item), item["name"], date_day)
+            entry = increments.setdefault(
+                key,
+                {"squats": 0, "plank_seconds": 0, "sessions": 0},
+            )
+            entry["squats"] += sign * int(item.get("squats", 0))
+            if item.get("exercise") == "PLANK":
+                entry["plank_seconds"] += sign * int(item["value"])
+            entry["sessions"] += sign
+    return {
+        key: increment
+        for key, increment in increments.items()
+        if any(increment.values())
+    }
+
+
+def _rollup_missing(error):
+    global _daily_rollup_available
+    if error.response.get("Error", {}).get("Code") == "ResourceNotFoundException":
+        _daily_rollup_available = False
+
+
+def update_daily_rollup(items, table=None, replaced=()):
+    """Atomically add freshly written sessions to the per-day rollup table.
+
+    replaced are the stored items those writes overwrote: only the
+    difference reaches the rollup.
+
+    The session write already succeeded, so failures are logged, not raised;
+    `python backfill.py --rebuild-rollup` recomputes the table from sessions.
+    The daily totals cache of every written group is cleared either way:
+    without the table, those totals are aggregated from the session frame.
+    """
+    try:
+        _add_to_daily_rollup(items, table, replaced)
+    finally:
+        for group in {_item_group(item) for item in items}:
+            clear_daily_totals_cache(group)
+
+
+def _add_to_daily_rollup(items, table=None, replaced=()):
+    if not _daily_rollup_available:
+        return
+    table = table if table is not None else table_daily
+    for (group, name, date_day), increment in _daily_increments(
+        items, replaced
+    ).items():
+        key_name, key_value = _partition_key(group, date_day[:4])
+        try:
+            table.update_item(
+                Key={"name": _rollup_name(group, name), "date_day": date_day},
+                UpdateExpression="ADD squats :s, plank_seconds :p, sessions :n SET #y = :y",
+                ExpressionAttributeNames={"#y": key_name},
+                ExpressionAttributeValues={
+                    ":s": increment["squats"],
+                    ":p": increment["plank_seconds"],
+                    ":n": increment["sessions"],
+                    ":y": key_value,
+                },
+            )
+        except ClientError as e:
+            _rollup_missing(e)
+            logger.error(f"Daily rollup update failed for {name} {date_day}: {e}")
+            if not _daily_rollup_available:
+                return
+
+
+DAILY_DTYPES = {
+    "name": "category",
+    "squats": "int32",
+    "plank_seconds": "int32",
+    "sessions": "int32",
+}
+
+
+def _normalize_daily_items(items):
+    df = pd.DataFrame(items).reindex(columns=DAILY_COLUMNS)
+    df["date_day"] = pd.to_datetime(df["date_day"], errors="coerce")
+    for column in ("squats", "plank_seconds", "sessions"):
+        df[column] = pd.to_numeric(df[column], errors="coerce").fillna(0)
+    return (
+        df.dropna(subset=["date_day"])
+        .astype(DAILY_DTYPES)
+        .sort_values(["date_day", "name"])
+        .reset_index(drop=True)
+    )
+
+
+def load_daily_rollup(year=None, group=DEFAULT_GROUP):
+    """Per-user per-day totals of one group's year, read from the rollup table."""
+    year = year or get_today().year
+    key_name, key_value = _partition_key(group, year)
+    try:
+        items = list(
+            _query_year_items(
+                year,
+                group=group,
+                table=table_daily,
+                index_name=(
+                    DAILY_YEAR_INDEX_NAME if key_name == "year" else DAILY_GROUP_INDEX_NAME
+                ),
+                sort_key="date_day",
+            )
+        )
+    except ClientError as e:
+        _rollup_missing(e)
+        if not _daily_rollup_available:
+            raise
+        logger.warning(f"Rollup index query failed, falling back to scan: {e}")
+        items = []
+        scan_kwargs = {"FilterExpression": Attr(key_name).eq(key_value)}
+        while True:
+            result = table_daily.scan(**scan_kwargs)
+            items.extend(result.get("Items", []))
+            if not result.get("LastEvaluatedKey"):
+                break
+            scan_kwargs["ExclusiveStartKey"] = result["LastEvaluatedKey"]
+    if group != DEFAULT_GROUP:
+        prefix = _rollup_name(group, "")
+        items = [{**item, "name": item["name"][len(prefix) :]} for item in items]
+    return _normalize_daily_items(items)
+
+
+def daily_totals_from_sessions(df):
+    """Same shape as load_daily_rollup(), aggregated from the session frame."""
+    if df.empty:
+        return _normalize_daily_items([])
+    return (
+        df.groupby(["date_day", "name"], as_index=False, observed=True)
+        .agg(
+            squats=("squats", "sum"),
+            plank_seconds=("plank_seconds", "sum"),
+            sessions=("squats", "size"),
+        )[DAILY_COLUMNS]
+        .astype(DAILY_DTYPES)
+    )
+
+
 def today_data(data=None, date=None):
     if data is None:
         data = load_all()
-    data = data.copy()
-    data["date"] = data["date"].dt.date
-
     target_date = (
         date if date is not None else (datetime.now() + timedelta(hours=1)).date()
     )
 
-    extract = data[data["date"] == target_date].reset_index()
+    extract = data[data["date"].dt.date == target_date].reset_index()
     # return only name and squats
     return extract[["name", "squats"]]
 
@@ -485,6 +1389,11 @@ api_key = os.environ["MISTRAL_API_KEY"]
 client = Mistral(api_key=api_key)
 
 
+# Hard limit on the Mistral HTTP call itself
+MISTRAL_TIMEOUT_MS = 15000
+MISTRAL_FALLBACK_MESSAGE = "Bon courage mon reuf"
+
+
 def mistral_chat(message):
     try:
         chat_response = client.agents.complete(
@@ -495,38 +1404,837 @@ def mistral_chat(message):
                     "content": message,
                 },
             ],
+            timeout_ms=MISTRAL_TIMEOUT_MS,
         )
         return chat_response.choices[0].message.content
     except Exception as e:
         logger.error(f"Mistral API error: {e}")
         print(e)
-        return "Bon courage mon reuf"
+        return MISTRAL_FALLBACK_MESSAGE
+
+
+def motivation_fingerprint(
+    name, day, squats_today, streak, bucket=10, group=DEFAULT_GROUP
+):
+    """Compact cache key for a motivation message.
+
+    Today's squats are bucketed so that a 12 -> 15 update reuses the same
+    message; the prompt itself (team context, facts) never enters the key,
+    but its group does: two groups can share a name, not a team context.
+    The default group keeps its original keys.
+    """
+    raw = f"{name}|{day}|{int(squats_today) // bucket}|{int(streak)}"
+    if group != DEFAULT_GROUP:
+        raw = f"{group}|{raw}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class MotivationCache:
+    """Disk-backed LRU of motivation messages keyed on a stats fingerprint.
+
+    Survives restarts, so a redeploy doesn't re-pay the API for today's
+    messages. The JSON file is rewritten atomically on every insert.
+    """
+
+    def __init__(self, path, max_entries=512):
+        self.path = path
+        self.max_entries = max_entries
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = OrderedDict()
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path) as f:
+                    self._entries.update(json.load(f))
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable motivation cache {self.path}: {e}")
+
+    def get(self, key):
+        with self._lock:
+            self._load()
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._load()
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if not self.path:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(f"{self.path}.tmp", "w") as f:
+                    json.dump(self._entries, f, ensure_ascii=False)
+                os.replace(f"{self.path}.tmp", self.path)
+            except OSError as e:
+                logger.warning(f"Could not write motivation cache {self.path}: {e}")
+
+
+MOTIVATION_CACHE_PATH = os.environ.get(
+    "SQUATS_MOTIVATION_CACHE_PATH", os.path.join(".cache", "motivation_cache.json")
+)
+_motivation_cache = MotivationCache(MOTIVATION_CACHE_PATH)
+
+# Motivation messages are generated off the script thread: a slow Mistral API
+# never holds up a render, and concurrent reruns share the same in-flight call.
+_mistral_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="mistral")
+_motivation_futures = {}
+_motivation_lock = threading.Lock()
+
+
+def _generate_motivation(fingerprint, message):
+    response = mistral_chat(message)
+    if response != MISTRAL_FALLBACK_MESSAGE:
+        _motivation_cache.put(fingerprint, response)
+    with _motivation_lock:
+        _motivation_futures.pop(fingerprint, None)
+    return response
+
+
+def request_motivation(fingerprint, build_prompt):
+    """Return a Future with the motivation message for fingerprint.
+
+    Cache hits come back as an already-completed Future. On a miss
+    build_prompt() is called (only then) and mistral_chat runs in the
+    background; callers poll future.done() instead of waiting on it.
+    """
+    cached = _motivation_cache.get(fingerprint)
+    if cached is not None:
+        future = Future()
+        future.set_result(cached)
+        return future
+
+    with _motivation_lock:
+        future = _motivation_futures.get(fingerprint)
+        if future is None:
+            future = _mistral_executor.submit(
+                _generate_motivation, fingerprint, build_prompt()
+            )
+            _motivation_futures[fingerprint] = future
+        return future
 
 
 # Centralized cached data fetch - shared across all pages
-_squat_dataframe_cache = {"data": None, "timestamp": None}
 _CACHE_TTL_SECONDS = 120
 
+# Local copy of the normalized frame + its sync watermark, so a fresh process
+# (Streamlit Cloud wake-up, deploy) only delta-syncs instead of a full load.
+SNAPSHOT_PATH = os.environ.get(
+    "SQUATS_SNAPSHOT_PATH", os.path.join(".cache", "squats_snapshot.parquet")
+)
+
+
+def _snapshot_meta_path(path):
+    return os.path.splitext(path)[0] + ".json"
+
+
+def _group_snapshot_path(group):
+    """Snapshot file of a group (the default group keeps SNAPSHOT_PATH)."""
+    check_group_id(group)
+    if group == DEFAULT_GROUP:
+        return SNAPSHOT_PATH
+    root, extension = os.path.splitext(SNAPSHOT_PATH)
+    return f"{root}_{group}{extension}"
+
+
+def save_snapshot(df, watermark, path=SNAPSHOT_PATH, epoch=0):
+    """Persist the normalized frame (Parquet), its watermark and data epoch (JSON sidecar).
+
+    The frame is written before the sidecar: a crash in between leaves an
+    older watermark, which only means re-syncing a few rows.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+    meta_path = _snapshot_meta_path(path)
+    with open(f"{meta_path}.tmp", "w") as f:
+        json.dump(
+            {
+                "watermark": watermark,
+                "year": get_today().year,
+                "rows": len(df),
+                "epoch": epoch,
+            },
+            f,
+        )
+    os.replace(f"{meta_path}.tmp", meta_path)
+
+
+def load_snapshot(path=SNAPSHOT_PATH, epoch=None):
+    """Return (df, watermark) from the local snapshot, or (None, None).
+
+    Snapshots from a previous year are ignored: the challenge restarts. So
+    are snapshots taken before the group's current data epoch (an import
+    since then added rows the watermark would never fetch).
+    """
+    meta_path = _snapshot_meta_path(path)
+    if not (os.path.exists(path) and os.path.exists(meta_path)):
+        return None, None
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("year") != get_today().year or not meta.get("watermark"):
+            return None, None
+        if epoch is not None and meta.get("epoch", 0) != epoch:
+            logger.info(f"Snapshot {path} predates data epoch {epoch}, reloading")
+            return None, None
+        return _apply_session_dtypes(pd.read_parquet(path)), meta["watermark"]
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable snapshot {path}: {e}")
+        return None, None
+
+
+class SessionSnapshot:
+    """Immutable, versioned session frame published by SquatDataCache.
+
+    `frame` holds the session columns plus derived ones computed once per
+    version: time_minutes (minutes since midnight) and cumulative_squats
+    (per-name running total, in chronological order). It is shared by every
+    rerun: read it and derive new frames from it, never assign into it.
+    """
+
+    __slots__ = ("version", "frame", "source", "name_versions", "group", "_orders")
+
+    def __init__(self, df, version, name_versions=None, group=DEFAULT_GROUP):
+        frame = df.assign(
+            time_minutes=(df["date"].dt.hour * 60 + df["date"].dt.minute).astype(
+                "int16"
+            ),
+            cumulative_squats=df.groupby("name", observed=True)["squats"]
+            .cumsum()
+            .astype("int32"),
+        )
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "frame", frame)
+        # The cached frame it was built from, to reuse it while unchanged
+        object.__setattr__(self, "source", df)
+        # Version at which each name's sessions last changed
+        object.__setattr__(self, "name_versions", dict(name_versions or {}))
+        object.__setattr__(self, "group", group)
+        # Sort permutations built by sort_order(), per column
+        object.__setattr__(self, "_orders", {})
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SessionSnapshot is read-only")
+
+    def __repr__(self):
+        return (
+            f"SessionSnapshot(group={self.group!r}, version={self.version}, "
+            f"rows={len(self.frame)})"
+        )
+
+    def name_version(self, name):
+        return self.name_versions.get(name, 0)
+
+    def sort_order(self, column="date"):
+        """Row positions sorted by column, then by (date, name), built once per version."""
+        order = self._orders.get(column)
+        if order is None:
+
+            def sort_key(values):
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    return values.cat.codes.to_numpy()
+                return values.to_numpy()
+
+            # np.lexsort sorts on the last key first
+            keys = [sort_key(self.frame["name"]), sort_key(self.frame["date"])]
+            if column not in ("date", "name"):
+                keys.append(sort_key(self.frame[column]))
+            elif column == "name":
+                keys.append(keys[0])
+            order = np.lexsort(keys).astype(np.int32)
+            self._orders[column] = order
+        return order
+
+    def page(self, sort_by="date", ascending=False, names=None, offset=0, limit=50):
+        """One page of the frame, sorted and filtered without copying the rest.
+
+        Returns (rows, total) where total counts every row matching names.
+        """
+        order = self.sort_order(sort_by)
+        if not ascending:
+            order = order[::-1]
+        if names:
+            matches = self.frame["name"].isin(names).to_numpy()
+            order = order[matches[order]]
+        return self.frame.iloc[order[offset : offset + limit]], len(order)
+
+
+def _session_summary(df):
+    return df.groupby(df["name"].astype(str)).agg(
+        rows=("date", "size"), last=("date", "max"), total=("value", "sum")
+    )
+
 
-def fetch_squat_dataframe_cached():
-    """Centralized cached fetch for all pages. TTL = 120s."""
-    import time
+def _changed_names(old, new):
+    """Names whose sessions differ between two frames (all of them if old is None)."""
+    if old is None:
+        return set(new["name"].astype(str))
+    before, after = _session_summary(old).align(_session_summary(new))
+    return set(before.index[(before != after).any(axis=1)])
 
-    now = time.time()
-    if (
-        _squat_dataframe_cache["data"] is not None
-        and _squat_dataframe_cache["timestamp"] is not None
-        and (now - _squat_dataframe_cache["timestamp"]) < _CACHE_TTL_SECONDS
+
+class SquatDataCache:
+    """Process-wide, thread-safe cache of one group's session DataFrame.
+
+    Streamlit runs concurrent reruns in separate threads. When the TTL expires
+    only one of them refreshes (single flight); the others get the stale frame
+    meanwhile, or wait if there is nothing cached yet.
+    """
+
+    def __init__(
+        self, group=DEFAULT_GROUP, ttl_seconds=_CACHE_TTL_SECONDS, snapshot_path=""
     ):
-        return _squat_dataframe_cache["data"]
+        self.group = group
+        self.ttl_seconds = ttl_seconds
+        if snapshot_path == "":
+            snapshot_path = _group_snapshot_path(group)
+        # "" = the group's default path; None disables the on-disk snapshot
+        self.snapshot_path = snapshot_path
+        self._snapshot_checked = snapshot_path is None
+        self._lock = threading.Lock()
+        self._refresh_done = threading.Condition(self._lock)
+        self._data = None
+        self._watermark = None
+        self._timestamp = None
+        self._refreshing = False
+        # Items written while a refresh is in flight, merged into its result
+        self._written_during_refresh = []
+        # Bumped by clear() so an in-flight refresh can't resurrect old data
+        self._generation = 0
+        # Data epoch (see bump_data_epoch) the cached frame was loaded at
+        self._epoch = None
+        # Bumped whenever _data changes; tags the published SessionSnapshot
+        self._version = 0
+        self._name_versions = {}
+        self._published = None
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_count = 0
+        self.refresh_seconds_total = 0.0
+        self.last_refresh_seconds = None
+
+    def _is_fresh(self, now):
+        return (
+            self._data is not None
+            and self._timestamp is not None
+            and (now - self._timestamp) < self.ttl_seconds
+        )
+
+    def get(self):
+        with self._lock:
+            while True:
+                if self._is_fresh(time.time()):
+                    self.hits += 1
+                    return self._data
+                if not self._refreshing:
+                    break
+                if self._data is not None:
+                    # Stale-while-revalidate: someone else is already loading
+                    self.stale_hits += 1
+                    return self._data
+                self._refresh_done.wait()
+
+            self.misses += 1
+            self._refreshing = True
+            previous, watermark = self._data, self._watermark
+            generation = self._generation
+            known_epoch = self._epoch
+            read_snapshot = not self._snapshot_checked
+            self._snapshot_checked = True
+
+        started = time.perf_counter()
+        try:
+            # One GetItem per refresh; None (unreadable) keeps the cached frame
+            epoch = load_data_epoch(self.group)
+            if epoch is None:
+                epoch = known_epoch
+            elif previous is not None and epoch != known_epoch:
+                logger.info(f"Data epoch of {self.group} is now {epoch}, reloading")
+                previous, watermark = None, None
+            if previous is None and read_snapshot:
+                previous, watermark = load_snapshot(self.snapshot_path, epoch)
+            synced_from = watermark
+            if previous is None:
+                df, watermark = load_all(with_watermark=True, group=self.group)
+            else:
+                df, watermark = sync_squat_dataframe(previous, watermark, self.group)
+            changed = df is not previous or watermark != synced_from
+            if changed:
+                df = df.sort_values("date")
+        except Exception:
+            with self._lock:
+                self._refreshing = False
+                self._written_during_refresh = []
+                self._refresh_done.notify_all()
+            if previous is None:
+                raise
+            logger.exception("Squat data refresh failed, serving stale data")
+            return previous
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            if generation == self._generation:
+                if self._written_during_refresh:
+                    df = _merge_sessions(
+                        df, _normalize_items(self._written_during_refresh)
+                    )
+                if df is not self._data:
+                    self._bump(_changed_names(self._data, df))
+                    self._data = df
+                self._watermark = watermark
+                self._epoch = epoch
+                self._timestamp = time.time()
+            self._refreshing = False
+            self._written_during_refresh = []
+            self.refresh_count += 1
+            self.refresh_seconds_total += elapsed
+            self.last_refresh_seconds = elapsed
+            self._refresh_done.notify_all()
+
+        if changed and self.snapshot_path is not None and generation == self._generation:
+            try:
+                save_snapshot(df, watermark, self.snapshot_path, epoch or 0)
+            except Exception as e:
+                logger.warning(f"Could not write snapshot {self.snapshot_path}: {e}")
+        return df
+
+    def append_items(self, items):
+        """Write-through: add freshly written raw items to the cached frame.
+
+        The watermark is left alone on purpose: other writers' items older than
+        ours may not be synced yet, and the next delta sync de-duplicates.
+        """
+        with self._lock:
+            if self._refreshing:
+                self._written_during_refresh.extend(items)
+            if self._data is not None:
+                self._data = _merge_sessions(self._data, _normalize_items(items))
+                self._bump({item["name"] for item in items})
+
+    def _bump(self, names):
+        """New data version; names are the ones whose sessions changed."""
+        self._version += 1
+        for name in names:
+            self._name_versions[name] = self._version
+
+    def snapshot(self):
+        """The cached frame as a SessionSnapshot, built once per version."""
+        df = self.get()
+        with self._lock:
+            published = self._published
+            if published is not None and published.source is df:
+                return published
+            version = self._version
+            name_versions = dict(self._name_versions)
+        published = SessionSnapshot(df, version, name_versions, self.group)
+        with self._lock:
+            if df is self._data and version == self._version:
+                self._published = published
+        return published
+
+    def clear(self):
+        with self._lock:
+            self._data = None
+            self._published = None
+            self._version += 1
+            self._name_versions = {}
+            self._written_during_refresh = []
+            self._watermark = None
+            self._timestamp = None
+            self._generation += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "refresh_count": self.refresh_count,
+                "avg_refresh_seconds": (
+                    self.refresh_seconds_total / self.refresh_count
+                    if self.refresh_count
+                    else 0.0
+                ),
+                "last_refresh_seconds": self.last_refresh_seconds,
+            }
+
+
+class GroupedCache:
+    """One cache per challenge group, created on first use by factory(group).
+
+    Groups never share an instance: refreshing, filling or evicting one
+    group's cache leaves the others untouched. Only known groups get one
+    (get_group() raises KeyError otherwise), so arbitrary ids can't grow it.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._caches = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, group=DEFAULT_GROUP):
+        with self._lock:
+            cache = self._caches.get(group)
+        if cache is None:
+            get_group(group)
+            with self._lock:
+                cache = self._caches.get(group)
+                if cache is None:
+                    cache = self._caches[group] = self._factory(group)
+        return cache
+
+    def groups(self):
+        with self._lock:
+            return list(self._caches)
+
+    def clear(self):
+        with self._lock:
+            caches = list(self._caches.values())
+        for cache in caches:
+            cache.clear()
+
+
+squat_data_cache = GroupedCache(SquatDataCache)
+
+
+def fetch_squat_dataframe_cached(group=DEFAULT_GROUP):
+    """Centralized cached fetch for all pages, per group. TTL = 120s.
+
+    First load is a full load; once the TTL expires only the sessions newer
+    than the stored watermark are fetched and appended.
+    """
+    return squat_data_cache(group).get()
+
+
+def fetch_session_snapshot(group=DEFAULT_GROUP):
+    """Cached sessions of a group as an immutable SessionSnapshot (frame + version)."""
+    return squat_data_cache(group).snapshot()
+
+
+_crew_stats_memo = {}
+_crew_stats_lock = threading.Lock()
+
+
+def cached_crew_stats(snapshot, days_left, squat_objectif_quotidien=20, names=()):
+    """CrewStats of a snapshot, shared by every rerun until the data or the day changes.
+
+    One entry per group, so groups don't evict each other.
+    """
+    key = (
+        snapshot.version,
+        get_today().date(),
+        days_left,
+        squat_objectif_quotidien,
+        tuple(names),
+    )
+    with _crew_stats_lock:
+        memo = _crew_stats_memo.get(snapshot.group)
+        if memo is not None and memo[0] == key:
+            return memo[1]
+    crew_stats = CrewStats(
+        snapshot.source,
+        days_left=days_left,
+        squat_objectif_quotidien=squat_objectif_quotidien,
+        names=names,
+    )
+    with _crew_stats_lock:
+        _crew_stats_memo[snapshot.group] = (key, crew_stats)
+    return crew_stats
+
+
+class LRUCache:
+    """Small process-wide, thread-safe LRU of computed values.
+
+    build() runs outside the lock: two threads missing the same key at once
+    both build it and the last one wins, which is harmless for pure values.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        """Cached value for key, or build() it on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = build()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class ParticipantCache(LRUCache):
+    """Process-wide LRU of one group's per-participant stats rows.
+
+    Entries are keyed on (name, version of that name's last change, day,
+    daily goal, days left), so concurrent sessions share them and a new
+    session only invalidates the writer's entry; stale keys simply age out.
+    Entries are plain dicts: a cached entry never keeps a CrewStats (and
+    the session frame behind it) alive.
+    """
+
+    def get(self, name, snapshot, crew_stats):
+        """Participant for name over crew_stats, with its stats row cached."""
+        key = (
+            name,
+            snapshot.name_version(name),
+            get_today().date(),
+            crew_stats.squat_objectif_quotidien,
+            crew_stats.days_left,
+        )
+        stats = super().get(key, lambda: crew_stats.stats_for(name).to_dict())
+        return crew_stats.participant(name, stats)
 
-    df = load_all()
-    _squat_dataframe_cache["data"] = df.sort_values("date")
-    _squat_dataframe_cache["timestamp"] = now
-    return _squat_dataframe_cache["data"]
 
+participant_cache = GroupedCache(lambda group: ParticipantCache())
 
-def clear_squat_dataframe_cache():
-    """Clear the cache after writes."""
-    _squat_dataframe_cache["data"] = None
-    _squat_dataframe_cache["timestamp"] = None
+# Plotly figures keyed on (chart id, data version, selection), one LRU per
+# group: figure_cache(group).get(key, build). Shared between sessions: never
+# mutate a figure returned from here.
+figure_cache = GroupedCache(lambda group: LRUCache(max_entries=128))
+
+# Above this many points per series, charts plot bucket aggregates instead
+CHART_MAX_POINTS = 200
+
+
+def downsample_series(df, x, columns, by=None, max_points=CHART_MAX_POINTS, how="mean"):
+    """Thin a time series (sorted on x) to at most max_points rows per `by` group.
+
+    Consecutive rows are bucketed and aggregated with `how` ("mean" for
+    per-day values, "last" for running totals); x is the bucket's first
+    value. Short series are returned unchanged.
+    """
+    keys = [by] if by else []
+    longest = df.groupby(by, observed=True).size().max() if by else len(df)
+    if df.empty or longest <= max_points:
+        return df
+    step = -(-int(longest) // max_points)
+    position = df.groupby(by, observed=True).cumcount() if by else np.arange(len(df))
+    return (
+        df.assign(_bucket=position // step)
+        .groupby([*keys, "_bucket"], observed=True, as_index=False)
+        .agg({x: "first", **{column: how for column in columns}})
+        .drop(columns="_bucket")
+    )
+
+
+# "version" changes only when a reload returns different totals
+# One entry per group: {"data", "timestamp", "version"}
+_daily_totals_caches = {}
+_daily_totals_lock = threading.Lock()
+
+
+def _daily_totals_entry(group):
+    # Call with _daily_totals_lock held
+    return _daily_totals_caches.setdefault(
+        group, {"data": None, "timestamp": None, "version": 0}
+    )
+
+
+def fetch_daily_totals_cached(group=DEFAULT_GROUP):
+    """Per-user per-day totals of a group for dashboards (name, date_day, squats, ...).
+
+    Reads the rollup table (at most 365 x participants rows); without it,
+    aggregates the cached session frame instead. TTL = 120s, cleared on writes.
+    """
+    with _daily_totals_lock:
+        cache = _daily_totals_entry(group)
+        if (
+            cache["data"] is not None
+            and cache["timestamp"] is not None
+            and (time.time() - cache["timestamp"]) < _CACHE_TTL_SECONDS
+        ):
+            return cache["data"]
+
+    daily = None
+    if _daily_rollup_available:
+        try:
+            daily = load_daily_rollup(group=group)
+        except ClientError as e:
+            logger.warning(f"Daily rollup unavailable, using sessions: {e}")
+    if daily is None:
+        daily = daily_totals_from_sessions(fetch_squat_dataframe_cached(group))
+
+    with _daily_totals_lock:
+        cache = _daily_totals_entry(group)
+        previous = cache["data"]
+        if previous is not None and previous.equals(daily):
+            daily = previous
+        else:
+            cache["data"] = daily
+            cache["version"] += 1
+        cache["timestamp"] = time.time()
+    return daily
+
+
+def daily_totals_version(group=DEFAULT_GROUP):
+    """Version of the frame fetch_daily_totals_cached(group) returns, for memo keys."""
+    with _daily_totals_lock:
+        return _daily_totals_entry(group)["version"]
+
+
+def clear_daily_totals_cache(group=DEFAULT_GROUP):
+    """Force a reload on the next fetch (the old frame is kept to compare)."""
+    with _daily_totals_lock:
+        _daily_totals_entry(group)["timestamp"] = None
+
+
+class CorrelationAccumulator:
+    """Running Pearson sums over per-day squat totals, for every pair of names.
+
+    Keeps n (days), Σx per name and Σxy per pair (Σx² on the diagonal) as
+    exact int64 sums. sync() only replays the days whose totals changed since
+    the last frame (subtract the old day, add the new one), so a correlation
+    lookup is O(participants²) whatever the length of the history. A name
+    counts as 0 on days it has no row, like the zero-filled pivot it replaces.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frame = None
+        self._totals = None
+        self._index = {}
+        self._days = {}
+        self._n = 0
+        self._sum_x = np.zeros(0, dtype=np.int64)
+        self._sum_xy = np.zeros((0, 0), dtype=np.int64)
+
+    def _grow(self, names):
+        new_names = [name for name in names if name not in self._index]
+        if not new_names:
+            return
+        for name in new_names:
+            self._index[name] = len(self._index)
+        size = len(self._index)
+        pad = size - len(self._sum_x)
+        self._sum_x = np.pad(self._sum_x, (0, pad))
+        self._sum_xy = np.pad(self._sum_xy, ((0, pad), (0, pad)))
+
+    def _apply_day(self, positions, values, sign):
+        self._n += sign
+        self._sum_x[positions] += sign * values
+        self._sum_xy[np.ix_(positions, positions)] += sign * np.outer(values, values)
+
+    def sync(self, daily):
+        """Bring the sums up to date with a fetch_daily_totals_cached() frame."""
+        with self._lock:
+            if daily is self._frame:
+                return
+            totals = pd.Series(
+                daily["squats"].to_numpy(dtype=np.int64),
+                index=pd.MultiIndex.from_arrays(
+                    [daily["date_day"], daily["name"].astype(str)]
+                ),
+            )
+            days = set(totals.index.get_level_values(0).unique())
+            if self._totals is None:
+                changed = days
+            else:
+                delta = totals.sub(self._totals, fill_value=0)
+                changed = set(delta.index[delta != 0].get_level_values(0).unique())
+                changed |= days.symmetric_difference(self._days)
+            self._grow(totals.index.get_level_values(1).unique())
+
+            by_day = totals[totals.index.get_level_values(0).isin(list(changed))]
+            for day in changed:
+                if day in self._days:
+                    self._apply_day(*self._days.pop(day), sign=-1)
+            for day, day_totals in by_day.groupby(level=0):
+                positions = np.array(
+                    [self._index[name] for name in day_totals.index.get_level_values(1)]
+                )
+                entry = (positions, day_totals.to_numpy())
+                self._days[day] = entry
+                self._apply_day(*entry, sign=1)
+
+            self._totals = totals
+            self._frame = daily
+
+    def correlation(self, names):
+        """Pearson matrix of names (DataFrame), NaN where a name never varies."""
+        names = list(names)
+        with self._lock:
+            positions = [self._index[name] for name in names if name in self._index]
+            if len(positions) != len(names):
+                missing = [name for name in names if name not in self._index]
+                raise KeyError(f"No daily totals for {missing}")
+            sum_x = self._sum_x[positions].astype(np.float64)
+            sum_xy = self._sum_xy[np.ix_(positions, positions)].astype(np.float64)
+            n = self._n
+        covariance = n * sum_xy - np.outer(sum_x, sum_x)
+        variance = np.diag(covariance)
+        denominator = np.sqrt(np.outer(variance, variance))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            matrix = np.where(denominator > 0, covariance / denominator, np.nan)
+        return pd.DataFrame(matrix, index=names, columns=names)
+
+
+def extreme_pairs(correlation_matrix):
+    """(best, worst) pairs of a correlation matrix as dicts s1/s2/value.
+
+    Scans the upper triangle only; returns (None, None) without a finite pair.
+    """
+    values = correlation_matrix.to_numpy()
+    rows, columns = np.triu_indices(len(values), k=1)
+    upper = values[rows, columns]
+    if not np.isfinite(upper).any():
+        return None, None
+    names = correlation_matrix.columns
+
+    def pair(position):
+        return {
+            "s1": names[rows[position]],
+            "s2": names[columns[position]],
+            "value": upper[position],
+        }
+
+    return pair(np.nanargmax(upper)), pair(np.nanargmin(upper))
+
+
+_correlation_accumulators = GroupedCache(lambda group: CorrelationAccumulator())
+
+
+def fetch_correlation_accumulator(group=DEFAULT_GROUP):
+    """The group's accumulator, synced with its cached daily totals (TTL = 120s)."""
+    accumulator = _correlation_accumulators(group)
+    accumulator.sync(fetch_daily_totals_cached(group))
+    return accumulator
+
+
+def clear_squat_dataframe_cache(group=None):
+    """Clear the cache after writes (next fetch does a full reload).
+
+    group=None clears every group's cache.
+    """
+    if group is None:
+        squat_data_cache.clear()
+    elif group in squat_data_cache.groups():
+        squat_data_cache(group).clear()
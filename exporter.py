@@ -0,0 +1,160 @@
+"""Filtered export of the current-year sessions to CSV or Parquet.
+
+    python exporter.py squats.csv
+    python exporter.py squats.parquet --name Max --exercise PLANK
+    python exporter.py squats.csv --since 2026-01-01 --until 2026-03-31
+    python exporter.py squats.csv --group autre-groupe
+
+Rows are filtered on the cached session snapshot and written chunk by chunk
+(one CSV block or Parquet row group at a time), so the file is never built as
+one string in memory. The Data page's download button is the exception:
+Streamlit holds the whole file in memory, so it is capped at
+MAX_DOWNLOAD_ROWS and bigger exports go through this script.
+"""
+
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+from config import DEFAULT_GROUP, SESSION_COLUMNS, fetch_session_snapshot, logger
+
+CHUNK_ROWS = 5000
+# Exports bigger than this spill from memory to a temporary file on disk
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+# st.download_button keeps the whole file in memory (~60 bytes per CSV row)
+MAX_DOWNLOAD_ROWS = 200_000
+EXPORT_COLUMNS = SESSION_COLUMNS + ["cumulative_squats"]
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _export_mask(df, names=None, exercises=None, since=None, until=None):
+    mask = pd.Series(True, index=df.index)
+    if names:
+        mask &= df["name"].isin(names)
+    if exercises:
+        mask &= df["exercise"].isin(exercises)
+    if since is not None:
+        mask &= df["date_day"] >= pd.Timestamp(since).normalize()
+    if until is not None:
+        mask &= df["date_day"] <= pd.Timestamp(until).normalize()
+    return mask
+
+
+def filter_sessions(df, **filters):
+    """Rows of a session frame matching the filters (None = no filter).
+
+    Filters are names, exercises, since and until; since/until are inclusive
+    days (date, datetime or ISO string).
+    """
+    mask = _export_mask(df, **filters)
+    return df.loc[mask, [column for column in EXPORT_COLUMNS if column in df]]
+
+
+def count_export_rows(df, **filters):
+    """Number of rows an export with these filters would write."""
+    return int(_export_mask(df, **filters).sum())
+
+
+def iter_export_chunks(df, chunksize=CHUNK_ROWS, **filters):
+    """Yield the filtered rows of df, filtering chunksize source rows at a time."""
+    for start in range(0, len(df), chunksize):
+        chunk = filter_sessions(df.iloc[start : start + chunksize], **filters)
+        if not chunk.empty:
+            yield chunk
+
+
+def _write_csv(header, chunks, target):
+    target.write(header.to_csv(index=False).encode("utf-8"))
+    for chunk in chunks:
+        target.write(chunk.to_csv(index=False, header=False).encode("utf-8"))
+
+
+def _write_parquet(header, chunks, target):
+    # pyarrow ships with streamlit
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(header, preserve_index=False)
+    with pq.ParquetWriter(target, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(
+                pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            )
+
+
+def export_sessions(df, target, fmt="csv", chunksize=CHUNK_ROWS, **filters):
+    """Write the filtered sessions of df to a binary file object.
+
+    filters are those of filter_sessions(). Returns the number of rows written.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    writer = _write_parquet if fmt == "parquet" else _write_csv
+    rows = 0
+
+    def counted(chunks):
+        nonlocal rows
+        for chunk in chunks:
+            rows += len(chunk)
+            yield chunk
+
+    header = filter_sessions(df.iloc[:0])
+    writer(header, counted(iter_export_chunks(df, chunksize, **filters)), target)
+    return rows
+
+
+def export_file(df, fmt="csv", chunksize=CHUNK_ROWS, **filters):
+    """Export to a spooled temporary file, rewound and ready to be read."""
+    target = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    rows = export_sessions(df, target, fmt, chunksize, **filters)
+    target.seek(0)
+    logger.info(f"Exported {rows} rows as {fmt}")
+    return target
+
+
+def export_bytes(
+    df, fmt="csv", chunksize=CHUNK_ROWS, max_rows=MAX_DOWNLOAD_ROWS, **filters
+):
+    """The export file's content, for st.download_button's deferred data callable.
+
+    Streamlit cannot stream a download: whatever the callable returns
+    (str/bytes/BytesIO/BufferedReader, not a SpooledTemporaryFile) is read
+    into bytes and kept in its in-memory media file manager. The spooled
+    file is read once and closed here, and exports over max_rows raise
+    ValueError instead of being built.
+    """
+    rows = count_export_rows(df, **filters)
+    if max_rows is not None and rows > max_rows:
+        raise ValueError(f"Export too big to download: {rows} rows (max {max_rows})")
+    with export_file(df, fmt, chunksize, **filters) as target:
+        return target.read()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default=None)
+    parser.add_argument("--name", action="append", dest="names")
+    parser.add_argument("--exercise", action="append", dest="exercises")
+    parser.add_argument("--since")
+    parser.add_argument("--until")
+    parser.add_argument("--group", default=DEFAULT_GROUP)
+    args = parser.parse_args()
+
+    fmt = args.format or ("parquet" if args.path.endswith(".parquet") else "csv")
+    with open(args.path, "wb") as output:
+        count = export_sessions(
+            fetch_session_snapshot(args.group).frame,
+            output,
+            fmt,
+            names=args.names,
+            exercises=[exercise.upper() for exercise in args.exercises or []],
+            since=args.since,
+            until=args.until,
+        )
+    print(f"{count} rows written to {args.path} ({os.path.getsize(args.path)} bytes)")
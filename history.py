@@ -0,0 +1,287 @@
+"""Frozen aggregates of past seasons, for year-over-year views.
+
+    python history.py 2025            # freeze one closed season
+    python history.py 2023 2024 --force
+    python history.py --list
+
+    python history.py 2025 --group autre-groupe
+
+A closed season is written once as three immutable files under HISTORY_DIR
+(in a subdirectory per group, except for the default group): per user per
+day totals and per user season totals (Parquet) plus crew records (JSON).
+Reading a closed season never touches DynamoDB; only the current season
+comes from the live daily totals.
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    DAILY_COLUMNS,
+    DEFAULT_DAILY_GOAL,
+    DEFAULT_GROUP,
+    DAILY_DTYPES,
+    _load_year_items,
+    _normalize_items,
+    _streak_run_lengths,
+    check_group_id,
+    daily_totals_from_sessions,
+    daily_totals_version,
+    fetch_daily_totals_cached,
+    get_group,
+    get_today,
+    logger,
+)
+
+HISTORY_DIR = os.environ.get("SQUATS_HISTORY_DIR", "history")
+TOTALS_COLUMNS = [
+    "name",
+    "squats",
+    "plank_seconds",
+    "sessions",
+    "active_days",
+    "best_day",
+    "best_streak",
+]
+
+_seasons = {}
+# Current season of each group: {group: (version, season)}
+_current_seasons = {}
+_seasons_lock = threading.Lock()
+
+
+def group_history_dir(group=DEFAULT_GROUP):
+    """Directory of a group's frozen seasons."""
+    check_group_id(group)
+    if group == DEFAULT_GROUP:
+        return HISTORY_DIR
+    return os.path.join(HISTORY_DIR, group)
+
+
+def _season_paths(year, directory):
+    prefix = os.path.join(directory, f"season_{int(year)}")
+    return {
+        "daily": f"{prefix}_daily.parquet",
+        "totals": f"{prefix}_totals.parquet",
+        "records": f"{prefix}.json",
+    }
+
+
+def season_totals(daily, goal=DEFAULT_DAILY_GOAL):
+    """Per user season totals of a daily totals frame (one row per name).
+
+    best_streak counts consecutive days with at least goal squats.
+    """
+    if daily.empty:
+        return pd.DataFrame(columns=TOTALS_COLUMNS)
+    daily = daily.sort_values(["name", "date_day"])
+    names = daily["name"].astype(str).to_numpy()
+    days = daily["date_day"].to_numpy().astype("datetime64[D]")
+    # A run restarts at every new name and at every gap in the dates
+    breaks = np.concatenate(
+        ([True], (names[1:] != names[:-1]) | (np.diff(days).astype(int) != 1))
+    )
+    streaks = _streak_run_lengths(daily["squats"].to_numpy() >= goal, breaks)
+    totals = (
+        daily.assign(name=names, streak=streaks, active=daily["squats"] > 0)
+        .groupby("name")
+        .agg(
+            squats=("squats", "sum"),
+            plank_seconds=("plank_seconds", "sum"),
+            sessions=("sessions", "sum"),
+            active_days=("active", "sum"),
+            best_day=("squats", "max"),
+            best_streak=("streak", "max"),
+        )
+        .reset_index()
+    )
+    return totals[TOTALS_COLUMNS].astype(
+        {column: "int32" for column in TOTALS_COLUMNS[1:]}
+    )
+
+
+def season_records(year, daily, totals, goal=DEFAULT_DAILY_GOAL):
+    """Crew records of a season, JSON-serializable."""
+    records = {
+        "year": int(year),
+        "goal": int(goal),
+        "participants": int(len(totals)),
+        "squats": int(totals["squats"].sum()),
+        "plank_seconds": int(totals["plank_seconds"].sum()),
+        "sessions": int(totals["sessions"].sum()),
+        "best_day": None,
+        "best_streak": None,
+        "top_squatter": None,
+    }
+    if not daily.empty:
+        best = daily.loc[daily["squats"].idxmax()]
+        records["best_day"] = {
+            "name": str(best["name"]),
+            "date": best["date_day"].strftime("%Y-%m-%d"),
+            "squats": int(best["squats"]),
+        }
+        streak = totals.loc[totals["best_streak"].idxmax()]
+        records["best_streak"] = {"name": streak["name"], "days": int(streak["best_streak"])}
+        top = totals.loc[totals["squats"].idxmax()]
+        records["top_squatter"] = {"name": top["name"], "squats": int(top["squats"])}
+    return records
+
+
+def _build_season(year, daily, goal):
+    totals = season_totals(daily, goal)
+    return {
+        "year": int(year),
+        "daily": daily,
+        "totals": totals,
+        "records": season_records(year, daily, totals, goal),
+    }
+
+
+def _load_season_daily(year, group=DEFAULT_GROUP):
+    """Daily totals of one group's year, aggregated from its sessions.
+
+    Never from the rollup: it only holds the writes made since it was created
+    (or rebuilt), and a frozen season can't be corrected later.
+    """
+    daily = daily_totals_from_sessions(_normalize_items(_load_year_items(year, group)))
+    return daily[daily["date_day"].dt.year == int(year)].reset_index(drop=True)
+
+
+def freeze_season(year, group=DEFAULT_GROUP, force=False):
+    """Aggregate a group's closed season once and write its files; returns its records.
+
+    The current season can't be frozen, and existing files are kept unless
+    force=True. Streaks use the group's daily goal at freeze time.
+    """
+    year = int(year)
+    directory = group_history_dir(group)
+    if year >= get_today().year:
+        raise ValueError(f"Season {year} is not over yet")
+    paths = _season_paths(year, directory)
+    if os.path.exists(paths["records"]) and not force:
+        raise FileExistsError(f"Season {year} is already frozen in {directory}")
+
+    goal = get_group(group)["daily_goal"]
+    season = _build_season(year, _load_season_daily(year, group), goal)
+    season["records"]["frozen_at"] = datetime.now().isoformat(timespec="seconds")
+    os.makedirs(directory, exist_ok=True)
+    for key in ("daily", "totals"):
+        season[key].to_parquet(f"{paths[key]}.tmp", index=False)
+        os.replace(f"{paths[key]}.tmp", paths[key])
+    # The JSON file is written last: it marks the season as frozen
+    with open(f"{paths['records']}.tmp", "w") as f:
+        json.dump(season["records"], f, ensure_ascii=False, indent=2)
+    os.replace(f"{paths['records']}.tmp", paths["records"])
+
+    with _seasons_lock:
+        _seasons.pop((directory, year), None)
+    logger.info(f"Froze season {year}: {len(season['daily'])} daily rows")
+    return season["records"]
+
+
+def frozen_seasons(group=DEFAULT_GROUP):
+    """Years with frozen files for a group, in ascending order."""
+    directory = group_history_dir(group)
+    if not os.path.isdir(directory):
+        return []
+    pattern = re.compile(r"season_(\d{4})\.json$")
+    return sorted(
+        int(match.group(1))
+        for match in map(pattern.match, os.listdir(directory))
+        if match
+    )
+
+
+def available_seasons(group=DEFAULT_GROUP):
+    """Frozen seasons of a group plus the current one, in ascending order."""
+    current = get_today().year
+    return [year for year in frozen_seasons(group) if year < current] + [current]
+
+
+def load_season(year, group=DEFAULT_GROUP):
+    """Season dict (year, daily, totals, records); treat it as read-only.
+
+    Closed seasons are read from their frozen files once per process; the
+    current season is rebuilt from fetch_daily_totals_cached() when it changes.
+    """
+    year = int(year)
+    if year == get_today().year:
+        daily = fetch_daily_totals_cached(group)
+        goal = get_group(group)["daily_goal"]
+        version = (year, daily_totals_version(group), goal)
+        with _seasons_lock:
+            cached = _current_seasons.get(group)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+        season = _build_season(year, daily, goal)
+        with _seasons_lock:
+            _current_seasons[group] = (version, season)
+        return season
+
+    directory = group_history_dir(group)
+    key = (directory, year)
+    with _seasons_lock:
+        if key in _seasons:
+            return _seasons[key]
+    paths = _season_paths(year, directory)
+    if not os.path.exists(paths["records"]):
+        raise FileNotFoundError(f"Season {year} is not frozen (python history.py {year})")
+    with open(paths["records"]) as f:
+        records = json.load(f)
+    daily = pd.read_parquet(paths["daily"])[DAILY_COLUMNS].astype(DAILY_DTYPES)
+    season = {
+        "year": year,
+        "daily": daily,
+        "totals": pd.read_parquet(paths["totals"]),
+        "records": records,
+    }
+    with _seasons_lock:
+        _seasons[key] = season
+    return season
+
+
+def season_curves(years, group=DEFAULT_GROUP):
+    """Crew cumulative squats by day of the season, one line per year (long format)."""
+    curves = []
+    for year in years:
+        daily = load_season(year, group)["daily"]
+        crew = daily.groupby("date_day", as_index=False)["squats"].sum()
+        curves.append(
+            pd.DataFrame(
+                {
+                    "year": str(year),
+                    "day_of_year": crew["date_day"].dt.dayofyear,
+                    "cumulative_squats": crew["squats"].cumsum(),
+                }
+            )
+        )
+    if not curves:
+        return pd.DataFrame(columns=["year", "day_of_year", "cumulative_squats"])
+    return pd.concat(curves, ignore_index=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("years", nargs="*", type=int)
+    parser.add_argument("--group", default=DEFAULT_GROUP)
+    parser.add_argument("--force", action="store_true", help="Overwrite frozen files")
+    parser.add_argument("--list", action="store_true", help="List frozen seasons")
+    args = parser.parse_args()
+
+    if args.list or not args.years:
+        for year in frozen_seasons(args.group):
+            records = load_season(year, args.group)["records"]
+            print(
+                f"{year}: {records['squats']} squats, "
+                f"{records['participants']} participants, frozen {records.get('frozen_at')}"
+            )
+    for year in args.years:
+        records = freeze_season(year, args.group, force=args.force)
+        print(f"Season {year} frozen: {records['squats']} squats")
@@ -0,0 +1,242 @@
+"""Bulk import of historical sessions from CSV or JSONL.
+
+    python importer.py sessions.csv
+    python importer.py sessions.jsonl --workers 8
+    python importer.py sessions.csv --dry-run
+    python importer.py sessions.csv --group autre-groupe
+
+Expected columns: name, date (ISO), value (or legacy squats), and optionally
+exercise (SQUAT/PLANK, default SQUAT) and unit.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+from config import (
+    DAILY_TABLE_NAME,
+    DEFAULT_GROUP,
+    EXERCISE_UNITS,
+    SquatWriter,
+    build_squat_item,
+    bump_data_epoch,
+    get_group,
+    logger,
+    _thread_table,
+)
+
+CHUNK_ROWS = 5000
+# Items per worker task: a handful of BatchWriteItem requests
+TASK_ITEMS = SquatWriter.BATCH_SIZE * 10
+MAX_REPORTED_ERRORS = 50
+# Write tasks queued per worker before reading more of the file
+TASKS_PER_WORKER = 2
+
+
+def _guess_format(source):
+    filename = source if isinstance(source, str) else getattr(source, "name", "")
+    extension = os.path.splitext(filename)[1].lower()
+    return "jsonl" if extension in (".jsonl", ".json") else "csv"
+
+
+def iter_import_chunks(source, fmt=None, chunksize=CHUNK_ROWS):
+    """Read a CSV or JSONL file (path or file-like) chunk by chunk."""
+    fmt = fmt or _guess_format(source)
+    if fmt == "jsonl":
+        return pd.read_json(source, lines=True, chunksize=chunksize, dtype=False)
+    return pd.read_csv(source, chunksize=chunksize, dtype=str)
+
+
+def _validate_chunk(chunk, first_line):
+    """Check a chunk against the item schema; returns (valid_rows, errors)."""
+    chunk = chunk.rename(columns=str.lower).reset_index(drop=True)
+    empty = pd.Series(pd.NA, index=chunk.index, dtype="object")
+
+    names = chunk.get("name", empty).astype("string").str.strip()
+    dates = pd.to_datetime(chunk.get("date", empty), errors="coerce", format="ISO8601")
+    if getattr(dates.dt, "tz", None) is not None:
+        # Same UTC+1 convention as get_today()
+        dates = (dates.dt.tz_convert("UTC") + pd.Timedelta(hours=1)).dt.tz_localize(None)
+    exercises = chunk.get("exercise", empty).fillna("SQUAT").astype(str).str.strip().str.upper()
+    values = pd.to_numeric(chunk.get("value", empty), errors="coerce")
+    if "squats" in chunk.columns:
+        values = values.fillna(pd.to_numeric(chunk["squats"], errors="coerce"))
+    expected_units = exercises.map(EXERCISE_UNITS)
+    units = chunk.get("unit", empty).fillna(expected_units)
+
+    problems = [
+        (names.isna() | (names == ""), "nom manquant"),
+        (dates.isna(), "date invalide"),
+        (expected_units.isna(), "exercice inconnu"),
+        (values.isna() | (values <= 0) | (values % 1 != 0), "valeur invalide"),
+        (expected_units.notna() & (units != expected_units), "unité incohérente"),
+    ]
+    invalid = pd.Series(False, index=chunk.index)
+    errors = []
+    for mask, reason in problems:
+        mask = mask.fillna(True).astype(bool) & ~invalid
+        errors.extend((first_line + i, reason) for i in mask[mask].index)
+        invalid |= mask
+    errors = [f"ligne {line}: {reason}" for line, reason in sorted(errors)]
+
+    valid = pd.DataFrame(
+        {
+            "name": names,
+            "date": dates,
+            "exercise": exercises,
+            "value": values,
+            "unit": units,
+        }
+    )[~invalid]
+    return valid, errors
+
+
+def _write_items(items):
+    # One writer (and Table resource) per worker thread
+    writer = SquatWriter(
+        _thread_table(), daily_table=_thread_table(DAILY_TABLE_NAME), write_through=False
+    )
+    for item in items:
+        writer.add_item(item)
+    writer.flush()
+    return writer.written, writer.replaced
+
+
+def _report_errors(report, errors):
+    room = MAX_REPORTED_ERRORS - len(report["errors"])
+    report["errors"].extend(errors[: max(room, 0)])
+
+
+def import_sessions(
+    source,
+    fmt=None,
+    *,
+    workers=4,
+    dry_run=False,
+    chunksize=CHUNK_ROWS,
+    group=DEFAULT_GROUP,
+):
+    """Validate, de-duplicate on (name, date) and write sessions of a group in parallel.
+
+    At most workers * TASKS_PER_WORKER write tasks are in flight, so memory
+    stays bounded by a few chunks whatever the file size. A failed task is
+    counted in "failed" and reported in errors; the other tasks still run.
+    Rows whose (name, date) is already stored overwrite it and count in
+    "replaced" too; the daily rollup only gets their difference, so
+    re-importing a file changes no total.
+    Returns a report dict (rows, written, replaced, duplicates, invalid,
+    failed, errors, seconds, rows_per_second).
+    """
+    started = time.perf_counter()
+    # Raises KeyError for an unknown group before anything is read or written
+    get_group(group)
+    fmt = fmt or _guess_format(source)
+    report = {
+        "rows": 0,
+        "written": 0,
+        "replaced": 0,
+        "duplicates": 0,
+        "invalid": 0,
+        "failed": 0,
+        "errors": [],
+    }
+    seen = set()
+    # Write task future -> number of items it carries
+    pending = {}
+
+    def collect(futures):
+        for future in futures:
+            size = pending.pop(future)
+            try:
+                written, replaced = future.result()
+                report["written"] += written
+                report["replaced"] += replaced
+            except Exception as e:
+                logger.error(f"Import write task failed: {e}")
+                report["failed"] += size
+                _report_errors(report, [f"écriture de {size} lignes: {e}"])
+
+    try:
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="squats-import"
+        ) as pool:
+            # Line 1 of a CSV is the header
+            first_line = 2 if fmt == "csv" else 1
+            for chunk in iter_import_chunks(source, fmt, chunksize):
+                report["rows"] += len(chunk)
+                valid, errors = _validate_chunk(chunk, first_line)
+                first_line += len(chunk)
+                report["invalid"] += len(errors)
+                _report_errors(report, errors)
+
+                items = []
+                for row in valid.itertuples(index=False):
+                    item = build_squat_item(
+                        row.name,
+                        row.value,
+                        exercise=row.exercise,
+                        unit=row.unit,
+                        at=row.date.to_pydatetime(),
+                        group=group,
+                    )
+                    key = (item["name"], item["date"])
+                    if key in seen:
+                        report["duplicates"] += 1
+                        continue
+                    seen.add(key)
+                    items.append(item)
+
+                if dry_run:
+                    report["written"] += len(items)
+                    continue
+                for start in range(0, len(items), TASK_ITEMS):
+                    while len(pending) >= workers * TASKS_PER_WORKER:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(done)
+                    task = items[start : start + TASK_ITEMS]
+                    pending[pool.submit(_write_items, task)] = len(task)
+    finally:
+        # Leaving the pool waited for every task, even if reading failed midway
+        collect(list(pending))
+        if report["written"] and not dry_run:
+            # Imported rows are older than every sync watermark
+            bump_data_epoch(group)
+
+    report["seconds"] = time.perf_counter() - started
+    report["rows_per_second"] = (
+        report["rows"] / report["seconds"] if report["seconds"] else 0.0
+    )
+    logger.info(
+        f"Imported {report['written']}/{report['rows']} rows "
+        f"({report['rows_per_second']:.0f} rows/s)"
+    )
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default=None)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--group", default=DEFAULT_GROUP)
+    args = parser.parse_args()
+
+    result = import_sessions(
+        args.path,
+        args.format,
+        workers=args.workers,
+        dry_run=args.dry_run,
+        group=args.group,
+    )
+    print(
+        f"{result['written']} written ({result['replaced']} replaced), "
+        f"{result['duplicates']} duplicates, "
+        f"{result['invalid']} invalid, {result['failed']} failed out of {result['rows']} rows "
+        f"in {result['seconds']:.1f}s ({result['rows_per_second']:.0f} rows/s)"
+    )
+    for error in result["errors"]:
+        print(f"  {error}")
@@ -1,10 +1,19 @@
 import streamlit as st
-from config import fetch_squat_dataframe_cached
+from config import (
+    DEFAULT_GROUP,
+    daily_totals_version,
+    downsample_series,
+    extreme_pairs,
+    fetch_correlation_accumulator,
+    fetch_daily_totals_cached,
+    fetch_session_snapshot,
+    figure_cache,
+    get_group,
+)
+from history import available_seasons, load_season, season_curves
 import pandas as pd
 import plotly.express as px
 
-SQUAT_JOUR = 20
-
 st.set_page_config(
     page_title="🍑 Squat stat 🍑",
     page_icon="🍑",
@@ -13,29 +22,30 @@ st.set_page_config(
 )
 
 
-def fetch_stats_dataframe() -> pd.DataFrame:
-    """Use centralized cache for better cross-page performance."""
-    df = fetch_squat_dataframe_cached()
-    if df.empty:
-        return df
-    df = df.copy()
-    df["date"] = pd.to_datetime(df["date"])
-    df["date_day"] = df["date"].dt.date
-    df["squats"] = pd.to_numeric(df["squats"], errors="coerce").fillna(0).astype(int)
-    return df.sort_values("date")
+st.title("Plus de statistiques")
 
 
-st.title("Plus de statistiques")
+# Same challenge group as the main page (or ?group=<id>)
+group_id = st.query_params.get("group") or st.session_state.get("group", DEFAULT_GROUP)
+try:
+    group_settings = get_group(group_id)
+except KeyError:
+    st.error(f"Groupe inconnu : {group_id} 🤷")
+    st.stop()
 
+# The red reference lines follow the group's daily goal
+SQUAT_JOUR = group_settings["daily_goal"]
 
-df = fetch_stats_dataframe()
+# Shared read-only snapshot, sorted by date, with time_minutes precomputed
+snapshot = fetch_session_snapshot(group_id)
+df = snapshot.frame
 
 
 if df.empty:
     st.info("Pas encore de squats enregistrés pour cette année.")
     st.stop()
 
-names = sorted(df["name"].unique())
+names = sorted(df["name"].unique().tolist())
 selected_names = st.multiselect(
     "Focus équipe",
     options=names,
@@ -49,6 +59,20 @@ if not selected_names:
 
 df = df[df["name"].isin(selected_names)]
 
+
+def cached_figure(chart_id, build, *selection):
+    """Figure from the shared memo, rebuilt only when data or selection change."""
+    key = (
+        chart_id,
+        snapshot.version,
+        daily_totals_version(group_id),
+        SQUAT_JOUR,
+        tuple(selected_names),
+        *selection,
+    )
+    return figure_cache(group_id).get(key, build)
+
+
 if df.empty:
     st.info("Aucune donnée pour cette sélection. Essaye un autre combo.")
     st.stop()
@@ -70,12 +94,15 @@ summary_cols[2].metric("Jours actifs", days_tracked)
 summary_cols[3].metric("Volume moyen / jour", avg_daily_volume)
 
 
+daily_totals = fetch_daily_totals_cached(group_id)
 daily_squats = (
-    df.groupby(["date_day", "name"], as_index=False)["squats"]
-    .sum()
-    .sort_values("date_day")
+    daily_totals.loc[daily_totals["name"].isin(selected_names), ["date_day", "name", "squats"]]
+    .sort_values(["date_day", "name"])
+    .reset_index(drop=True)
 )
-daily_squats["cumulative_squats"] = daily_squats.groupby("name")["squats"].cumsum()
+daily_squats["cumulative_squats"] = daily_squats.groupby("name", observed=True)[
+    "squats"
+].cumsum()
 
 crew_daily = (
     daily_squats.groupby("date_day", as_index=False)["squats"]
@@ -87,7 +114,7 @@ goal_line = SQUAT_JOUR * len(selected_names)
 
 first_activity = (
     daily_squats[daily_squats["squats"] > 0]
-    .groupby("name")["date_day"]
+    .groupby("name", observed=True)["date_day"]
     .min()
     .rename("first_active_day")
 )
@@ -112,11 +139,7 @@ last_logs = (
 morning_metric = ("—", "")
 evening_metric = ("—", "")
 if not df.empty:
-    df_times = df.copy()
-    df_times["time_minutes"] = (
-        df_times["date"].dt.hour * 60 + df_times["date"].dt.minute
-    )
-    avg_time_by_person = df_times.groupby("name")["time_minutes"].mean()
+    avg_time_by_person = df.groupby("name", observed=True)["time_minutes"].mean()
 
     if not avg_time_by_person.empty:
         # Earliest average = morning person
@@ -139,7 +162,7 @@ max_day_row = (
 )
 
 totals_by_person = (
-    df.groupby("name")["squats"]
+    df.groupby("name", observed=True)["squats"]
     .sum()
     .reset_index()
     .sort_values("squats", ascending=False)
@@ -150,72 +173,84 @@ if not df.empty:
     from config import get_today
 
     today_date = get_today().date()
-    first_squat_by_person = df.groupby("name")["date_day"].min()
-    days_since_start = first_squat_by_person.apply(lambda d: (today_date - d).days + 1)
-    total_by_person = df.groupby("name")["squats"].sum()
+    first_squat_by_person = df.groupby("name", observed=True)["date_day"].min()
+    days_since_start = (pd.Timestamp(today_date) - first_squat_by_person).dt.days + 1
+    total_by_person = df.groupby("name", observed=True)["squats"].sum()
     avg_by_person = (total_by_person / days_since_start).reset_index(name="avg_squats")
 else:
     avg_by_person = pd.DataFrame(columns=["name", "avg_squats"])
 
-overview_tab, records_tab, consistency_tab, duos_tab = st.tabs(
-    ["📊 Volume", "🏅 Records", "🎯 Régularité", "🫂 Correlations"]
+overview_tab, records_tab, consistency_tab, duos_tab, seasons_tab = st.tabs(
+    ["📊 Volume", "🏅 Records", "🎯 Régularité", "🫂 Correlations", "📅 Saisons"]
 )
 
 with overview_tab:
     if not crew_daily.empty:
-        volume_fig = px.bar(
-            crew_daily,
-            x="date_day",
-            y="total_squats",
-            title="Volume quotidien de l'équipe",
-            color_discrete_sequence=["#ff6f61"],
-        )
-        volume_fig.add_scatter(
-            x=crew_daily["date_day"],
-            y=crew_daily["rolling"],
-            mode="lines",
-            name="Moyenne 7j",
-            line=dict(color="#1f1f1f"),
-        )
-        volume_fig.add_hline(
-            y=goal_line,
-            line_dash="dot",
-            line_color="red",
-            opacity=0.8,
-        )
-        volume_fig.update_layout(
-            xaxis_title="Date",
-            yaxis_title="Squats",
-            margin=dict(l=10, r=10, t=60, b=20),
-        )
-        st.plotly_chart(volume_fig, width="stretch")
+        def build_volume_fig():
+            plotted = downsample_series(crew_daily, "date_day", ["total_squats", "rolling"])
+            volume_fig = px.bar(
+                plotted,
+                x="date_day",
+                y="total_squats",
+                title="Volume quotidien de l'équipe",
+                color_discrete_sequence=["#ff6f61"],
+            )
+            volume_fig.add_scatter(
+                x=plotted["date_day"],
+                y=plotted["rolling"],
+                mode="lines",
+                name="Moyenne 7j",
+                line=dict(color="#1f1f1f"),
+            )
+            volume_fig.add_hline(
+                y=goal_line,
+                line_dash="dot",
+                line_color="red",
+                opacity=0.8,
+            )
+            volume_fig.update_layout(
+                xaxis_title="Date",
+                yaxis_title="Squats",
+                margin=dict(l=10, r=10, t=60, b=20),
+            )
+            return volume_fig
+
+        st.plotly_chart(cached_figure("volume", build_volume_fig), width="stretch")
 
     if not filtered_daily.empty:
-        evolution_fig = px.line(
-            filtered_daily,
-            x="date_day",
-            y="squats",
-            color="name",
-            title="📈 Evolution quotidienne par squatteur",
-        )
-        evolution_fig.add_hline(
-            y=SQUAT_JOUR,
-            line_color="red",
-            line_dash="dot",
-        )
-        evolution_fig.update_layout(xaxis_title="Date", yaxis_title="Squats")
-        st.plotly_chart(evolution_fig, width="stretch")
-
-        stacked_fig = px.area(
-            filtered_daily,
-            x="date_day",
-            y="cumulative_squats",
-            color="name",
-            line_group="name",
-            title="Squats cumulés par squatteur",
-        )
-        stacked_fig.update_layout(xaxis_title="Date", yaxis_title="Squats")
-        st.plotly_chart(stacked_fig, width="stretch")
+        def build_evolution_fig():
+            evolution_fig = px.line(
+                downsample_series(filtered_daily, "date_day", ["squats"], by="name"),
+                x="date_day",
+                y="squats",
+                color="name",
+                title="📈 Evolution quotidienne par squatteur",
+            )
+            evolution_fig.add_hline(
+                y=SQUAT_JOUR,
+                line_color="red",
+                line_dash="dot",
+            )
+            evolution_fig.update_layout(xaxis_title="Date", yaxis_title="Squats")
+            return evolution_fig
+
+        st.plotly_chart(cached_figure("evolution", build_evolution_fig), width="stretch")
+
+        def build_stacked_fig():
+            stacked_fig = px.area(
+                downsample_series(
+                    filtered_daily, "date_day", ["cumulative_squats"], by="name", how="last"
+                ),
+                x="date_day",
+                y="cumulative_squats",
+                color="name",
+                line_group="name",
+                title="Squats cumulés par squatteur",
+            )
+            stacked_fig.update_layout(xaxis_title="Date", yaxis_title="Squats")
+            return stacked_fig
+
+        st.plotly_chart(cached_figure("stacked", build_stacked_fig), width="stretch")
 
 with records_tab:
     record_cols = st.columns(4)
@@ -248,56 +283,70 @@ with records_tab:
 
     if not crew_daily.empty:
         top_days = crew_daily.sort_values("total_squats", ascending=False).head(10)
-        top_day_fig = px.bar(
-            top_days,
-            x="total_squats",
-            y=top_days["date_day"].astype(str),
-            orientation="h",
-            title="Top 10 journées les plus squattées",
-        )
-        top_day_fig.add_vline(x=goal_line, line_color="red", line_dash="dot")
-        top_day_fig.update_layout(xaxis_title="Squats", yaxis_title="Date")
-        st.plotly_chart(top_day_fig, width="stretch")
+        def build_top_day_fig():
+            top_day_fig = px.bar(
+                top_days,
+                x="total_squats",
+                y=top_days["date_day"].dt.strftime("%Y-%m-%d"),
+                orientation="h",
+                title="Top 10 journées les plus squattées",
+            )
+            top_day_fig.add_vline(x=goal_line, line_color="red", line_dash="dot")
+            top_day_fig.update_layout(xaxis_title="Squats", yaxis_title="Date")
+            return top_day_fig
+
+        st.plotly_chart(cached_figure("top_day", build_top_day_fig), width="stretch")
 
     if not totals_by_person.empty:
-        totals_fig = px.bar(
-            totals_by_person,
-            x="squats",
-            y="name",
-            title="Somme des squats par squatteur",
-            orientation="h",
-        )
-        totals_fig.update_layout(xaxis_title="Squats", yaxis_title=None)
-        st.plotly_chart(totals_fig, width="stretch")
+        def build_totals_fig():
+            totals_fig = px.bar(
+                totals_by_person,
+                x="squats",
+                y="name",
+                title="Somme des squats par squatteur",
+                orientation="h",
+            )
+            totals_fig.update_layout(xaxis_title="Squats", yaxis_title=None)
+            return totals_fig
+
+        st.plotly_chart(cached_figure("totals", build_totals_fig), width="stretch")
 
     if not avg_by_person.empty:
         avg_sorted = avg_by_person.sort_values("avg_squats", ascending=False)
-        avg_fig = px.bar(
-            avg_sorted,
-            x="name",
-            y="avg_squats",
-            title="Moyenne journalière par squatteur",
-        )
-        avg_fig.add_hline(y=SQUAT_JOUR, line_color="red", line_dash="dot")
-        avg_fig.update_layout(xaxis_title=None, yaxis_title="Squats")
-        st.plotly_chart(avg_fig, width="stretch")
+        def build_avg_fig():
+            avg_fig = px.bar(
+                avg_sorted,
+                x="name",
+                y="avg_squats",
+                title="Moyenne journalière par squatteur",
+            )
+            avg_fig.add_hline(y=SQUAT_JOUR, line_color="red", line_dash="dot")
+            avg_fig.update_layout(xaxis_title=None, yaxis_title="Squats")
+            return avg_fig
+
+        st.plotly_chart(cached_figure("avg", build_avg_fig), width="stretch")
 
 with consistency_tab:
-    hist_fig = px.histogram(
-        df,
-        x="squats",
-        nbins=40,
-        title="Distribution des squats par session",
-        color_discrete_sequence=["#ff6f61"],
-    )
-    hist_fig.add_vline(x=SQUAT_JOUR, line_color="red", line_dash="dot")
-    hist_fig.update_layout(xaxis_title="Squats", yaxis_title="Sessions")
-    st.plotly_chart(hist_fig, width="stretch")
+    def build_hist_fig():
+        hist_fig = px.histogram(
+            df,
+            x="squats",
+            nbins=40,
+            title="Distribution des squats par session",
+            color_discrete_sequence=["#ff6f61"],
+        )
+        hist_fig.add_vline(x=SQUAT_JOUR, line_color="red", line_dash="dot")
+        hist_fig.update_layout(xaxis_title="Squats", yaxis_title="Sessions")
+        return hist_fig
+
+    st.plotly_chart(cached_figure("hist", build_hist_fig), width="stretch")
 
     if not filtered_daily.empty:
         filtered_no_zero = filtered_daily[filtered_daily["squats"] > 0]
         if not filtered_no_zero.empty:
-            std_by_person = filtered_no_zero.groupby("name")["squats"].std()
+            std_by_person = filtered_no_zero.groupby("name", observed=True)[
+                "squats"
+            ].std()
             std_by_person = std_by_person.dropna()
             if not std_by_person.empty:
                 consistent = std_by_person.idxmin()
@@ -314,86 +363,81 @@ with consistency_tab:
                     delta=f"σ={std_by_person.max():.1f}",
                 )
 
-            box_fig = px.box(
-                filtered_no_zero,
-                x="name",
-                y="squats",
-                title="📊 Distribution journalière",
-            )
-            box_fig.add_hline(y=SQUAT_JOUR, line_color="red", line_dash="dot")
-            box_fig.update_layout(xaxis_title="Squatteur", yaxis_title="Squats")
-            st.plotly_chart(box_fig, width="stretch")
+            def build_box_fig():
+                box_fig = px.box(
+                    filtered_no_zero,
+                    x="name",
+                    y="squats",
+                    title="📊 Distribution journalière",
+                )
+                box_fig.add_hline(y=SQUAT_JOUR, line_color="red", line_dash="dot")
+                box_fig.update_layout(xaxis_title="Squatteur", yaxis_title="Squats")
+                return box_fig
+
+            st.plotly_chart(cached_figure("box", build_box_fig), width="stretch")
 
 with duos_tab:
     if filtered_daily.empty:
         st.info("Pas assez de données pour corréler les squatteurs.")
     else:
-        sessions_count = filtered_daily.groupby("name")["date_day"].nunique()
+        sessions_count = filtered_daily.groupby("name", observed=True)[
+            "date_day"
+        ].nunique()
         eligible_names = sessions_count[sessions_count >= 5].index.tolist()
         if len(eligible_names) < 2:
             st.info(
                 "Encore trop peu de jours loggés pour comparer les rythmes (minimum 5 jours chacun)."
             )
         else:
-            corr_base = filtered_daily[filtered_daily["name"].isin(eligible_names)]
-            pivot_df = (
-                corr_base.pivot_table(
-                    index="date_day",
-                    columns="name",
-                    values="squats",
-                    aggfunc="sum",
-                )
-                .fillna(0)
-                .sort_index()
-            )
-            correlation_matrix = pivot_df.corr()
-            corr_fig = px.imshow(
-                correlation_matrix,
-                labels=dict(x="Squatteur", y="Squatteur", color="Corr"),
-                color_continuous_scale="Viridis",
+            # Running per-pair sums over the daily totals: O(participants²) lookup
+            correlation_matrix = fetch_correlation_accumulator(group_id).correlation(
+                eligible_names
             )
-            corr_fig.update_layout(
-                title="🫂 Correlation entre squatteurs",
-                xaxis_title=None,
-                yaxis_title=None,
-            )
-            st.plotly_chart(corr_fig, width="stretch")
-            st.caption("Minimum 5 jours loggés chacun pour apparaître dans le heatmap.")
 
-            pairs = []
-            columns = correlation_matrix.columns.tolist()
-            for i in range(len(columns)):
-                for j in range(i + 1, len(columns)):
-                    pairs.append(
-                        {
-                            "s1": columns[i],
-                            "s2": columns[j],
-                            "value": correlation_matrix.iloc[i, j],
-                        }
-                    )
+            def build_corr_fig():
+                corr_fig = px.imshow(
+                    correlation_matrix,
+                    labels=dict(x="Squatteur", y="Squatteur", color="Corr"),
+                    color_continuous_scale="Viridis",
+                )
+                corr_fig.update_layout(
+                    title="🫂 Correlation entre squatteurs",
+                    xaxis_title=None,
+                    yaxis_title=None,
+                )
+                return corr_fig
 
-            if pairs:
-                pair_df = pd.DataFrame(pairs)
-                best_pair = pair_df.loc[pair_df["value"].idxmax()]
-                worst_pair = pair_df.loc[pair_df["value"].idxmin()]
+            st.plotly_chart(cached_figure("corr", build_corr_fig), width="stretch")
+            st.caption("Minimum 5 jours loggés chacun pour apparaître dans le heatmap.")
 
+            best_pair, worst_pair = extreme_pairs(correlation_matrix)
+            if best_pair is not None:
                 def render_pair_chart(pair_row, title: str):
                     names_pair = [pair_row["s1"], pair_row["s2"]]
                     pair_data = filtered_daily[filtered_daily["name"].isin(names_pair)]
                     if pair_data.empty:
                         return
-                    min_start = pair_data.groupby("name")["date_day"].min().max()
+                    min_start = (
+                        pair_data.groupby("name", observed=True)["date_day"].min().max()
+                    )
                     pair_data = pair_data[pair_data["date_day"] >= min_start]
-                    pair_fig = px.line(
-                        pair_data,
-                        x="date_day",
-                        y="squats",
-                        color="name",
-                        title=title,
+
+                    def build_pair_fig():
+                        pair_fig = px.line(
+                            downsample_series(pair_data, "date_day", ["squats"], by="name"),
+                            x="date_day",
+                            y="squats",
+                            color="name",
+                            title=title,
+                        )
+                        pair_fig.add_hline(y=SQUAT_JOUR, line_color="red", line_dash="dot")
+                        pair_fig.update_layout(xaxis_title="Date", yaxis_title="Squats")
+                        return pair_fig
+
+                    st.plotly_chart(
+                        cached_figure("pair", build_pair_fig, tuple(names_pair), title),
+                        width="stretch",
                     )
-                    pair_fig.add_hline(y=SQUAT_JOUR, line_color="red", line_dash="dot")
-                    pair_fig.update_layout(xaxis_title="Date", yaxis_title="Squats")
-                    st.plotly_chart(pair_fig, width="stretch")
 
                 render_pair_chart(
                     best_pair,
@@ -403,3 +447,73 @@ with duos_tab:
                     worst_pair,
                     f"📉 {worst_pair['s1']} vs {worst_pair['s2']} : opposés ({worst_pair['value']:.2f})",
                 )
+
+with seasons_tab:
+    # Closed seasons come from their frozen files (python history.py <year>)
+    seasons = available_seasons(group_id)
+    season_year = st.selectbox("Saison", seasons[::-1])
+    season = load_season(season_year, group_id)
+    season_records = season["records"]
+
+    season_cols = st.columns(4)
+    season_cols[0].metric("Squats cumulés", season_records["squats"])
+    season_cols[1].metric("Squatteurs", season_records["participants"])
+    if season_records["best_day"]:
+        best_day = season_records["best_day"]
+        season_cols[2].metric(
+            "Meilleur jour", best_day["name"], delta=f"{best_day['squats']} le {best_day['date']}"
+        )
+        best_streak = season_records["best_streak"]
+        season_cols[3].metric(
+            "Plus longue série", best_streak["name"], delta=f"{best_streak['days']} jours"
+        )
+
+    season_totals = season["totals"][season["totals"]["name"].isin(selected_names)]
+    st.dataframe(
+        season_totals.sort_values("squats", ascending=False),
+        width="stretch",
+        hide_index=True,
+    )
+
+    if len(seasons) < 2:
+        st.info("Une seule saison pour l'instant, reviens l'an prochain pour le match retour 😏")
+    else:
+
+        def build_seasons_fig():
+            seasons_fig = px.line(
+                season_curves(seasons, group_id),
+                x="day_of_year",
+                y="cumulative_squats",
+                color="year",
+                title="📅 Squats cumulés de l'équipe, saison contre saison",
+            )
+            seasons_fig.update_layout(xaxis_title="Jour de l'année", yaxis_title="Squats")
+            return seasons_fig
+
+        st.plotly_chart(
+            cached_figure("seasons", build_seasons_fig, tuple(seasons)), width="stretch"
+        )
+
+        def build_season_people_fig():
+            people = pd.concat(
+                [
+                    load_season(year, group_id)["totals"].assign(year=str(year))
+                    for year in seasons
+                ],
+                ignore_index=True,
+            )
+            people_fig = px.bar(
+                people[people["name"].isin(selected_names)],
+                x="name",
+                y="squats",
+                color="year",
+                barmode="group",
+                title="🏆 Total par squatteur et par saison",
+            )
+            people_fig.update_layout(xaxis_title=None, yaxis_title="Squats")
+            return people_fig
+
+        st.plotly_chart(
+            cached_figure("season_people", build_season_people_fig, tuple(seasons)),
+            width="stretch",
+        )
@@ -1,8 +1,23 @@
+from functools import partial
+
 import streamlit as st
-from config import fetch_squat_dataframe_cached
-import pandas as pd
+from config import (
+    DEFAULT_GROUP,
+    fetch_daily_totals_cached,
+    fetch_session_snapshot,
+    get_group,
+)
+from exporter import (
+    EXPORT_FORMATS,
+    MAX_DOWNLOAD_ROWS,
+    count_export_rows,
+    export_bytes,
+)
+from importer import import_sessions
 import plotly.express as px
 
+PAGE_SIZES = [25, 50, 100, 250]
+
 st.set_page_config(
     page_title="🍑 Squat data 🍑",
     page_icon="🍑",
@@ -11,41 +26,92 @@ st.set_page_config(
 )
 
 
+# Same challenge group as the main page (or ?group=<id>)
+group_id = st.query_params.get("group") or st.session_state.get("group", DEFAULT_GROUP)
+try:
+    get_group(group_id)
+except KeyError:
+    st.error(f"Groupe inconnu : {group_id} 🤷")
+    st.stop()
+
 st.title("Tu veux de la data ?")
 st.subheader("Curieux va")
 st.write("---")
 
+with st.expander("📥 Importer un historique (CSV / JSONL)"):
+    st.caption(
+        "Colonnes : name, date (ISO), value (ou squats), exercise (SQUAT/PLANK), unit. "
+        "Les doublons (name, date) sont ignorés."
+    )
+    uploaded = st.file_uploader("Fichier", type=["csv", "jsonl", "json"])
+    dry_run = st.checkbox("Simulation (rien n'est écrit)", value=True)
+    if uploaded is not None and st.button("Importer 🚀"):
+        with st.spinner("Import en cours..."):
+            report = import_sessions(uploaded, dry_run=dry_run, group=group_id)
+        import_cols = st.columns(4)
+        import_cols[0].metric("Lignes lues", report["rows"])
+        import_cols[1].metric("Écrites" if not dry_run else "À écrire", report["written"])
+        import_cols[2].metric("Doublons", report["duplicates"])
+        import_cols[3].metric("Invalides", report["invalid"])
+        st.caption(f"{report['rows_per_second']:.0f} lignes/s")
+        if report["errors"]:
+            st.warning("\n".join(f"- {error}" for error in report["errors"]))
+
 # I want this page to display the main stats and graphs
-# Uses centralized cached fetch (TTL 120s) for performance
-df = fetch_squat_dataframe_cached().copy()
+# Uses centralized cached snapshot (TTL 120s): read-only, cumulative_squats
+# (per-name running total) is already computed
+snapshot = fetch_session_snapshot(group_id)
+df = snapshot.frame
 if df.empty:
     st.info("Toujours aucun squat, ça dort debout ?")
     st.stop()
 
-# Préparation de la table
-df["date"] = pd.to_datetime(df["date"])
-df["date_day"] = df["date"].dt.date
-df = df.sort_values(by="date", ascending=False)
-df["squats"] = pd.to_numeric(df["squats"])
-df["cumulative_squats"] = df.groupby("name")["squats"].cumsum()
-
+# The frame is chronological: the latest session is the last row
+last_session = df.iloc[-1]
 metrics_cols = st.columns(4)
 metrics_cols[0].metric("Sessions", len(df))
 metrics_cols[1].metric("Participants", df["name"].nunique())
 metrics_cols[2].metric("Squats totaux", int(df["squats"].sum()))
 metrics_cols[3].metric(
     "Dernière session",
-    df.iloc[0]["name"],
-    delta=int(df.iloc[0]["squats"]),
+    last_session["name"],
+    delta=int(last_session["squats"]),
 )
 
-csv_bytes = df.to_csv(index=False).encode("utf-8")
-st.download_button(
-    "⬇️ Exporter en CSV",
-    data=csv_bytes,
-    file_name="squats.csv",
-    mime="text/csv",
-)
+with st.expander("⬇️ Exporter"):
+    export_cols = st.columns(2)
+    export_names = export_cols[0].multiselect(
+        "Squatteurs", options=sorted(df["name"].unique().tolist()), placeholder="Tous"
+    )
+    export_exercises = export_cols[1].multiselect(
+        "Exercices", options=sorted(df["exercise"].unique().tolist()), placeholder="Tous"
+    )
+    first_day, last_day = df["date_day"].min().date(), df["date_day"].max().date()
+    export_range = st.date_input(
+        "Période", value=(first_day, last_day), min_value=first_day, max_value=last_day
+    )
+    export_format = st.radio("Format", list(EXPORT_FORMATS), horizontal=True)
+    since, until = (tuple(export_range) + (None, None))[:2]
+    export_filters = dict(
+        names=export_names, exercises=export_exercises, since=since, until=until
+    )
+    export_rows = count_export_rows(df, **export_filters)
+    if export_rows > MAX_DOWNLOAD_ROWS:
+        # The download is held in memory by Streamlit: the CLI has no cap
+        st.warning(
+            f"{export_rows} lignes, c'est trop pour un téléchargement "
+            f"(max {MAX_DOWNLOAD_ROWS}) : filtre un peu ou lance "
+            f"`python exporter.py squats.{export_format}`."
+        )
+    else:
+        # Built only when clicked, chunk by chunk, from the shared snapshot
+        st.download_button(
+            "⬇️ Télécharger",
+            data=partial(export_bytes, df, export_format, **export_filters),
+            file_name=f"squats.{export_format}",
+            mime=EXPORT_FORMATS[export_format],
+            on_click="ignore",
+        )
 
 sessions_tab, daily_tab, summary_tab = st.tabs(
     [
@@ -56,25 +122,50 @@ sessions_tab, daily_tab, summary_tab = st.tabs(
 )
 
 with sessions_tab:
+    # Sorted and paged on the snapshot: only the visible page goes to the browser
+    table_columns = [column for column in df.columns if column != "time_minutes"]
+    table_cols = st.columns([2, 1, 1])
+    sort_by = table_cols[0].selectbox(
+        "Trier par", table_columns, index=table_columns.index("date")
+    )
+    ascending = table_cols[1].radio("Ordre", ["⬇️", "⬆️"], horizontal=True) == "⬆️"
+    page_size = table_cols[2].selectbox("Lignes", PAGE_SIZES, index=1)
+    table_names = st.multiselect(
+        "Squatteurs",
+        options=sorted(df["name"].unique().tolist()),
+        placeholder="Tous",
+        key="table_names",
+    )
+    matching = df["name"].isin(table_names).sum() if table_names else len(df)
+    page_count = max(1, -(-matching // page_size))
+    page_number = st.number_input("Page", min_value=1, max_value=page_count, value=1)
+    page_rows, total = snapshot.page(
+        sort_by,
+        ascending,
+        names=table_names,
+        offset=(page_number - 1) * page_size,
+        limit=page_size,
+    )
+    st.caption(f"Page {page_number}/{page_count} • {total} sessions")
     st.dataframe(
-        df,
+        page_rows[table_columns],
         width="stretch",
         hide_index=True,
+        column_config={"date_day": st.column_config.DateColumn("date_day")},
     )
 
 with daily_tab:
     pivot = (
-        df.groupby(["date_day", "name"])["squats"]
-        .sum()
-        .reset_index()
+        fetch_daily_totals_cached(group_id)
         .pivot(index="date_day", columns="name", values="squats")
         .fillna(0)
     )
+    pivot.index = pivot.index.date
     st.dataframe(pivot, width="stretch")
 
 with summary_tab:
     leaderboard = (
-        df.groupby("name")["squats"]
+        df.groupby("name", observed=True)["squats"]
         .agg(["count", "sum"])
         .rename(columns={"count": "Sessions", "sum": "Squats"})
     )
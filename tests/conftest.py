@@ -0,0 +1,98 @@
+import os
+import sys
+from datetime import timedelta
+
+import pytest
+
+# config reads these at import; only the moto-backed tests reach DynamoDB
+os.environ.setdefault("AWS_DEFAULT_REGION", "eu-central-1")
+os.environ.setdefault("MISTRAL_API_KEY", "test")
+os.environ.setdefault("ACCESS_KEY", "testing")
+os.environ.setdefault("SECRET_ACCESS_KEY", "testing")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+try:
+    # moto hooks the boto3 clients created after its import, config's included
+    import moto
+except ImportError:
+    moto = None
+
+
+@pytest.fixture
+def make_sessions():
+    """Session frame, as load_all() returns it, from (name, value, days_ago[, exercise]) rows."""
+    import config
+
+    def build(rows):
+        morning = config.get_today().replace(hour=9, minute=0, second=0, microsecond=0)
+        items = [
+            config.build_squat_item(
+                name,
+                value,
+                exercise=exercise[0] if exercise else "SQUAT",
+                # Distinct dates: (name, date) is the table key
+                at=morning - timedelta(days=days_ago) + timedelta(minutes=index),
+            )
+            for index, (name, value, days_ago, *exercise) in enumerate(rows)
+        ]
+        return config._normalize_items(items)
+
+    return build
+
+
+@pytest.fixture
+def dynamodb(tmp_path, monkeypatch):
+    """config against empty moto tables (squats with its indexes, squats_daily).
+
+    Every process-wide cache is swapped for a fresh one, and snapshots and
+    season files go to tmp_path.
+    """
+    if moto is None:
+        pytest.skip("moto is not installed (pip install -r requirements-dev.txt)")
+    import backfill
+    import config
+    import history
+
+    with moto.mock_aws():
+        config._dynamodb.create_table(
+            TableName=config.table_squats.name,
+            KeySchema=[
+                {"AttributeName": "name", "KeyType": "HASH"},
+                {"AttributeName": "date", "KeyType": "RANGE"},
+            ],
+            AttributeDefinitions=[
+                {"AttributeName": "name", "AttributeType": "S"},
+                {"AttributeName": "date", "AttributeType": "S"},
+            ],
+            BillingMode="PAY_PER_REQUEST",
+        )
+        backfill.create_year_index()
+        backfill.create_daily_table()
+        backfill.create_group_indexes()
+
+        monkeypatch.setattr(config, "SNAPSHOT_PATH", str(tmp_path / "snapshot.parquet"))
+        monkeypatch.setattr(history, "HISTORY_DIR", str(tmp_path / "history"))
+        monkeypatch.setattr(config, "_legacy_rows_pending", True)
+        monkeypatch.setattr(config, "_daily_rollup_available", True)
+        monkeypatch.setattr(config, "_groups_cache", {"data": None, "timestamp": None})
+        monkeypatch.setattr(config, "_daily_totals_caches", {})
+        monkeypatch.setattr(config, "_crew_stats_memo", {})
+        monkeypatch.setattr(
+            config, "squat_data_cache", config.GroupedCache(config.SquatDataCache)
+        )
+        monkeypatch.setattr(
+            config,
+            "participant_cache",
+            config.GroupedCache(lambda group: config.ParticipantCache()),
+        )
+        monkeypatch.setattr(
+            config,
+            "figure_cache",
+            config.GroupedCache(lambda group: config.LRUCache(max_entries=128)),
+        )
+        monkeypatch.setattr(
+            config,
+            "_correlation_accumulators",
+            config.GroupedCache(lambda group: config.CorrelationAccumulator()),
+        )
+        yield config
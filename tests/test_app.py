@@ -0,0 +1,43 @@
+"""app.py through Streamlit's AppTest, against moto tables."""
+
+import os
+
+import pytest
+
+streamlit_testing = pytest.importorskip("streamlit.testing.v1")
+
+APP = os.path.join(os.path.dirname(__file__), "..", "app.py")
+
+
+@pytest.fixture
+def app(dynamodb, tmp_path, monkeypatch):
+    monkeypatch.setattr(dynamodb, "mistral_chat", lambda message: "Allez Max !")
+    monkeypatch.setattr(
+        dynamodb,
+        "_motivation_cache",
+        dynamodb.MotivationCache(str(tmp_path / "motivation.json")),
+    )
+    app = streamlit_testing.AppTest.from_file(APP, default_timeout=60)
+    app.session_state["id_squatteur"] = "Max"
+    return app
+
+
+def metric(app, label):
+    return next(item.value for item in app.metric if item.label == label)
+
+
+def test_a_logged_session_shows_up_in_the_same_run(app, dynamodb):
+    app.run()
+    assert not app.exception
+    assert metric(app, "Squats aujourd'hui") == "0"
+
+    app.number_input[0].set_value(25)
+    app.button(key="FormSubmitter:squat_form-Enregistrer pour Max 🍑").click()
+    app.run()
+
+    # Written through to the cache: no st.rerun() needed to see it
+    assert not app.exception
+    assert metric(app, "Squats aujourd'hui") == "25"
+    assert metric(app, "Total cumulé") == "25"
+    assert len(dynamodb.load_all()) == 1
+    assert dynamodb.fetch_daily_totals_cached()["squats"].sum() == 25
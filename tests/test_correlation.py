@@ -0,0 +1,101 @@
+"""CorrelationAccumulator against the zero-filled pivot().corr() it replaces."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import CorrelationAccumulator
+
+NAMES = ["Max", "Zoe", "Ana", "Léo"]
+
+
+def daily_frame(rows):
+    return pd.DataFrame(rows, columns=["date_day", "name", "squats"]).assign(
+        date_day=lambda d: pd.to_datetime(d["date_day"])
+    )
+
+
+def pivot_corr(daily, names):
+    return (
+        daily.pivot_table(index="date_day", columns="name", values="squats", aggfunc="sum")
+        .reindex(columns=names)
+        .fillna(0)
+        .corr()
+    )
+
+
+def assert_matches(accumulator, daily):
+    names = sorted(daily["name"].unique())
+    expected = pivot_corr(daily, names)
+    actual = accumulator.correlation(names)
+    np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-12)
+
+
+def random_frame(rng, days=60):
+    rows = []
+    dates = pd.date_range("2026-01-01", periods=days, freq="D")
+    for date in dates:
+        for name in NAMES:
+            if rng.random() < 0.7:
+                rows.append((date, name, int(rng.integers(0, 120))))
+    return daily_frame(rows)
+
+
+def test_changed_and_removed_rows_are_replayed():
+    accumulator = CorrelationAccumulator()
+    before = daily_frame(
+        [
+            ("2026-01-01", "Max", 20),
+            ("2026-01-01", "Zoe", 30),
+            ("2026-01-02", "Max", 40),
+            ("2026-01-02", "Zoe", 10),
+            ("2026-01-03", "Max", 25),
+            ("2026-01-03", "Ana", 50),
+            ("2026-01-04", "Zoe", 35),
+        ]
+    )
+    accumulator.sync(before)
+    assert_matches(accumulator, before)
+
+    after = daily_frame(
+        [
+            ("2026-01-01", "Max", 20),
+            ("2026-01-01", "Zoe", 60),  # corrected
+            ("2026-01-02", "Max", 40),  # Zoe's row removed
+            ("2026-01-03", "Max", 25),
+            ("2026-01-03", "Ana", 50),
+            # 2026-01-04 removed entirely
+            ("2026-01-05", "Léo", 15),  # new day, new name
+            ("2026-01-05", "Max", 30),
+        ]
+    )
+    accumulator.sync(after)
+    assert_matches(accumulator, after)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_edits_match_a_fresh_pivot(seed):
+    rng = np.random.default_rng(seed)
+    accumulator = CorrelationAccumulator()
+    base = random_frame(rng)
+    accumulator.sync(base)
+    for _ in range(10):
+        # Rows dropped by one step come back in the next: removals and additions
+        daily = base.sample(frac=0.9, random_state=int(rng.integers(1 << 31)))
+        bumped = rng.random(len(daily)) < 0.1
+        daily.loc[bumped, "squats"] += rng.integers(1, 50, bumped.sum())
+        accumulator.sync(daily.reset_index(drop=True))
+        assert_matches(accumulator, daily)
+
+
+def test_a_name_that_never_varies_is_nan():
+    accumulator = CorrelationAccumulator()
+    daily = daily_frame(
+        [("2026-01-01", "Max", 20), ("2026-01-02", "Max", 30), ("2026-01-01", "Zoe", 10)]
+    )
+    accumulator.sync(daily)
+    daily = daily_frame([("2026-01-01", "Max", 20), ("2026-01-02", "Max", 30)])
+    accumulator.sync(daily)
+    assert np.isnan(accumulator.correlation(["Max", "Zoe"]).loc["Max", "Zoe"])
+    with pytest.raises(KeyError):
+        accumulator.correlation(["Nobody"])
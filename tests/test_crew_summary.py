@@ -0,0 +1,84 @@
+"""CrewStats.summary / summary_table against the per-Participant loops they replaced."""
+
+import numpy as np
+import pytest
+
+from config import CrewStats, Participant
+
+NAMES = ["Max", "Zoe", "Ana", "Léo", "Nobody"]
+GOAL = 20
+
+
+def participant_summary(participants):
+    """The crew summary app.py computed from one Participant per name, before user-017."""
+
+    def holder(attribute):
+        best = max(participants, key=lambda p: getattr(p, attribute), default=None)
+        return None if best is None else (best.name, getattr(best, attribute))
+
+    return {
+        "goal_to_date": sum(p.sum_squat_should_be_done_today for p in participants),
+        "goal_full_year": sum(p.objectif_sum_squat for p in participants),
+        "active_today": sum(1 for p in participants if p.sum_squats_done_today >= GOAL),
+        "best_streak": holder("best_objective_streak"),
+        "pace": holder("moyenne_squats_par_jour"),
+        "best_plank": holder("best_plank_seconds"),
+        "best_plank_streak": holder("best_plank_streak"),
+        "total_plank": holder("sum_plank_seconds"),
+    }
+
+
+@pytest.fixture(params=range(10))
+def sessions(request, make_sessions):
+    rng = np.random.default_rng(request.param)
+    rows = []
+    # "Nobody" never logs anything
+    for name in NAMES[:-1]:
+        for days_ago in range(int(rng.integers(0, 40)), -1, -1):
+            if rng.random() < 0.6:
+                rows.append((name, int(rng.choice([5, 19, 20, 35])), days_ago))
+            if rng.random() < 0.3:
+                rows.append((name, int(rng.choice([20, 30, 90])), days_ago, "PLANK"))
+    return make_sessions(rows)
+
+
+def test_summary_matches_participants(sessions):
+    crew = CrewStats(sessions, 70, GOAL, names=NAMES)
+    participants = [Participant(name, sessions, 70, GOAL) for name in NAMES]
+
+    summary = crew.summary(NAMES)
+    expected = participant_summary(participants)
+    assert summary.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, tuple):
+            assert summary[key][0] == value[0], key
+            assert summary[key][1] == pytest.approx(value[1]), key
+        else:
+            assert summary[key] == value, key
+
+
+def test_summary_table_matches_participants(sessions):
+    crew = CrewStats(sessions, 70, GOAL, names=NAMES)
+    order = ["Zoe", "Nobody", "Max"]
+    table = crew.summary_table(order)
+    assert table.index.tolist() == order
+    for name in order:
+        participant = Participant(name, sessions, 70, GOAL)
+        row = table.loc[name]
+        for column in (
+            "sum_squats_done",
+            "sum_squats_done_today",
+            "delta_done_vs_objecitf_today",
+            "current_objective_streak",
+            "sum_plank_seconds",
+            "current_plank_streak",
+            "best_plank_seconds",
+        ):
+            assert row[column] == getattr(participant, column), (name, column)
+        assert row["moyenne_squats_par_jour"] == pytest.approx(
+            participant.moyenne_squats_par_jour
+        )
+        assert row["progress_pct_vs_objectif"] == pytest.approx(
+            participant.progress_pct_vs_objectif
+        )
+
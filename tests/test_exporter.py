@@ -0,0 +1,72 @@
+"""Filtered exports: filters, a round-trip per format, the download cap."""
+
+import io
+
+import pandas as pd
+import pytest
+
+import exporter
+from config import SessionSnapshot
+
+ROWS = [
+    ("Max", 25, 5),
+    ("Zoe", 40, 5),
+    ("Max", 60, 4, "PLANK"),
+    ("Ana", 30, 3),
+    ("Zoe", 15, 2),
+    ("Max", 35, 1),
+    ("Max", 90, 0, "PLANK"),
+]
+
+
+@pytest.fixture
+def sessions(make_sessions):
+    return SessionSnapshot(make_sessions(ROWS), 1, {}).frame
+
+
+def read_back(data, fmt):
+    if fmt == "parquet":
+        return pd.read_parquet(io.BytesIO(data))
+    return pd.read_csv(io.BytesIO(data), parse_dates=["date", "date_day"])
+
+
+def test_filters_combine(sessions):
+    days = sorted(sessions["date_day"].unique())
+    rows = exporter.filter_sessions(
+        sessions, names=["Max", "Zoe"], exercises=["SQUAT"], since=days[1], until=days[4]
+    )
+    # Day 5 is before since, the PLANK rows are filtered out, Ana is not listed
+    assert list(zip(rows["name"], rows["squats"])) == [("Zoe", 15), ("Max", 35)]
+    assert rows.columns.tolist() == [
+        column for column in exporter.EXPORT_COLUMNS if column in sessions
+    ]
+    assert exporter.count_export_rows(sessions, names=["Ana"]) == 1
+    assert len(exporter.filter_sessions(sessions)) == len(ROWS)
+
+
+@pytest.mark.parametrize("fmt", list(exporter.EXPORT_FORMATS))
+@pytest.mark.parametrize("filters", [{}, {"names": ["Max"]}, {"names": ["Nobody"]}])
+def test_round_trip(sessions, fmt, filters):
+    # A tiny chunk size so several chunks (and row groups) are written
+    data = exporter.export_bytes(sessions, fmt, chunksize=2, **filters)
+    expected = exporter.filter_sessions(sessions, **filters).reset_index(drop=True)
+    actual = read_back(data, fmt)
+
+    assert actual.columns.tolist() == expected.columns.tolist()
+    assert len(actual) == len(expected)
+    for column in ("name", "exercise", "unit"):
+        assert actual[column].astype(str).tolist() == expected[column].astype(str).tolist()
+    for column in ("squats", "plank_seconds", "cumulative_squats"):
+        assert actual[column].tolist() == expected[column].tolist()
+    assert actual["date"].tolist() == expected["date"].tolist()
+
+
+def test_unknown_format(sessions):
+    with pytest.raises(ValueError):
+        exporter.export_sessions(sessions, io.BytesIO(), "xlsx")
+
+
+def test_downloads_are_capped(sessions):
+    with pytest.raises(ValueError, match="too big"):
+        exporter.export_bytes(sessions, "csv", max_rows=3)
+    assert exporter.export_bytes(sessions, "csv", max_rows=3, names=["Zoe"])
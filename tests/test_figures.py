@@ -0,0 +1,87 @@
+"""Chart memoization (figure_cache) and downsample_series."""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import LRUCache, downsample_series
+
+STATS_PAGE = os.path.join(os.path.dirname(__file__), "..", "pages", "1_📈_Stats.py")
+
+
+def daily_series(names, days):
+    dates = pd.date_range("2026-01-01", periods=days, freq="D")
+    return pd.concat(
+        [
+            pd.DataFrame({"date_day": dates, "name": name, "squats": np.arange(days) + offset})
+            for offset, name in enumerate(names)
+        ],
+        ignore_index=True,
+    )
+
+
+def test_short_series_are_returned_unchanged():
+    df = daily_series(["Max"], 50)
+    assert downsample_series(df, "date_day", ["squats"], max_points=50) is df
+
+
+def test_long_series_are_bucketed_per_name():
+    df = daily_series(["Max", "Zoe"], 365)
+    thinned = downsample_series(df, "date_day", ["squats"], by="name", max_points=100)
+
+    counts = thinned.groupby("name").size()
+    assert (counts <= 100).all() and (counts > 50).all()
+    for name, rows in df.groupby("name"):
+        kept = thinned[thinned["name"] == name]
+        # x is each bucket's first value; means keep the series' overall level
+        assert kept["date_day"].iloc[0] == rows["date_day"].iloc[0]
+        assert kept["date_day"].is_monotonic_increasing
+        assert kept["squats"].mean() == pytest.approx(rows["squats"].mean(), rel=0.02)
+
+
+def test_running_totals_keep_their_last_value():
+    df = daily_series(["Max"], 1000).assign(cumulative=lambda d: d["squats"].cumsum())
+    thinned = downsample_series(df, "date_day", ["cumulative"], max_points=200, how="last")
+    assert len(thinned) <= 200
+    assert thinned["cumulative"].iloc[-1] == df["cumulative"].iloc[-1]
+
+
+def test_lru_cache_hits_and_evicts():
+    cache = LRUCache(max_entries=2)
+    builds = []
+
+    def build(value):
+        return lambda: builds.append(value) or value
+
+    assert cache.get("a", build("A")) == "A"
+    assert cache.get("a", build("other")) == "A"
+    cache.get("b", build("B"))
+    cache.get("c", build("C"))
+    cache.get("a", build("A"))
+    assert builds == ["A", "B", "C", "A"]
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+def test_stats_page_reruns_reuse_every_figure(dynamodb):
+    testing = pytest.importorskip("streamlit.testing.v1")
+    for name, value in (("Max", 25), ("Zoe", 30), ("Max", 10)):
+        dynamodb.save_new_squat(name, value)
+
+    page = testing.AppTest.from_file(STATS_PAGE, default_timeout=60)
+    page.run()
+    assert not page.exception
+    figures = dynamodb.figure_cache()
+    built = figures.misses
+    assert built > 0
+
+    page.run()
+    assert not page.exception
+    assert figures.misses == built
+    assert figures.hits >= built
+
+    # A new session changes the data version: charts are rebuilt
+    dynamodb.save_new_squat("Zoe", 20)
+    page.run()
+    assert figures.misses > built
@@ -0,0 +1,59 @@
+"""Freezing closed seasons against moto tables."""
+
+from datetime import datetime
+
+import pytest
+
+import history
+
+
+@pytest.fixture
+def past_year(dynamodb):
+    year = dynamodb.get_today().year - 1
+    with dynamodb.table_squats.batch_writer() as batch:
+        # Written before "year" existed: invisible to the year index
+        batch.put_item(Item={"name": "Max", "date": f"{year}-03-01T08:00:00", "squats": 30})
+        batch.put_item(Item={"name": "Zoe", "date": f"{year}-03-02T08:00:00", "squats": 12})
+        for day, value in ((10, 25), (11, 20)):
+            batch.put_item(
+                Item=dynamodb.build_squat_item("Max", value, at=datetime(year, 11, day, 9))
+            )
+    return year
+
+
+def test_freeze_keeps_legacy_rows_once_the_current_year_is_clean(dynamodb, past_year):
+    # No current-year legacy row: the first load records the flag
+    dynamodb.load_all()
+    assert dynamodb.load_meta(dynamodb.DEFAULT_GROUP).get("legacy_backfilled")
+
+    records = history.freeze_season(past_year)
+
+    totals = history.load_season(past_year)["totals"].set_index("name")
+    assert totals.loc["Max", "squats"] == 75
+    assert totals.loc["Zoe", "squats"] == 12
+    assert records["squats"] == 87
+
+
+def test_freeze_never_sets_the_legacy_flag(dynamodb):
+    year = dynamodb.get_today().year - 1
+    dynamodb.table_squats.put_item(
+        Item=dynamodb.build_squat_item("Max", 25, at=datetime(year, 5, 1, 9))
+    )
+
+    history.freeze_season(year)
+
+    assert not dynamodb.load_meta(dynamodb.DEFAULT_GROUP).get("legacy_backfilled")
+    assert dynamodb._legacy_rows_pending
+
+
+def test_freeze_ignores_a_partial_rollup(dynamodb, past_year):
+    # The rollup table was created in November: it misses the legacy rows
+    dynamodb.table_daily.put_item(
+        Item={"name": "Max", "date_day": f"{past_year}-11-10", "year": past_year, "squats": 25}
+    )
+
+    history.freeze_season(past_year)
+
+    daily = history.load_season(past_year)["daily"]
+    assert daily["squats"].sum() == 87
+    assert len(daily) == 4
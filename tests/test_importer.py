@@ -0,0 +1,109 @@
+"""Bulk imports against moto tables: validation, de-duplication, the epoch bump."""
+
+import io
+
+import pytest
+
+import importer
+
+HEADER = "name,date,value,exercise,unit\n"
+
+
+def csv_file(*lines, name="sessions.csv"):
+    source = io.BytesIO((HEADER + "".join(f"{line}\n" for line in lines)).encode("utf-8"))
+    source.name = name
+    return source
+
+
+def epoch(config):
+    return int(config.load_meta(config.DEFAULT_GROUP).get("epoch", 0))
+
+
+@pytest.fixture
+def year(dynamodb):
+    return dynamodb.get_today().year
+
+
+def test_validation_errors_point_at_file_lines(dynamodb, year):
+    report = importer.import_sessions(
+        csv_file(
+            f"Max,{year}-01-01T09:00:00,25,,",
+            f",{year}-01-01T10:00:00,25,,",
+            "Max,hier,25,,",
+            f"Max,{year}-01-02T09:00:00,25,YOGA,",
+            f"Max,{year}-01-03T09:00:00,-3,,",
+            f"Max,{year}-01-04T09:00:00,2.5,,",
+            f"Max,{year}-01-05T09:00:00,60,PLANK,reps",
+            f"Zoe,{year}-01-05T09:00:00,60,plank,",
+        ),
+        dry_run=True,
+    )
+    assert report["errors"] == [
+        "ligne 3: nom manquant",
+        "ligne 4: date invalide",
+        "ligne 5: exercice inconnu",
+        "ligne 6: valeur invalide",
+        "ligne 7: valeur invalide",
+        "ligne 8: unité incohérente",
+    ]
+    assert (report["rows"], report["invalid"], report["written"]) == (8, 6, 2)
+
+
+def test_duplicates_are_dropped_across_chunks(dynamodb, year):
+    report = importer.import_sessions(
+        csv_file(
+            f"Max,{year}-01-01T09:00:00,25,,",
+            f"Zoe,{year}-01-01T09:00:00,30,,",
+            f"Max,{year}-01-01T09:00:00,99,,",
+            f"Max,{year}-01-02T09:00:00,15,,",
+            f"Zoe,{year}-01-01T09:00:00,30,,",
+        ),
+        chunksize=2,
+    )
+    assert (report["written"], report["duplicates"], report["replaced"]) == (3, 2, 0)
+    stored = dynamodb.load_all().set_index(["name", "date_day"])["squats"]
+    assert sorted(stored.tolist()) == [15, 25, 30]
+    assert dynamodb.load_daily_rollup(year)["squats"].sum() == 70
+
+
+def test_dry_run_writes_nothing(dynamodb, year):
+    report = importer.import_sessions(
+        csv_file(f"Max,{year}-01-01T09:00:00,25,,"), dry_run=True
+    )
+    assert report["written"] == 1
+    assert dynamodb.load_all().empty
+    assert epoch(dynamodb) == 0
+
+
+def test_reimport_replaces_and_bumps_the_epoch(dynamodb, year):
+    lines = [f"Max,{year}-01-0{day}T09:00:00,{10 * day},," for day in (1, 2, 3)]
+    importer.import_sessions(csv_file(*lines))
+    assert epoch(dynamodb) == 1
+
+    report = importer.import_sessions(csv_file(*lines), workers=2)
+    assert (report["written"], report["replaced"]) == (3, 3)
+    assert epoch(dynamodb) == 2
+    assert dynamodb.load_daily_rollup(year)["squats"].sum() == 60
+
+
+def test_written_rows_bump_the_epoch_even_if_reading_fails(dynamodb, year, monkeypatch):
+    read_chunks = importer.iter_import_chunks
+
+    def failing_chunks(*args, **kwargs):
+        yield from read_chunks(*args, **kwargs)
+        raise OSError("connection reset")
+
+    monkeypatch.setattr(importer, "iter_import_chunks", failing_chunks)
+    source = csv_file(f"Max,{year}-01-01T09:00:00,25,,", f"Zoe,{year}-01-01T09:00:00,30,,")
+    with pytest.raises(OSError):
+        importer.import_sessions(source, chunksize=1)
+    # Both chunks were written before reading failed
+    assert len(dynamodb.load_all()) == 2
+    assert epoch(dynamodb) == 1
+
+
+def test_unknown_group_fails_before_reading(dynamodb):
+    source = csv_file("Max,2026-01-01T09:00:00,25,,")
+    with pytest.raises(KeyError):
+        importer.import_sessions(source, group="nope")
+    assert source.tell() == 0
@@ -0,0 +1,59 @@
+"""ParticipantCache: per-name invalidation, goal in the key, no frame kept alive."""
+
+import gc
+import weakref
+
+import pytest
+
+from config import CrewStats, ParticipantCache, SessionSnapshot
+
+
+@pytest.fixture
+def sessions(make_sessions):
+    return make_sessions([("Max", 25, 1), ("Max", 30, 0), ("Zoe", 12, 0)])
+
+
+def crew(sessions, goal=20, days_left=70):
+    return CrewStats(sessions, days_left, goal, names=["Max", "Zoe"])
+
+
+def test_hit_until_the_name_changes(sessions):
+    cache = ParticipantCache()
+    snapshot = SessionSnapshot(sessions, 1, {"Max": 1, "Zoe": 1})
+    crew_stats = crew(sessions)
+    first = cache.get("Max", snapshot, crew_stats)
+    cache.get("Zoe", snapshot, crew_stats)
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    # Zoe logs a session: only her entry is rebuilt
+    changed = SessionSnapshot(sessions, 2, {"Max": 1, "Zoe": 2})
+    again = cache.get("Max", changed, crew_stats)
+    cache.get("Zoe", changed, crew_stats)
+    assert (cache.hits, cache.misses) == (1, 3)
+    assert again.sum_squats_done == first.sum_squats_done == 55
+
+
+def test_goal_and_days_left_are_part_of_the_key(sessions):
+    cache = ParticipantCache()
+    snapshot = SessionSnapshot(sessions, 1, {"Max": 1})
+    at_20 = cache.get("Max", snapshot, crew(sessions, goal=20))
+    at_30 = cache.get("Max", snapshot, crew(sessions, goal=30))
+    later = cache.get("Max", snapshot, crew(sessions, goal=30, days_left=10))
+    assert cache.misses == 3
+    assert (at_20.current_objective_streak, at_30.current_objective_streak) == (2, 1)
+    assert later.squats_restants == 300
+
+
+def test_entries_keep_no_crew_stats_alive(sessions):
+    cache = ParticipantCache()
+    snapshot = SessionSnapshot(sessions, 1, {"Max": 1})
+    crew_stats = crew(sessions)
+    participant = cache.get("Max", snapshot, crew_stats)
+    assert participant.df["squats"].sum() == 55
+
+    alive = weakref.ref(crew_stats)
+    del crew_stats, participant
+    gc.collect()
+    assert alive() is None
+    assert cache.get("Max", snapshot, crew(sessions)).sum_squats_done == 55
+    assert cache.hits == 1
@@ -0,0 +1,69 @@
+"""The daily rollup write path and its rebuild, against moto tables."""
+
+from datetime import datetime
+
+import pytest
+
+import backfill
+
+
+def rollup(config, year):
+    daily = config.load_daily_rollup(year)
+    return {
+        (row.name, row.date_day.strftime("%Y-%m-%d")): (row.squats, row.sessions)
+        for row in daily.itertuples(index=False)
+    }
+
+
+@pytest.fixture
+def year(dynamodb):
+    return dynamodb.get_today().year
+
+
+@pytest.mark.parametrize("synchronous", [True, False])
+def test_an_overwritten_session_only_adds_the_difference(dynamodb, year, synchronous):
+    at = datetime(year, 1, 5, 9)
+    with dynamodb.SquatWriter(synchronous=synchronous) as writer:
+        writer.add("Max", 25, at=at)
+        writer.add("Max", 10, at=datetime(year, 1, 5, 18))
+    assert rollup(dynamodb, year) == {("Max", f"{year}-01-05"): (35, 2)}
+
+    # Same (name, date) key: the 25 is corrected to 40
+    with dynamodb.SquatWriter(synchronous=synchronous) as writer:
+        writer.add("Max", 40, at=at)
+    assert writer.replaced == 1
+    assert rollup(dynamodb, year) == {("Max", f"{year}-01-05"): (50, 2)}
+
+
+def test_a_reimport_leaves_the_totals_alone(dynamodb, year):
+    items = [
+        dynamodb.build_squat_item(name, value, at=datetime(year, 2, day, 9))
+        for name, value, day in (("Max", 25, 1), ("Zoe", 30, 1), ("Max", 15, 2))
+    ]
+    for _ in range(2):
+        with dynamodb.SquatWriter() as writer:
+            for item in items:
+                writer.add_item(dict(item))
+    assert writer.replaced == len(items)
+    assert rollup(dynamodb, year) == {
+        ("Max", f"{year}-02-01"): (25, 1),
+        ("Zoe", f"{year}-02-01"): (30, 1),
+        ("Max", f"{year}-02-02"): (15, 1),
+    }
+
+
+def test_rebuild_deletes_days_without_sessions(dynamodb, year):
+    dynamodb.save_new_squat("Max", 25)
+    today = dynamodb.get_today().strftime("%Y-%m-%d")
+    # A day whose sessions were deleted, and a drifted total
+    dynamodb.table_daily.put_item(
+        Item={"name": "Zoe", "date_day": f"{year}-01-01", "year": year, "squats": 40}
+    )
+    dynamodb.table_daily.update_item(
+        Key={"name": "Max", "date_day": today},
+        UpdateExpression="ADD squats :s",
+        ExpressionAttributeValues={":s": 5},
+    )
+
+    assert backfill.rebuild_daily_rollup(year) == 1
+    assert rollup(dynamodb, year) == {("Max", today): (25, 1)}
@@ -0,0 +1,70 @@
+"""The parallel segmented scan, against a fake table."""
+
+import threading
+import time
+
+import pytest
+
+import config
+
+
+class FakeTable:
+    """Endless scan pages of one item; the first page of every segment waits for all."""
+
+    def __init__(self, segments, failing_segment=None):
+        self.barrier = threading.Barrier(segments, timeout=5)
+        self.failing_segment = failing_segment
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def scan(self, Segment, TotalSegments, ExclusiveStartKey=None, **kwargs):
+        if Segment == self.failing_segment:
+            raise RuntimeError("throttled")
+        if ExclusiveStartKey is None:
+            self.barrier.wait()
+        with self.lock:
+            self.calls += 1
+        time.sleep(0.001)
+        page = (ExclusiveStartKey or {}).get("page", 0) + 1
+        return {
+            "Items": [{"segment": Segment, "page": page}],
+            "LastEvaluatedKey": {"page": page},
+        }
+
+
+@pytest.fixture
+def fake_table(monkeypatch):
+    def install(segments, failing_segment=None):
+        table = FakeTable(segments, failing_segment)
+        monkeypatch.setattr(config, "_thread_table", lambda name=None: table)
+        return table
+
+    return install
+
+
+def test_every_segment_runs_at_once(fake_table):
+    # 8 is above the old shared pool's 4 workers: the barrier would time out
+    fake_table(8)
+    items = config._parallel_scan_items(8)
+    segments = {next(items)["segment"] for _ in range(64)}
+    items.close()
+    assert segments == set(range(8))
+
+
+def test_workers_stop_once_the_consumer_is_gone(fake_table):
+    table = fake_table(4)
+    items = config._parallel_scan_items(4)
+    next(items)
+    items.close()
+
+    time.sleep(0.05)
+    calls = table.calls
+    time.sleep(0.1)
+    assert table.calls == calls
+
+
+def test_segment_errors_reach_the_consumer(fake_table):
+    # Only segment 0 reaches the barrier
+    fake_table(1, failing_segment=1)
+    with pytest.raises(RuntimeError, match="throttled"):
+        list(config._parallel_scan_items(2))
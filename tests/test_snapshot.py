@@ -0,0 +1,59 @@
+"""SessionSnapshot: read-only, derived columns, sorted pages without copies."""
+
+import pandas as pd
+import pytest
+
+from config import SessionSnapshot
+
+ROWS = [
+    ("Max", 25, 3),
+    ("Zoe", 40, 3),
+    ("Max", 10, 2),
+    ("Ana", 30, 1),
+    ("Zoe", 15, 0),
+    ("Max", 35, 0),
+]
+
+
+@pytest.fixture
+def snapshot(make_sessions):
+    return SessionSnapshot(make_sessions(ROWS), 7, {"Max": 7})
+
+
+def test_is_read_only(snapshot):
+    with pytest.raises(AttributeError):
+        snapshot.version = 8
+    assert snapshot.name_version("Max") == 7
+    assert snapshot.name_version("Zoe") == 0
+
+
+def test_cumulative_squats_per_name(snapshot):
+    frame = snapshot.frame.sort_values("date")
+    max_rows = frame[frame["name"] == "Max"]
+    assert max_rows["cumulative_squats"].tolist() == [25, 35, 70]
+
+
+@pytest.mark.parametrize("column", ["date", "name", "squats"])
+@pytest.mark.parametrize("ascending", [True, False])
+def test_page_matches_sort_values(snapshot, column, ascending):
+    # Ties are broken by (date, name), in the same direction
+    by = [column, "date", "name"] if column != "date" else ["date", "name"]
+    expected = snapshot.frame.sort_values(by, ascending=ascending, kind="stable")
+    rows, total = snapshot.page(sort_by=column, ascending=ascending, offset=0, limit=10)
+    assert total == len(ROWS)
+    assert rows.index.tolist() == expected.index.tolist()
+
+
+def test_page_filters_and_slices(snapshot):
+    rows, total = snapshot.page(names=["Max", "Ana"], offset=1, limit=2)
+    assert total == 4
+    newest_first = snapshot.frame[snapshot.frame["name"].isin(["Max", "Ana"])].sort_values(
+        "date", ascending=False
+    )
+    assert rows.index.tolist() == newest_first.index[1:3].tolist()
+
+
+def test_sort_order_is_built_once_per_column(snapshot):
+    first = snapshot.sort_order("squats")
+    assert snapshot.sort_order("squats") is first
+    assert pd.Series(snapshot.frame["squats"].to_numpy()[first]).is_monotonic_increasing
@@ -0,0 +1,155 @@
+"""The vectorized streak engine against the iterrows loops it replaced."""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from config import CrewStats, _normalize_items, _streak_run_lengths, get_today
+
+TODAY = date(2026, 6, 15)
+
+
+def iterrows_streaks(daily_totals, column, threshold, today=TODAY):
+    """Participant._compute_streaks / _compute_plank_streaks, before user-006."""
+    current = 0
+    best = 0
+    last_date = None
+    last_goal_met = False
+
+    for _, row in daily_totals.iterrows():
+        goal_met = row[column] >= threshold
+        date_value = row["date"]
+        is_today = date_value == today
+
+        if goal_met:
+            if last_date and last_goal_met and (date_value - last_date).days == 1:
+                current += 1
+            else:
+                current = 1
+        else:
+            if not is_today:
+                current = 0
+
+        best = max(best, current)
+        last_goal_met = goal_met
+        last_date = date_value
+
+    return {"current": current, "best": best}
+
+
+def daily_frame(values, today=TODAY, column="squats"):
+    """One row per day, the last one being today."""
+    days = [today - timedelta(days=offset) for offset in range(len(values) - 1, -1, -1)]
+    return pd.DataFrame({"date": days, column: values})
+
+
+def crew_streaks(columns, thresholds, first_days, today=TODAY):
+    """CrewStats._streaks over a days x participants matrix ending today."""
+    start = min(first_days.values())
+    days = pd.date_range(start, today, freq="D")
+    wide = pd.DataFrame(
+        {
+            name: pd.Series(values, index=pd.date_range(first_days[name], today))
+            for name, values in columns.items()
+        },
+        index=days,
+    ).fillna(0)
+    first_days = pd.Series(pd.to_datetime(list(first_days.values())), index=list(first_days))
+    return CrewStats._streaks(wide, thresholds, first_days)
+
+
+@pytest.mark.parametrize(
+    "values, expected",
+    [
+        ([25, 30, 0], {"current": 2, "best": 2}),  # today not done yet: kept
+        ([25, 0, 0], {"current": 0, "best": 1}),  # yesterday missed: broken
+        ([25, 30, 20], {"current": 3, "best": 3}),
+        ([25, 0, 25, 25, 5, 30], {"current": 1, "best": 2}),
+        ([0], {"current": 0, "best": 0}),
+        ([20], {"current": 1, "best": 1}),
+    ],
+)
+def test_today_rule(values, expected):
+    daily = daily_frame(values)
+    assert iterrows_streaks(daily, "squats", 20) == expected
+    current, best = crew_streaks({"a": values}, [20], {"a": daily["date"].iloc[0]})
+    assert {"current": current["a"], "best": best["a"]} == expected
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_matches_loop_on_random_crews(seed):
+    rng = np.random.default_rng(seed)
+    columns, first_days, thresholds, expected = {}, {}, [], {}
+    for index in range(6):
+        length = int(rng.integers(1, 120))
+        # Plank-like columns use the 30 s minimum, squat-like ones the daily goal
+        threshold = 30 if index % 2 else 20
+        values = rng.choice([0, 10, threshold - 1, threshold, 45], size=length)
+        name = f"p{index}"
+        daily = daily_frame(values)
+        columns[name] = values
+        first_days[name] = daily["date"].iloc[0]
+        thresholds.append(threshold)
+        expected[name] = iterrows_streaks(daily, "squats", threshold)
+
+    current, best = crew_streaks(columns, thresholds, first_days)
+    for name, streaks in expected.items():
+        assert {"current": current[name], "best": best[name]} == streaks
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_breaks_match_loop_on_gaps(seed):
+    """Missing days restart a run, as in history.season_totals()."""
+    rng = np.random.default_rng(seed)
+    offsets = np.sort(rng.choice(np.arange(90), size=40, replace=False))
+    days = [TODAY - timedelta(days=int(89 - offset)) for offset in offsets]
+    daily = pd.DataFrame({"date": days, "squats": rng.choice([0, 20, 35], size=40)})
+
+    day_numbers = pd.to_datetime(daily["date"]).to_numpy().astype("datetime64[D]")
+    breaks = np.concatenate(([False], np.diff(day_numbers).astype(int) != 1))
+    run_lengths = _streak_run_lengths(daily["squats"].to_numpy() >= 20, breaks)
+
+    assert int(run_lengths.max()) == iterrows_streaks(daily, "squats", 20)["best"]
+    if daily["squats"].iloc[-1] >= 20:
+        assert run_lengths[-1] == iterrows_streaks(daily, "squats", 20)["current"]
+
+
+def test_days_before_first_day_never_count():
+    days = pd.date_range(TODAY - timedelta(days=9), TODAY)
+    wide = pd.DataFrame({"early": [45] * 10, "late": [45] * 10}, index=days)
+    first_days = pd.Series(
+        pd.to_datetime([days[0], days[-2]]), index=["early", "late"]
+    )
+    current, best = CrewStats._streaks(wide, [30, 30], first_days)
+    assert (current["early"], best["early"]) == (10, 10)
+    assert (current["late"], best["late"]) == (2, 2)
+
+
+def test_squat_series_starts_at_first_session_of_any_exercise():
+    """Participant.daily_totals started at premier_squat_date, planks included."""
+    today = pd.Timestamp(get_today().date())
+    sessions = pd.DataFrame(
+        {
+            "name": ["Zoe", "Zoe"],
+            "date": [today - pd.Timedelta(days=5), today - pd.Timedelta(days=2)],
+            "exercise": ["PLANK", "SQUAT"],
+            "value": [60, 25],
+            "squats": [0, 25],
+            "plank_seconds": [60, 0],
+        }
+    )
+    crew = CrewStats(sessions, 0)
+
+    squats = crew.daily_totals("Zoe")
+    assert len(squats) == 6
+    assert squats["squats"].tolist() == [0, 0, 0, 25, 0, 0]
+    assert len(crew.plank_daily_totals("Zoe")) == 6
+    assert crew.stats.loc["Zoe", "premier_squat_date"] == squats["date"].iloc[0]
+
+
+def test_empty_crew():
+    crew = CrewStats(_normalize_items([]), 70, names=[])
+    assert crew.daily_squats.empty
+    assert crew.summary()["best_streak"] is None